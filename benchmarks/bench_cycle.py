@@ -0,0 +1,211 @@
+"""End-to-end capture cycles on a simulated camera against a local WebDAV stand-in.
+
+Drives ``meisencam.__main__.main()`` like on the Pi, with the synthetic
+or replay sensor instead of Picamera2 and a local HTTP server standing
+in for the Nextcloud share, so motion, encoding, spooling, upload and
+pipeline changes can be measured (and regressions caught in CI) on any
+Linux machine.  Ramdisk files go to a temporary directory.
+
+Every mode runs in a fresh interpreter, so the settings (taken from the
+environment at import, as on the Pi) and the peak RSS are its own:
+
+* ``cron``: ``--cycles`` single runs of ``main()`` in one process, one
+  sensor shared between them so the motion script continues
+* ``daemon``, ``pipeline``, ``stream``: ``main()`` with that mode for
+  ``--duration`` seconds, stopped by SIGTERM
+
+Reported per mode: cycles/s, frames uploaded, peak RSS and the p50/p90/p99
+latency of every stage recorded in :mod:`meisencam.metrics`.
+``--record FILE`` appends the results as JSON lines and
+``--min-cycles-per-s`` fails the run if any mode is slower.
+
+Usage:
+    uv run python benchmarks/bench_cycle.py [--modes cron,daemon,pipeline,stream]
+        [--backend synthetic|replay] [--size 1920x1080] [--fps 30]
+"""
+
+import argparse
+import json
+import os
+import resource
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = {
+    "cron": [],
+    "daemon": ["--daemon", "--interval", "0"],
+    "pipeline": ["--pipeline", "--interval", "0"],
+    "stream": ["--stream"],
+}
+RAMDISK_FILES = (
+    "CURRENT_IMAGE",
+    "REFERENCE_FILE",
+    "LOG_FILE",
+    "SPOOL_DIR",
+    "METRICS_FILE",
+    "DEDUP_FILE",
+)
+
+
+def _serve(delay: float) -> tuple[ThreadingHTTPServer, list[int]]:
+    """WebDAV stand-in accepting every PUT after ``delay`` seconds; returns the body sizes."""
+    received: list[int] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_PUT(self) -> None:  # noqa: N802 - http.server naming
+            received.append(len(self.rfile.read(int(self.headers.get("Content-Length", 0)))))
+            time.sleep(delay)
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+    else:
+        p50 = p90 = p99 = samples[0]
+    return {
+        "count": len(samples),
+        "p50_ms": round(p50 * 1000, 3),
+        "p90_ms": round(p90 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+    }
+
+
+def run_mode(args: argparse.Namespace) -> dict:
+    """Run one mode in this process and return its result (the --run-mode worker)."""
+    server, received = _serve(args.upload_delay_ms / 1000)
+    width, height = args.size.lower().split("x")
+    os.environ.update(
+        {
+            "MEISENCAM_CAMERA_BACKEND": args.backend,
+            "MEISENCAM_CAMERA_REPLAY_DIR": str(args.images),
+            "MEISENCAM_CAMERA_SIM_FPS": str(args.fps),
+            "MEISENCAM_WIDTH": width,
+            "MEISENCAM_HEIGHT": height,
+            "MEISENCAM_WEBDAV_BASE": f"http://127.0.0.1:{server.server_port}/public.php/webdav",
+            "MEISENCAM_METRICS_ENABLED": "1",
+            "MEISENCAM_STREAM_INTERVAL_S": "0",
+        }
+    )
+    # imported only now: settings are read from the environment at import
+    from meisencam import __main__ as cli
+    from meisencam import camera, metrics, sensor
+
+    tmp = Path(tempfile.mkdtemp(prefix="meisencam-bench-"))
+    for name in RAMDISK_FILES:
+        setattr(cli, name, tmp / getattr(cli, name).name)
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    observe = metrics.registry.observe
+
+    def record(stage: str, secs: float) -> None:
+        samples[stage].append(secs)
+        observe(stage, secs)
+
+    metrics.registry.observe = record
+
+    started = time.perf_counter()
+    if args.run_mode == "cron":
+        shared = sensor.open_sensor()
+        camera.open_sensor = lambda: shared
+        for _ in range(args.cycles):
+            cli.main([])
+    else:
+        threading.Timer(args.duration, os.kill, (os.getpid(), signal.SIGTERM)).start()
+        cli.main(MODES[args.run_mode])
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    cycles = len(samples["cycle"])
+    return {
+        "mode": args.run_mode,
+        "backend": args.backend,
+        "size": args.size,
+        "cycles": cycles,
+        "elapsed_s": round(elapsed, 3),
+        "cycles_per_s": round(cycles / elapsed, 2),
+        "uploaded": len(received),
+        "uploaded_kb": round(sum(received) / 1024, 1),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "stages": {name: _percentiles(secs) for name, secs in sorted(samples.items())},
+    }
+
+
+def _print(result: dict) -> None:
+    print(
+        f"{result['mode']}: {result['cycles']} cycles, {result['cycles_per_s']:.2f} cycles/s, "
+        f"{result['uploaded']} uploaded ({result['uploaded_kb']:.0f} KiB), "
+        f"{result['peak_rss_kb'] / 1024:.1f} MB peak RSS"
+    )
+    print(f"  {'stage':<24} {'count':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for name, stats in result["stages"].items():
+        print(
+            f"  {name:<24} {stats['count']:>6} {stats['p50_ms']:>9.2f} "
+            f"{stats['p90_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated")
+    parser.add_argument("--backend", choices=("synthetic", "replay"), default="synthetic")
+    parser.add_argument("--images", type=Path, default=ROOT / "sample_images")
+    parser.add_argument("--size", default="1920x1080", help="main stream WxH")
+    parser.add_argument("--fps", type=float, default=30.0, help="simulated sensor frame rate")
+    parser.add_argument("--cycles", type=int, default=20, help="runs of main() in cron mode")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per daemon mode")
+    parser.add_argument("--upload-delay-ms", type=float, default=20.0, help="per PUT")
+    parser.add_argument("--record", type=Path, help="append the results as JSON lines")
+    parser.add_argument("--min-cycles-per-s", type=float, help="fail if a mode is slower")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args)))
+        return
+
+    results = []
+    for mode in args.modes.split(","):
+        worker = [sys.executable, __file__, *sys.argv[1:], "--run-mode", mode]
+        out = subprocess.run(worker, capture_output=True, text=True)
+        if out.returncode:
+            sys.exit(f"{mode} failed:\n{out.stderr[-2000:]}")
+        result = json.loads(out.stdout.splitlines()[-1])
+        _print(result)
+        results.append(result)
+
+    if args.record:
+        stamp = datetime.now().isoformat(timespec="seconds")
+        with open(args.record, "a") as f:
+            for result in results:
+                f.write(json.dumps({"time": stamp, **result}) + "\n")
+    if args.min_cycles_per_s is not None:
+        slow = [r["mode"] for r in results if r["cycles_per_s"] < args.min_cycles_per_s]
+        if slow:
+            sys.exit(f"below {args.min_cycles_per_s} cycles/s: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
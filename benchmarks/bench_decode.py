@@ -0,0 +1,105 @@
+"""Compare the full-decode and draft-mode motion loaders on sample images.
+
+Each loader runs in its own child process so the reported peak RSS
+belongs to that loader alone.  On Linux the peak is reset after the
+imports, so it reflects decoding rather than interpreter start-up.
+
+Usage:
+    uv run python benchmarks/bench_decode.py [--images DIR] [--upscale 1920x1080]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from meisencam import config as cfg
+from meisencam.motion import open_for_motion, prepare_pixels
+from meisencam.replay import peak_rss_kb, reset_peak_rss
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _load_old(path: Path) -> bytes:
+    # the pre-draft loader: full RGB decode, then convert and resize
+    image = Image.open(path).convert("L")
+    return image.resize((cfg.MOTION_COMPARE_SIZE_W, cfg.MOTION_COMPARE_SIZE_H)).tobytes()
+
+
+def _load_new(path: Path) -> bytes:
+    return prepare_pixels(open_for_motion(path))
+
+
+LOADERS = {"old": _load_old, "new": _load_new}
+
+
+def _worker(loader: str, images: list[Path], repeat: int) -> None:
+    load = LOADERS[loader]
+    reset_peak_rss()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for path in images:
+            load(path)
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                "ms_per_image": elapsed / (repeat * len(images)) * 1000,
+                "peak_rss_kb": peak_rss_kb(),
+            }
+        )
+    )
+
+
+def _upscaled_copies(images: list[Path], size: tuple[int, int], directory: Path) -> list[Path]:
+    copies = []
+    for path in images:
+        copy = directory / path.name
+        Image.open(path).resize(size).save(copy, quality=90)
+        copies.append(copy)
+    return copies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, default=ROOT / "sample_images")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--upscale", help="also benchmark copies resized to WxH")
+    parser.add_argument("--worker", choices=LOADERS, help=argparse.SUPPRESS)
+    parser.add_argument("files", nargs="*", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.files, args.repeat)
+        return
+
+    sets = {"original": sorted(args.images.glob("*.jpg"))}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.upscale:
+            size = tuple(int(v) for v in args.upscale.lower().split("x"))
+            sets[args.upscale] = _upscaled_copies(sets["original"], size, Path(tmp))
+
+        print(f"{'images':<12} {'loader':<6} {'ms/image':>10} {'peak RSS':>12}")
+        for name, images in sets.items():
+            for loader in LOADERS:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--worker", loader, "--repeat", str(args.repeat)]
+                    + [str(p) for p in images],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                result = json.loads(out)
+                print(
+                    f"{name:<12} {loader:<6} {result['ms_per_image']:>10.2f} "
+                    f"{result['peak_rss_kb'] / 1024:>9.1f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
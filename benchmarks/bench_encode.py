@@ -0,0 +1,85 @@
+"""Compare upload encoder settings on sample images: bytes and encode time.
+
+Each image is decoded once, as the camera hands over raw pixels, so only
+the encoding itself is timed.  Every combination of ``--widths``,
+``--qualities`` and progressive on/off is reported, plus one row per
+``--budgets`` entry at full width and the first quality.
+
+Usage:
+    uv run python benchmarks/bench_encode.py [--images DIR] [--upscale 1920x1080]
+"""
+
+import argparse
+import itertools
+import statistics
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from meisencam.encode import EncodeSettings, encode_jpeg
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def _measure(images: list[Image.Image], settings: EncodeSettings, repeat: int) -> tuple[int, float]:
+    sizes, times = [], []
+    for image in images:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = encode_jpeg(image, settings)
+            times.append(time.perf_counter() - started)
+        sizes.append(len(data))
+    return int(statistics.mean(sizes)), statistics.mean(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, default=ROOT / "sample_images")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--widths", type=_ints, default=[0, 1280, 960], help="0 = full size")
+    parser.add_argument("--qualities", type=_ints, default=[90, 80, 70])
+    parser.add_argument("--budgets", type=_ints, default=[40_000, 20_000], help="bytes")
+    parser.add_argument("--upscale", help="resize the images to WxH first, like a camera still")
+    args = parser.parse_args()
+
+    images = []
+    for path in sorted(args.images.glob("*.jpg")):
+        with Image.open(path) as image:
+            images.append(image.convert("RGB"))
+    if args.upscale:
+        size = tuple(int(v) for v in args.upscale.lower().split("x"))
+        images = [image.resize(size) for image in images]
+
+    rows = [
+        (f"{width or 'full'}", quality, progressive, 0)
+        for width, quality, progressive in itertools.product(
+            args.widths, args.qualities, (False, True)
+        )
+    ]
+    rows += [("full", args.qualities[0], False, budget) for budget in args.budgets]
+
+    print(f"{len(images)} images, {args.repeat} encodes each")
+    print(
+        f"{'width':>6} {'quality':>8} {'progr.':>7} {'budget':>8} {'KiB/image':>10} {'ms/image':>9}"
+    )
+    for width, quality, progressive, budget in rows:
+        settings = EncodeSettings(
+            max_width=0 if width == "full" else int(width),
+            quality=quality,
+            progressive=progressive,
+            max_bytes=budget,
+        )
+        size, ms = _measure(images, settings, args.repeat)
+        print(
+            f"{width:>6} {quality:>8} {'yes' if progressive else 'no':>7} "
+            f"{budget or '-':>8} {size / 1024:>10.1f} {ms:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
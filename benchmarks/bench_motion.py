@@ -0,0 +1,66 @@
+"""Benchmark the motion scoring backends at several frame sizes.
+
+"adaptive fps" is one frame against the adaptive background model:
+per-pixel classification plus the running mean/variance update.
+
+Usage:
+    uv run python benchmarks/bench_motion.py [--repeat N]
+"""
+
+import argparse
+import os
+import time
+
+from meisencam.background import background_class
+from meisencam.scoring import NumpyScorer, PythonScorer, np
+
+SIZES = [(64, 48), (320, 240), (1920, 1080)]
+THRESHOLD = 15
+HEATMAP_GRID = (8, 6)
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-``repeat`` wall time of ``fn()`` in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    scorers = [PythonScorer()] + ([NumpyScorer()] if np is not None else [])
+    print(
+        f"{'backend':<8} {'size':>10} {'count fps':>12} {'heatmap fps':>12} {'adaptive fps':>13}"
+    )
+    for width, height in SIZES:
+        new = os.urandom(width * height)
+        old = os.urandom(width * height)
+        for scorer in scorers:
+            # the pure-Python path takes seconds per full-HD frame; one run is enough
+            repeat = 1 if scorer.name == "python" and width * height > 100_000 else args.repeat
+            count = _time(lambda: scorer.count_changed(new, old, THRESHOLD), repeat)
+            heat = _time(
+                lambda: scorer.heatmap(new, old, (width, height), THRESHOLD, HEATMAP_GRID),
+                repeat,
+            )
+            model = background_class(scorer.name).seed(old, 25.0)
+
+            def adaptive() -> None:
+                model.count(model.changed(new, 3.0, 6))
+                model.update(new, 0.05)
+
+            bg = _time(adaptive, repeat)
+            print(
+                f"{scorer.name:<8} {f'{width}x{height}':>10} {1 / count:>12.1f} {1 / heat:>12.1f}"
+                f" {1 / bg:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measure cold-start wall time, peak RSS and the slowest imports.
+
+Every run starts a fresh interpreter with ``-X importtime``, as cron does
+for each capture, so the numbers include interpreter start-up.  The
+median wall time and peak RSS over ``--runs`` are printed with the
+modules that took longest to import (cumulative, from the last run).
+``--record FILE`` appends the result as one JSON line tagged with the
+package version, to track start-up across releases.
+
+Usage:
+    uv run python benchmarks/bench_startup.py [--runs 10] [--record startup.jsonl]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+TARGETS = {
+    "import": "import meisencam.__main__",
+    "help": "import sys; from meisencam.__main__ import main; sys.argv[1:] = ['--help']; main()",
+}
+
+
+def _run(code: str) -> tuple[float, int, str]:
+    """Wall time (s), peak RSS (KiB) and importtime report of one interpreter."""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    stderr = proc.stderr.read()
+    # wait4 instead of wait() to get the child's own resource usage
+    _, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"start-up failed:\n{stderr[-2000:]}")
+    return elapsed, rusage.ru_maxrss, stderr
+
+
+def _slowest(report: str, top: int) -> list[tuple[str, int]]:
+    """Top-level-ish imports by cumulative microseconds."""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        rows.append((name, int(cumulative)))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--target", choices=TARGETS, default="import")
+    parser.add_argument("--record", type=Path, help="append the result as a JSON line")
+    args = parser.parse_args()
+
+    results = [_run(TARGETS[args.target]) for _ in range(args.runs)]
+    wall_ms = statistics.median(r[0] for r in results) * 1000
+    rss_kb = statistics.median(r[1] for r in results)
+
+    print(f"{args.target}: {wall_ms:.1f} ms wall, {rss_kb / 1024:.1f} MB peak RSS (median)")
+    print(f"{'module':<40} {'ms':>8}")
+    for name, micros in _slowest(results[-1][2], args.top):
+        print(f"{name:<40} {micros / 1000:>8.1f}")
+
+    if args.record:
+        try:
+            release = version("meisencam")
+        except PackageNotFoundError:
+            release = "unknown"
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "version": release,
+            "target": args.target,
+            "wall_ms": round(wall_ms, 1),
+            "peak_rss_kb": rss_kb,
+        }
+        with open(args.record, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare per-upload latency of one-shot requests.put and the pooled uploader.
+
+Runs a local HTTP/1.1 PUT server.  ``--connect-delay-ms`` makes the
+server stall every new connection, standing in for the TCP and TLS
+handshake over the WiFi dongle, which keep-alive avoids.
+
+Usage:
+    uv run python benchmarks/bench_upload.py [--uploads N] [--connect-delay-ms MS]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from meisencam.upload import WebDavUploader, put_file
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _serve(connect_delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            time.sleep(connect_delay)
+            super().setup()
+
+        def do_PUT(self) -> None:  # noqa: N802 - http.server naming
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _measure(upload, image: Path, count: int) -> list[float]:
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        upload(image, f"bench-{i}.jpg")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--connect-delay-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--image", type=Path, default=next((ROOT / "sample_images").glob("*.jpg"))
+    )
+    args = parser.parse_args()
+
+    server = _serve(args.connect_delay_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_port}/webdav"
+
+    oneshot = _measure(
+        lambda path, name: put_file(path, name, webdav_base=base, share_token="bench"),
+        args.image,
+        args.uploads,
+    )
+    uploader = WebDavUploader(base, "bench")
+    pooled = _measure(uploader.put, args.image, args.uploads)
+    uploader.close()
+    server.shutdown()
+
+    print(f"{args.uploads} uploads of {args.image.name} ({args.image.stat().st_size} bytes)")
+    print(f"{'client':<10} {'mean ms':>10} {'median ms':>10} {'max ms':>10}")
+    for name, latencies in (("requests", oneshot), ("pooled", pooled)):
+        print(
+            f"{name:<10} {statistics.mean(latencies) * 1000:>10.2f} "
+            f"{statistics.median(latencies) * 1000:>10.2f} {max(latencies) * 1000:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,360 @@
-"""Entry point for meisencam — runs one capture cycle."""
+"""Entry point for meisencam — runs one capture cycle or a long-running daemon."""
 
 import argparse
+import functools
 import logging
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
 
-from meisencam import config
+from meisencam import config, metrics
+from meisencam.archive import main as archive_main
+from meisencam.archive import open_archive
+from meisencam.burst import select_frames
 from meisencam.camera import MeisenCamera
-from meisencam.motion import detect_motion
-from meisencam.upload import upload_image
+from meisencam.daemon import CycleFn, Daemon
+from meisencam.dedup import should_upload
+from meisencam.frame import Frame
+from meisencam.motion import MotionDetector, detect_motion, last_pixels
+from meisencam.pipeline import Pipeline, Stage
+from meisencam.ring import FrameRing
+from meisencam.schedule import AdaptiveScheduler, Profile, load_profiles, profile_at
+from meisencam.spool import SpoolItem, UploadSpool, UploadWorker
+from meisencam.upload import CollectorUploader, WebDavUploader, remote_filename
 
 RAMDISK = Path("/mnt/ramdisk")
 CURRENT_IMAGE = RAMDISK / "meisencam.jpg"
-OLD_IMAGE = RAMDISK / "meisencamalt.jpg"
+REFERENCE_FILE = RAMDISK / "meisencam.ref"
 LOG_FILE = RAMDISK / "meisencam.log"
+SPOOL_DIR = RAMDISK / "spool"
+METRICS_FILE = RAMDISK / "metrics.jsonl"
+DEDUP_FILE = RAMDISK / "meisencam.dedup"
+
+
+def replay_main(argv: list[str]) -> None:
+    """Run ``meisencam replay``; imported on demand to keep capture start-up short."""
+    from meisencam.replay import main
+
+    main(argv)
+
+
+def digest_main(argv: list[str]) -> None:
+    """Run ``meisencam digest``; imported on demand like :func:`replay_main`."""
+    from meisencam.digest import main
+
+    main(argv)
+
+
+def collector_main(argv: list[str]) -> None:
+    """Run ``meisencam collector``; imported on demand like :func:`replay_main`."""
+    from meisencam.collector import main
+
+    main(argv)
+
+
+def _send(uploader: WebDavUploader, item: SpoolItem) -> bool:
+    """Upload a spooled frame and append its log line on success."""
+    response = uploader.put(item.path, item.filename)
+    if not response.ok:
+        logging.warning("Upload of %s rejected: %d", item.filename, response.status_code)
+        return False
+    if item.meta:
+        with open(LOG_FILE, "a") as f:
+            f.write(f"{item.meta};{response.text}\n")
+    return True
+
+
+def _send_batch(uploader: CollectorUploader, items: list[SpoolItem]) -> bool:
+    """Upload spooled frames to the collector in one request and log them on success."""
+    response = uploader.post_batch([(item.path, item.filename, item.meta) for item in items])
+    if not response.ok:
+        logging.warning("Batch of %d frame(s) rejected: %d", len(items), response.status_code)
+        return False
+    with open(LOG_FILE, "a") as f:
+        for item in items:
+            if item.meta:
+                f.write(f"{item.meta};\n")
+    return True
+
+
+def create_upload_worker() -> UploadWorker:
+    """Build the spool worker around one uploader shared for the process lifetime.
+
+    With ``MEISENCAM_COLLECTOR_URL`` set, frames go to the collector in
+    batches instead of to the share.
+    """
+    spool = UploadSpool(SPOOL_DIR, config.UPLOAD_SPOOL_MAX_ITEMS)
+    if config.COLLECTOR_URL:
+        return UploadWorker(
+            spool,
+            None,
+            backoff_max=config.UPLOAD_BACKOFF_MAX_S,
+            archive=open_archive(),
+            catchup_batch=config.ARCHIVE_CATCHUP_BATCH,
+            send_batch=functools.partial(_send_batch, CollectorUploader()),
+            batch_size=config.COLLECTOR_BATCH_SIZE,
+        )
+    uploader = WebDavUploader()
+    return UploadWorker(
+        spool,
+        functools.partial(_send, uploader),
+        backoff_max=config.UPLOAD_BACKOFF_MAX_S,
+        archive=open_archive(),
+        catchup_batch=config.ARCHIVE_CATCHUP_BATCH,
+    )
+
+
+def apply_profile(camera: MeisenCamera, profiles: list[Profile]) -> None:
+    """Switch the camera to the time-of-day profile in effect now, if any."""
+    profile = profile_at(profiles, datetime.now())
+    if profile is not None:
+        camera.apply_profile(profile)
+
+
+def with_profiles(cycle: CycleFn, camera: MeisenCamera, profiles: list[Profile]) -> CycleFn:
+    """Wrap a daemon cycle so the camera follows the time-of-day profiles."""
+    if not profiles:
+        return cycle
+
+    def run() -> dict[str, float]:
+        apply_profile(camera, profiles)
+        return cycle()
+
+    return run
+
+
+def run_cycle(
+    camera: MeisenCamera,
+    uploads: UploadWorker,
+    scheduler: AdaptiveScheduler | None = None,
+) -> dict[str, float]:
+    """Capture and score one image, queueing it for upload on motion.
+
+    With a ``scheduler`` the score also sets the next capture interval,
+    and the sensor is only kept streaming while captures are frequent.
+
+    Returns the duration of each stage in seconds.
+    """
+    timings: dict[str, float] = {}
+
+    # with bursts the sensor keeps running from the trigger still through the burst
+    with camera.running() if config.BURST_FRAMES > 0 else nullcontext():
+        logging.info("Capturing image")
+        started = time.monotonic()
+        frame = camera.capture_frame()
+        timings["capture"] = time.monotonic() - started
+
+        logging.info("Detecting motion")
+        started = time.monotonic()
+        score = detect_motion(frame, REFERENCE_FILE)
+        mode = 1 if score > config.MOTION_THRESHOLD else 0
+        timings["motion"] = time.monotonic() - started
+
+        logging.info("Timestamp: %s  Score: %.2f  Mode: %d", frame.timestamp, score, mode)
+
+        if mode < 1 or not is_duplicate(last_pixels(REFERENCE_FILE)):
+            _queue_upload(camera, uploads, frame, score, mode, timings)
+
+    if scheduler is not None:
+        if scheduler.observe(score) > config.SCHEDULE_STREAM_MAX_INTERVAL_S:
+            camera.stop_stream()
+        else:
+            camera.start_stream()
+    return timings
+
+
+def analyse_frame(frame: Frame) -> tuple[Frame, float] | None:
+    """Pipeline stage: score a frame, passing it on only on new motion."""
+    score = detect_motion(frame, REFERENCE_FILE)
+    mode = 1 if score > config.MOTION_THRESHOLD else 0
+    logging.info("Timestamp: %s  Score: %.2f  Mode: %d", frame.timestamp, score, mode)
+    if mode < 1 or is_duplicate(last_pixels(REFERENCE_FILE)):
+        return None
+    return frame, score
+
+
+def spool_frame(uploads: UploadWorker, item: tuple[Frame, float]) -> None:
+    """Pipeline stage: encode a motion frame and queue it for upload."""
+    frame, score = item
+    uploads.enqueue_bytes(
+        frame.jpeg, remote_filename(1, frame.captured_at), f"{frame.timestamp};{score};1"
+    )
+
+
+def create_pipeline(uploads: UploadWorker) -> Pipeline:
+    """Analysis on one thread (the reference frame is sequential), encoding on several."""
+    return Pipeline(
+        [
+            Stage("analyse", analyse_frame, maxsize=config.PIPELINE_QUEUE_SIZE),
+            Stage(
+                "spool",
+                functools.partial(spool_frame, uploads),
+                workers=config.PIPELINE_ENCODE_WORKERS,
+                maxsize=config.PIPELINE_QUEUE_SIZE,
+            ),
+        ]
+    )
+
+
+def run_pipeline_cycle(camera: MeisenCamera, pipeline: Pipeline) -> dict[str, float]:
+    """Capture one still and hand it to the pipeline without waiting for the result."""
+    started = time.monotonic()
+    pipeline.submit(camera.capture_frame())
+    return {"capture": time.monotonic() - started}
+
+
+def run_stream_cycle(
+    camera: MeisenCamera,
+    detector: MotionDetector,
+    uploads: UploadWorker,
+    prebuffer: FrameRing | None = None,
+) -> dict[str, float]:
+    """Score one lores frame and capture/upload a full still only on motion.
+
+    If ``prebuffer`` is given, idle lores frames are kept in it and the
+    frames from just before a trigger are uploaded with the event.
+
+    Requires the camera to be streaming.  Returns the duration of each
+    stage in seconds.
+    """
+    timings: dict[str, float] = {}
+
+    started = time.monotonic()
+    captured_at = datetime.now()
+    plane = camera.capture_lores()
+    timings["lores"] = time.monotonic() - started
+
+    started = time.monotonic()
+    score = detector.score_plane(plane, camera.lores_size)
+    timings["motion"] = time.monotonic() - started
+
+    if score <= config.MOTION_THRESHOLD:
+        if prebuffer is not None:
+            prebuffer.append((captured_at, plane), len(plane))
+        return timings
+    if is_duplicate(detector.last_pixels):
+        return timings
+
+    started = time.monotonic()
+    frame = camera.capture_frame()
+    timings["capture"] = time.monotonic() - started
+
+    logging.info("Timestamp: %s  Score: %.2f  Mode: %d", frame.timestamp, score, 1)
+    if prebuffer is not None and len(prebuffer):
+        _queue_prebuffer(camera, uploads, prebuffer, timings)
+    _queue_upload(camera, uploads, frame, score, 1, timings)
+    return timings
+
+
+def _queue_prebuffer(
+    camera: MeisenCamera,
+    uploads: UploadWorker,
+    prebuffer: FrameRing,
+    timings: dict[str, float],
+) -> None:
+    """Encode and queue the buffered frames from just before a trigger.
+
+    They carry no log record: the event is logged once, with the trigger still.
+    """
+    started = time.monotonic()
+    frames = prebuffer.drain()
+    # p1 is the frame right before the trigger, p2 the one before that, ...
+    for back, (when, plane) in enumerate(reversed(frames), start=1):
+        filename = remote_filename(1, when, f"p{back}")
+        uploads.enqueue_bytes(camera.encode_lores(plane), filename)
+    timings["prebuffer"] = time.monotonic() - started
+    logging.info("Queued %d pre-motion frame(s)", len(frames))
+
+
+def is_duplicate(pixels: bytes | None) -> bool:
+    """True if a motion frame looks like one uploaded recently (see :mod:`~meisencam.dedup`)."""
+    if not config.DEDUP_ENABLED or pixels is None:
+        return False
+    size = (config.MOTION_COMPARE_SIZE_W, config.MOTION_COMPARE_SIZE_H)
+    if should_upload(pixels, size, DEDUP_FILE):
+        return False
+    logging.info("Near-duplicate of a recent upload, skipping")
+    metrics.inc("dedup_skipped")
+    return True
+
+
+def _queue_upload(
+    camera: MeisenCamera,
+    uploads: UploadWorker,
+    frame: Frame,
+    score: float,
+    mode: int,
+    timings: dict[str, float],
+) -> None:
+    """Queue a still for upload on motion; only then is it encoded and written to the spool."""
+    if mode < 1:
+        logging.info("No motion (mode=%d), skipping upload", mode)
+        return
+
+    if config.BURST_FRAMES > 0:
+        _queue_burst(camera, uploads, frame, score, mode, timings)
+        return
+
+    logging.info("Queueing image for upload")
+    started = time.monotonic()
+    uploads.enqueue_bytes(
+        frame.jpeg,
+        remote_filename(mode, frame.captured_at),
+        f"{frame.timestamp};{score};{mode}",
+    )
+    timings["spool"] = time.monotonic() - started
+
+
+def _queue_burst(
+    camera: MeisenCamera,
+    uploads: UploadWorker,
+    frame: Frame,
+    score: float,
+    mode: int,
+    timings: dict[str, float],
+) -> None:
+    """Grab a burst after the trigger still and queue the selected frames."""
+    started = time.monotonic()
+    frames = [frame, *camera.capture_burst(config.BURST_FRAMES)]
+    timings["burst"] = time.monotonic() - started
+
+    started = time.monotonic()
+    chosen = select_frames(frames, config.BURST_SELECT)
+    for position, index in enumerate(chosen):
+        tag = f"b{index}" if len(chosen) > 1 else None
+        # the event is logged once, with the first frame queued
+        meta = f"{frame.timestamp};{score};{mode}" if position == 0 else ""
+        # encoded only now, with the upload settings like every other still
+        uploads.enqueue_bytes(
+            frames[index].jpeg, remote_filename(mode, frames[index].captured_at, tag), meta
+        )
+    timings["spool"] = time.monotonic() - started
 
 
 def main(argv: list[str] | None = None) -> None:
-    parser = argparse.ArgumentParser(description="Meisencam bird camera")
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["replay"]:
+        replay_main(argv[1:])
+        return
+    if argv[:1] == ["archive"]:
+        archive_main(argv[1:])
+        return
+    if argv[:1] == ["digest"]:
+        digest_main(argv[1:])
+        return
+    if argv[:1] == ["collector"]:
+        collector_main(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Meisencam bird camera",
+        epilog="Use 'meisencam replay DIR' to replay stored images offline, "
+        "'meisencam archive' to list or extract archived frames, "
+        "'meisencam digest' to build a day's contact sheets and timelapse and "
+        "'meisencam collector' to receive the frames of several birdhouses.",
+    )
     parser.add_argument(
         "-t", "--test", action="store_true", help="capture a single test image and exit"
     )
@@ -27,32 +365,131 @@ def main(argv: list[str] | None = None) -> None:
         default=CURRENT_IMAGE,
         help="output path for test image (default: %(default)s)",
     )
+    parser.add_argument(
+        "-d",
+        "--daemon",
+        action="store_true",
+        help="keep the camera open and capture repeatedly until SIGTERM",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=config.CAPTURE_INTERVAL_S,
+        help="seconds between capture cycles in daemon mode (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        help="daemon mode that scores lores frames continuously and only "
+        "captures a full still on motion",
+    )
+    parser.add_argument(
+        "-p",
+        "--pipeline",
+        action="store_true",
+        help="daemon mode that keeps capturing every --interval while earlier "
+        "frames are scored and encoded on worker threads",
+    )
     args = parser.parse_args(argv)
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    if config.METRICS_ENABLED and not args.test:
+        metrics.enable(METRICS_FILE)
 
     camera = MeisenCamera()
+    profiles = load_profiles()
+    apply_profile(camera, profiles)
 
     if args.test:
         timestamp = camera.capture(args.output)
         logging.info("Test image saved to %s at %s", args.output, timestamp)
         return
 
-    logging.info("Capturing image")
-    timestamp = camera.capture(CURRENT_IMAGE)
+    uploads = create_upload_worker()
+    pipeline = None
 
-    logging.info("Detecting motion")
-    score = detect_motion(CURRENT_IMAGE, OLD_IMAGE)
-    mode = 1 if score > config.MOTION_THRESHOLD else 0
-
-    logging.info("Timestamp: %s  Score: %.2f  Mode: %d", timestamp, score, mode)
-
-    logging.info("Uploading image")
-    response = upload_image(CURRENT_IMAGE, mode)
+    if args.stream:
+        detector = MotionDetector()
+        prebuffer = (
+            FrameRing(config.PREBUFFER_FRAMES, config.PREBUFFER_MAX_BYTES)
+            if config.PREBUFFER_FRAMES > 0
+            else None
+        )
+        daemon = Daemon(
+            with_profiles(
+                lambda: run_stream_cycle(camera, detector, uploads, prebuffer), camera, profiles
+            ),
+            config.STREAM_INTERVAL_S,
+        )
+        interval = config.STREAM_INTERVAL_S
+    elif args.pipeline:
+        if config.BURST_FRAMES > 0:
+            logging.warning("Bursts are not taken in pipeline mode")
+        pipeline = create_pipeline(uploads)
+        daemon = Daemon(
+            with_profiles(lambda: run_pipeline_cycle(camera, pipeline), camera, profiles),
+            args.interval,
+        )
+        interval = args.interval
+    elif args.daemon and config.SCHEDULE_ADAPTIVE:
+        scheduler = AdaptiveScheduler()
+        daemon = Daemon(
+            with_profiles(lambda: run_cycle(camera, uploads, scheduler), camera, profiles),
+            scheduler.interval,
+            next_interval=lambda: scheduler.interval,
+        )
+        interval = scheduler.interval
+    elif args.daemon:
+        daemon = Daemon(
+            with_profiles(lambda: run_cycle(camera, uploads), camera, profiles), args.interval
+        )
+        interval = args.interval
+    else:
+        started = time.monotonic()
+        timings = run_cycle(camera, uploads)
+        # also retries frames left over from earlier runs
+        uploaded = uploads.drain(config.UPLOAD_DRAIN_TIMEOUT_S)
+        logging.info("Uploaded %d image(s), %d queued", uploaded, len(uploads.spool))
+        if uploads.archive is not None:
+            uploads.archive.close()
+        metrics.observe("cycle", time.monotonic() - started)
+        metrics.observe_stages(timings, "cycle_")
+        metrics.flush()
+        return
 
-    if response is not None:
-        with open(LOG_FILE, "a") as f:
-            f.write(f"{timestamp};{score};{mode};{response.text}\n")
+    server = None
+    if config.METRICS_ENABLED and config.METRICS_PORT:
+        server = metrics.serve(config.METRICS_PORT)
+    daemon.install_signal_handlers()
+    logging.info("Starting daemon (interval %.2fs)", interval)
+    uploads.start()
+    if pipeline is not None:
+        pipeline.start()
+    try:
+        # keep the sensor running between captures instead of settling every cycle
+        camera.start_stream()
+        daemon.run()
+    finally:
+        camera.close()
+        if pipeline is not None:
+            # frames already captured are still scored and spooled
+            pipeline.close(timeout=config.UPLOAD_TIMEOUT_S)
+        uploads.stop(timeout=config.UPLOAD_TIMEOUT_S)
+        if uploads.archive is not None:
+            uploads.archive.close()
+        metrics.flush()
+        if server is not None:
+            server.shutdown()
+    stats = uploads.metrics
+    logging.info(
+        "Daemon stopped (%d uploaded, %d failed attempts, %d evicted, %d still queued)",
+        stats.uploaded,
+        stats.failures,
+        stats.evicted,
+        stats.queue_depth,
+    )
 
 
 if __name__ == "__main__":
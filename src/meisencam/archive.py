@@ -0,0 +1,306 @@
+"""Durable on-device frame archive with a time index.
+
+The ramdisk spool only bridges short outages: it holds a few dozen frames
+and is lost on power-off.  The archive keeps every motion frame on the SD
+card (or a USB stick), so nothing is lost during a long outage and past
+frames can be looked up by time.
+
+Layout of the archive directory::
+
+    000001.seg   JPEG frames appended back to back
+    000001.idx   one fixed-size entry per frame (time, offset, length, name, meta)
+    000002.seg   next segment, started once the previous one is full
+    ...
+    uploaded     names of archived frames known to be uploaded, one per line
+
+Frames are buffered in memory and written in batches, so the card sees
+few, sequential writes: a segment and its index only ever grow at the
+end.  When the archive exceeds its size limit the oldest segments are
+deleted as a whole.
+
+Frames that never made it to the share (evicted from the full spool,
+or still failing when the process ended) are returned by
+:meth:`FrameArchive.pending` and fed back into the spool in batches by
+the upload worker once it is idle again.
+"""
+
+import argparse
+import logging
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from meisencam import config
+
+logger = logging.getLogger(__name__)
+
+_INDEX_MAGIC = b"MCIDX1"
+# capture time, offset and length in the segment, remote filename, spool meta
+_ENTRY = struct.Struct("<dII40s64s")
+UPLOADED_FILE = "uploaded"
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """Location and description of one archived frame."""
+
+    timestamp: float
+    filename: str
+    meta: str
+    segment: int
+    offset: int
+    length: int
+
+    @property
+    def captured_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp)
+
+
+def _pack(entry: ArchiveEntry) -> bytes:
+    return _ENTRY.pack(
+        entry.timestamp,
+        entry.offset,
+        entry.length,
+        entry.filename.encode()[:40],
+        entry.meta.encode()[:64],
+    )
+
+
+def _unpack(data: bytes, segment: int) -> Iterator[ArchiveEntry]:
+    for timestamp, offset, length, name, meta in _ENTRY.iter_unpack(data):
+        yield ArchiveEntry(
+            timestamp,
+            name.rstrip(b"\0").decode(),
+            meta.rstrip(b"\0").decode(),
+            segment,
+            offset,
+            length,
+        )
+
+
+class FrameArchive:
+    """Append-only segmented frame store bounded to ``max_bytes``."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = config.ARCHIVE_MAX_BYTES,
+        segment_bytes: int = config.ARCHIVE_SEGMENT_BYTES,
+        flush_bytes: int = config.ARCHIVE_FLUSH_BYTES,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.flush_bytes = flush_bytes
+        self.dropped_pending = 0
+        self._lock = threading.RLock()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._entries: list[ArchiveEntry] = []
+        self._segment_sizes: dict[int, int] = {}
+        self._buffer: list[tuple[ArchiveEntry, bytes]] = []
+        self._buffered_bytes = 0
+        self._load()
+        self._uploaded = self._load_uploaded()
+
+    # -- paths -----------------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:06d}.seg"
+
+    def _index_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:06d}.idx"
+
+    # -- loading ---------------------------------------------------------------
+
+    def _load(self) -> None:
+        for index_path in sorted(self.directory.glob("*.idx")):
+            segment = int(index_path.stem)
+            data = index_path.read_bytes()
+            if not data.startswith(_INDEX_MAGIC):
+                logger.warning("Ignoring unreadable archive index %s", index_path)
+                continue
+            body = data[len(_INDEX_MAGIC) :]
+            # a torn last entry (power loss during a flush) is dropped
+            body = body[: len(body) - len(body) % _ENTRY.size]
+            size = self._segment_path(segment).stat().st_size
+            entries = [e for e in _unpack(body, segment) if e.offset + e.length <= size]
+            self._entries.extend(entries)
+            self._segment_sizes[segment] = size
+
+    def _load_uploaded(self) -> set[str]:
+        try:
+            return set((self.directory / UPLOADED_FILE).read_text().split())
+        except FileNotFoundError:
+            return set()
+
+    # -- writing ---------------------------------------------------------------
+
+    @property
+    def _current_segment(self) -> int:
+        return max(self._segment_sizes, default=0)
+
+    def append(self, data: bytes, filename: str, meta: str = "", when: float | None = None) -> None:
+        """Buffer a frame; it is written with the next batch."""
+        with self._lock:
+            self._append(data, filename, meta, when)
+
+    def _append(self, data: bytes, filename: str, meta: str, when: float | None) -> None:
+        segment = self._current_segment
+        size = self._segment_sizes.get(segment, 0) + sum(
+            len(d) for e, d in self._buffer if e.segment == segment
+        )
+        if segment == 0 or size >= self.segment_bytes:
+            segment += 1
+            size = 0
+            self._segment_sizes[segment] = 0
+        entry = ArchiveEntry(
+            when if when is not None else time.time(), filename, meta, segment, size, len(data)
+        )
+        self._buffer.append((entry, data))
+        self._buffered_bytes += len(data)
+        if self._buffered_bytes >= self.flush_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered frames: one sequential append per touched segment and index."""
+        with self._lock:
+            if self._buffer:
+                self._flush()
+
+    def _flush(self) -> None:
+        by_segment: dict[int, list[tuple[ArchiveEntry, bytes]]] = {}
+        for entry, data in self._buffer:
+            by_segment.setdefault(entry.segment, []).append((entry, data))
+
+        for segment, items in by_segment.items():
+            index_path = self._index_path(segment)
+            with open(self._segment_path(segment), "ab") as seg:
+                seg.write(b"".join(data for _, data in items))
+            with open(index_path, "ab") as idx:
+                header = b"" if idx.tell() else _INDEX_MAGIC
+                idx.write(header + b"".join(_pack(entry) for entry, _ in items))
+            self._segment_sizes[segment] = self._segment_path(segment).stat().st_size
+            self._entries.extend(entry for entry, _ in items)
+
+        logger.debug("Archived %d frame(s), %d bytes", len(self._buffer), self._buffered_bytes)
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        total = sum(self._segment_sizes.values())
+        removed = False
+        while total > self.max_bytes and len(self._segment_sizes) > 1:
+            oldest = min(self._segment_sizes)
+            dropped = [e for e in self._entries if e.segment == oldest]
+            lost = sum(1 for e in dropped if e.filename not in self._uploaded)
+            if lost:
+                logger.warning("Archive full, dropping %d frame(s) never uploaded", lost)
+                self.dropped_pending += lost
+            self._segment_path(oldest).unlink(missing_ok=True)
+            self._index_path(oldest).unlink(missing_ok=True)
+            total -= self._segment_sizes.pop(oldest)
+            self._entries = [e for e in self._entries if e.segment != oldest]
+            self._uploaded.difference_update(e.filename for e in dropped)
+            removed = True
+        if removed:
+            self._rewrite_uploaded()
+
+    def _rewrite_uploaded(self) -> None:
+        path = self.directory / UPLOADED_FILE
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text("".join(f"{name}\n" for name in sorted(self._uploaded)))
+        os.replace(tmp, path)
+
+    def mark_uploaded(self, filename: str) -> None:
+        """Record that ``filename`` reached the share (appends one line)."""
+        with self._lock:
+            if filename in self._uploaded:
+                return
+            self._uploaded.add(filename)
+            with open(self.directory / UPLOADED_FILE, "a") as f:
+                f.write(f"{filename}\n")
+
+    def close(self) -> None:
+        self.flush()
+
+    # -- reading ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._buffer)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._segment_sizes.values()) + self._buffered_bytes
+
+    def read(self, entry: ArchiveEntry) -> bytes:
+        """Return the JPEG bytes of an archived frame."""
+        with open(self._segment_path(entry.segment), "rb") as f:
+            f.seek(entry.offset)
+            return f.read(entry.length)
+
+    def query(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> list[ArchiveEntry]:
+        """Archived frames captured in ``[start, end)``, oldest first."""
+        lo = start.timestamp() if start is not None else float("-inf")
+        hi = end.timestamp() if end is not None else float("inf")
+        with self._lock:
+            self.flush()
+            entries = [e for e in self._entries if lo <= e.timestamp < hi]
+        return sorted(entries, key=lambda e: e.timestamp)
+
+    def pending(self, limit: int | None = None) -> list[ArchiveEntry]:
+        """Archived frames not known to be uploaded, oldest first.
+
+        Frames still buffered in memory are left out: they were enqueued
+        moments ago and are still in the spool, and flushing here would
+        turn every idle check of the upload worker into a card write.
+        """
+        with self._lock:
+            entries = [e for e in self._entries if e.filename not in self._uploaded]
+        return sorted(entries, key=lambda e: e.timestamp)[:limit]
+
+
+def open_archive() -> FrameArchive | None:
+    """The configured archive, or None when ``MEISENCAM_ARCHIVE_DIR`` is unset."""
+    if not config.ARCHIVE_DIR:
+        return None
+    return FrameArchive(Path(config.ARCHIVE_DIR))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="meisencam archive", description="List or extract archived frames by time"
+    )
+    parser.add_argument("--dir", type=Path, default=config.ARCHIVE_DIR or None)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="e.g. 2026-02-21T06:00")
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("--pending", action="store_true", help="only frames not yet uploaded")
+    parser.add_argument("--extract", type=Path, metavar="DIR", help="write the frames here")
+    args = parser.parse_args(argv)
+    if args.dir is None:
+        parser.error("no archive directory (set MEISENCAM_ARCHIVE_DIR or use --dir)")
+
+    archive = FrameArchive(args.dir)
+    archive.flush()
+    entries = archive.query(args.since, args.until)
+    if args.pending:
+        pending = {e.filename for e in archive.pending()}
+        entries = [e for e in entries if e.filename in pending]
+    if args.extract:
+        args.extract.mkdir(parents=True, exist_ok=True)
+    for entry in entries:
+        print(f"{entry.captured_at.isoformat(timespec='seconds')}  {entry.filename}  {entry.meta}")
+        if args.extract:
+            (args.extract / entry.filename).write_bytes(archive.read(entry))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Adaptive per-pixel background model for motion detection.
+
+Instead of a single reference frame and one global noise gate, every
+pixel of the comparison grid keeps an exponentially decaying running
+mean and variance.  A pixel counts as changed when it deviates from its
+mean by more than ``sigma`` standard deviations (but never less than
+``min_threshold``), so pixels that flicker under IR at night get a
+higher gate than the calm parts of the frame.
+
+Updating the model costs one pass over the grid per frame.  As with the
+scoring backends, a NumPy implementation is used when available and a
+pure-Python one serves as fallback; both store the model as two
+``float32`` arrays.
+"""
+
+from array import array
+
+from meisencam.scoring import np
+
+
+class PythonBackground:
+    """Background model on :class:`array.array` buffers."""
+
+    def __init__(self, mean: array, var: array):
+        self.mean = mean
+        self.var = var
+
+    @classmethod
+    def seed(cls, pixels: bytes, var: float) -> "PythonBackground":
+        """Start a model at ``pixels`` with a uniform initial variance."""
+        return cls(array("f", list(pixels)), array("f", [var]) * len(pixels))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PythonBackground":
+        values = array("f")
+        values.frombytes(data)
+        half = len(values) // 2
+        return cls(values[:half], values[half:])
+
+    def to_bytes(self) -> bytes:
+        return self.mean.tobytes() + self.var.tobytes()
+
+    def __len__(self) -> int:
+        return len(self.mean)
+
+    def changed(self, pixels: bytes, sigma: float, min_threshold: float) -> list[bool]:
+        """Per-pixel flags: deviation from the mean beyond the pixel's noise gate."""
+        k2, floor = sigma * sigma, min_threshold * min_threshold
+        return [
+            (p - m) * (p - m) > max(k2 * v, floor)
+            for p, m, v in zip(pixels, self.mean, self.var)
+        ]
+
+    def count(self, mask: list[bool], index: tuple[int, ...] | None = None) -> int:
+        if index is None:
+            return sum(mask)
+        return sum(1 for i in index if mask[i])
+
+    def update(self, pixels: bytes, alpha: float) -> None:
+        """Blend a frame into the running mean and variance."""
+        mean, var = self.mean, self.var
+        for i, p in enumerate(pixels):
+            d = p - mean[i]
+            mean[i] += alpha * d
+            var[i] = (1.0 - alpha) * (var[i] + alpha * d * d)
+
+    def reset_mean(self, pixels: bytes) -> None:
+        """Move the mean to ``pixels`` while keeping the learned noise."""
+        self.mean = array("f", list(pixels))
+
+    def mean_pixels(self) -> bytes:
+        """The mean rounded to an 8-bit grid, e.g. for heatmaps."""
+        return bytes(min(255, max(0, round(m))) for m in self.mean)
+
+
+class NumpyBackground:
+    """Vectorised background model on ``float32`` arrays."""
+
+    def __init__(self, mean, var):
+        self.mean = mean
+        self.var = var
+
+    @staticmethod
+    def _frame(pixels: bytes):
+        return np.frombuffer(pixels, dtype=np.uint8).astype(np.float32)
+
+    @classmethod
+    def seed(cls, pixels: bytes, var: float) -> "NumpyBackground":
+        mean = cls._frame(pixels)
+        return cls(mean, np.full_like(mean, var))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "NumpyBackground":
+        values = np.frombuffer(data, dtype=np.float32).copy()
+        half = len(values) // 2
+        return cls(values[:half], values[half:])
+
+    def to_bytes(self) -> bytes:
+        return self.mean.tobytes() + self.var.tobytes()
+
+    def __len__(self) -> int:
+        return len(self.mean)
+
+    def changed(self, pixels: bytes, sigma: float, min_threshold: float):
+        d = self._frame(pixels) - self.mean
+        return d * d > np.maximum(sigma * sigma * self.var, min_threshold * min_threshold)
+
+    def count(self, mask, index=None) -> int:
+        return int(np.count_nonzero(mask if index is None else mask[index]))
+
+    def update(self, pixels: bytes, alpha: float) -> None:
+        d = self._frame(pixels) - self.mean
+        self.mean += alpha * d
+        self.var += alpha * d * d
+        self.var *= 1.0 - alpha
+
+    def reset_mean(self, pixels: bytes) -> None:
+        self.mean = self._frame(pixels)
+
+    def mean_pixels(self) -> bytes:
+        return np.clip(np.rint(self.mean), 0, 255).astype(np.uint8).tobytes()
+
+
+def background_class(backend: str) -> type:
+    """Model implementation matching a scoring backend name."""
+    return NumpyBackground if backend == "numpy" else PythonBackground
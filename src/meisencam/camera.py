@@ -1,20 +1,43 @@
 """Camera control module wrapping Picamera2."""
 
+import io
 import logging
-import subprocess
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import Any, TypeVar
 
-from picamera2 import Picamera2
+from PIL import Image
 
-from meisencam import config
+from meisencam import config, metrics
+from meisencam.frame import Frame
+from meisencam.gpio import IrLed, StubLed, open_ir_led
+from meisencam.ring import FrameRing
+from meisencam.schedule import Profile
+from meisencam.sensor import SimulatedSensor, open_sensor
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Relative deviation from the requested exposure/gain accepted as settled
+SETTLE_TOLERANCE = 0.05
+# Consecutive frames that must match before the sensor counts as settled
+SETTLE_STABLE_FRAMES = 2
+
 
 class MeisenCamera:
-    """Wrapper around Picamera2 for still image capture."""
+    """Wrapper around Picamera2 for still image capture.
+
+    The sensor comes from :func:`~meisencam.sensor.open_sensor` unless
+    one is passed in; a simulated sensor gets a no-op IR LED.
+
+    The duration of each phase of the last start/capture (``led``,
+    ``start``, ``settle``, ``capture``, ``stop``) is kept in
+    :attr:`last_timings` and logged.
+    """
 
     def __init__(
         self,
@@ -26,6 +49,11 @@ class MeisenCamera:
         contrast: float = config.CAMERA_CONTRAST,
         saturation: float = config.CAMERA_SATURATION,
         sharpness: float = config.CAMERA_SHARPNESS,
+        lores_width: int = config.LORES_WIDTH,
+        lores_height: int = config.LORES_HEIGHT,
+        settle_max_wait: float = config.SETTLE_MAX_WAIT_S,
+        ir_led: IrLed | None = None,
+        sensor: Any = None,
     ):
         self.width = width
         self.height = height
@@ -35,15 +63,25 @@ class MeisenCamera:
         self.contrast = contrast
         self.saturation = saturation
         self.sharpness = sharpness
+        self.lores_size = (lores_width, lores_height)
+        self.settle_max_wait = settle_max_wait
+        self.streaming = False
+        self.ir_enabled = True
+        self.profile: Profile | None = None
+        self.last_timings: dict[str, float] = {}
 
-        self._camera = Picamera2()
-        time.sleep(1)
+        self._camera = sensor if sensor is not None else open_sensor()
+        if ir_led is None:
+            ir_led = StubLed() if isinstance(self._camera, SimulatedSensor) else open_ir_led()
+        self._ir_led = ir_led
         self._configure()
         logger.info("Camera configured (%dx%d)", self.width, self.height)
 
     def _configure(self) -> None:
         conf = self._camera.create_still_configuration(
-            main={"size": (self.width, self.height)}
+            # "BGR888" is R, G, B byte order in numpy arrays, as Pillow expects
+            main={"size": (self.width, self.height), "format": "BGR888"},
+            lores={"size": self.lores_size, "format": "YUV420"},
         )
         self._camera.configure(conf)
         self._camera.set_controls(
@@ -60,28 +98,220 @@ class MeisenCamera:
             }
         )
 
-    @staticmethod
-    def _set_ir_led(on: bool) -> None:
-        state = "dh" if on else "dl"
-        subprocess.run(
-            ["pinctrl", "set", str(config.IR_LED_GPIO), "op", state],
-            check=False,
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.last_timings[name] = secs = time.monotonic() - started
+            metrics.observe(f"camera_{name}", secs)
+
+    def _log_timings(self) -> None:
+        phases = " ".join(f"{name}={secs:.3f}s" for name, secs in self.last_timings.items())
+        logger.info("Camera phases: %s", phases)
+
+    def _is_settled(self, metadata: dict) -> bool:
+        exposure = metadata.get("ExposureTime")
+        gain = metadata.get("AnalogueGain")
+        if exposure is None or gain is None:
+            return False
+        return (
+            abs(exposure - self.exposure_time) <= SETTLE_TOLERANCE * self.exposure_time
+            and abs(gain - self.analogue_gain) <= SETTLE_TOLERANCE * self.analogue_gain
         )
-        logger.info("IR LED %s", "on" if on else "off")
+
+    def _wait_settled(self) -> int:
+        """Wait until frame metadata shows the requested exposure and gain.
+
+        Returns after :data:`SETTLE_STABLE_FRAMES` consecutive matching
+        frames, or after ``settle_max_wait`` seconds with a warning.
+        Returns the number of frames inspected.
+        """
+        deadline = time.monotonic() + self.settle_max_wait
+        frames = stable = 0
+        while True:
+            metadata = self._camera.capture_metadata()
+            frames += 1
+            stable = stable + 1 if self._is_settled(metadata) else 0
+            if stable >= SETTLE_STABLE_FRAMES:
+                return frames
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    "Sensor not settled after %.1fs (%d frames; exposure %s, gain %s)",
+                    self.settle_max_wait,
+                    frames,
+                    metadata.get("ExposureTime"),
+                    metadata.get("AnalogueGain"),
+                )
+                return frames
+
+    def apply_profile(self, profile: Profile) -> None:
+        """Switch exposure, gain and IR LED to a time-of-day profile.
+
+        A no-op if the profile is already active.  While streaming the new
+        settings take effect immediately and the sensor is settled again.
+        """
+        if profile == self.profile:
+            return
+        self.profile = profile
+        self.exposure_time = profile.exposure_time
+        self.analogue_gain = profile.analogue_gain
+        self.ir_enabled = profile.ir_led
+        self._camera.set_controls(
+            {"ExposureTime": self.exposure_time, "AnalogueGain": self.analogue_gain}
+        )
+        logger.info(
+            "Camera profile %s (exposure %dus, gain %.1f, IR %s)",
+            profile.name,
+            self.exposure_time,
+            self.analogue_gain,
+            "on" if self.ir_enabled else "off",
+        )
+        if self.streaming:
+            self._ir_led.set(self.ir_enabled)
+            with self._phase("settle"):
+                self._wait_settled()
+
+    def _start(self) -> None:
+        with self._phase("led"):
+            self._ir_led.set(self.ir_enabled)
+        with self._phase("start"):
+            self._camera.start()
+        with self._phase("settle"):
+            frames = self._wait_settled()
+        logger.debug("Sensor settled after %d frames", frames)
+
+    def _stop(self) -> None:
+        with self._phase("stop"):
+            self._camera.stop()
+            self._ir_led.set(False)
+
+    def start_stream(self) -> None:
+        """Start the sensor and keep it running between captures.
+
+        Used by the long-running modes: settling is paid once, and later
+        captures, lores frames and bursts come from the running sensor.
+        """
+        if self.streaming:
+            return
+        self.last_timings = {}
+        self._start()
+        self.streaming = True
+        self._log_timings()
+        logger.info("Camera streaming (lores %dx%d)", *self.lores_size)
+
+    def stop_stream(self) -> None:
+        if not self.streaming:
+            return
+        self._stop()
+        self.streaming = False
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        """Keep the sensor running for a block of captures, e.g. a trigger still and its burst.
+
+        A stopped camera is started (and settled) once on entry and stopped
+        on exit; a streaming camera is left as it is.
+        """
+        started_here = not self.streaming
+        if started_here:
+            self.start_stream()
+        try:
+            yield
+        finally:
+            if started_here:
+                self.stop_stream()
+
+    def capture_lores(self) -> bytes:
+        """Return the Y (luma) plane of the next lores frame as raw 8-bit bytes.
+
+        Requires :meth:`start_stream`.  The YUV420 buffer holds the full
+        resolution Y plane in its first rows; rows may be padded to the
+        hardware stride, so the plane is cropped to the lores width.
+        """
+        width, height = self.lores_size
+        frame = self._camera.capture_array("lores")
+        return frame[:height, :width].tobytes()
+
+    def encode_lores(self, plane: bytes, quality: int = config.PREBUFFER_JPEG_QUALITY) -> bytes:
+        """Encode a lores Y plane from :meth:`capture_lores` as a grayscale JPEG."""
+        buf = io.BytesIO()
+        Image.frombytes("L", self.lores_size, plane).save(buf, format="JPEG", quality=quality)
+        return buf.getvalue()
+
+    def capture_burst(
+        self, count: int, max_bytes: int | None = config.BURST_MAX_BYTES
+    ) -> list[Frame]:
+        """Grab ``count`` full-resolution frames back to back.
+
+        Frames are taken from the running sensor without stop/start or
+        settling in between; callers keep it running from the trigger still
+        on with :meth:`running` (a stopped camera is started once for the
+        burst).  Raw frames are collected in a ring buffer capped at
+        ``max_bytes`` and returned as unencoded :class:`~meisencam.frame.Frame`
+        objects, so only the frames chosen for upload are ever encoded,
+        with the upload settings.
+
+        Returns the frames, oldest first.
+        """
+        ring: FrameRing = FrameRing(count, max_bytes)
+        with self.running():
+            started = time.monotonic()
+            for _ in range(count):
+                frame = self._camera.capture_array("main")
+                ring.append(Frame(frame, datetime.now()), frame.nbytes)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        logger.info("Burst of %d frames in %.2fs (%.1f fps)", count, elapsed, count / elapsed)
+        return list(ring.drain())
+
+    def _still(self, grab: Callable[[], T]) -> T:
+        """Run ``grab`` on a settled sensor, starting and stopping it if needed.
+
+        If the camera is already streaming, the still is taken from the
+        running sensor without restarting it or waiting for it to settle.
+        """
+        self.last_timings = {}
+        streaming = self.streaming
+        if not streaming:
+            self._start()
+
+        with self._phase("capture"):
+            result = grab()
+
+        if not streaming:
+            self._stop()
+        self._log_timings()
+        return result
 
     def capture(self, output_path: Path) -> str:
-        """Capture a still image.
+        """Capture a still image to a file.
 
         Returns the timestamp string for the capture.
         """
-        self._set_ir_led(True)
-        self._camera.start()
-        time.sleep(5)  # sensor stabilisation
 
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        self._camera.capture_file(str(output_path))
+        def grab() -> str:
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._camera.capture_file(str(output_path))
+            return timestamp
 
-        self._camera.stop()
-        self._set_ir_led(False)
+        timestamp = self._still(grab)
         logger.info("Captured image: %s", output_path)
         return timestamp
+
+    def capture_frame(self) -> Frame:
+        """Capture a still into memory as a :class:`~meisencam.frame.Frame`.
+
+        Nothing is written to the ramdisk; the JPEG is only encoded when
+        the frame is uploaded or saved.
+        """
+        frame = self._still(lambda: Frame(self._camera.capture_array("main")))
+        logger.info("Captured frame at %s", frame.timestamp)
+        return frame
+
+    def close(self) -> None:
+        """Release the camera; used when a long-running process shuts down."""
+        self.stop_stream()
+        self._camera.close()
+        self._ir_led.close()
+        logger.info("Camera closed")
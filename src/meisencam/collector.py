@@ -0,0 +1,621 @@
+"""Collector service receiving the frames of several birdhouses.
+
+Nodes with ``MEISENCAM_COLLECTOR_URL`` set send their motion frames here
+instead of straight to the Nextcloud share.  The collector is a small
+asyncio HTTP/1.1 server (standard library only, runs on any Linux box)
+that accepts:
+
+* ``PUT /public.php/webdav/<filename>``: a WebDAV-compatible upload, so a
+  node can also just point ``MEISENCAM_WEBDAV_BASE`` at the collector
+* ``POST /batch``: a ``multipart/form-data`` request with several frames,
+  each with its ``timestamp;score;mode`` record, as sent by
+  :class:`~meisencam.upload.CollectorUploader`
+* ``GET /events?day=YYYY-MM-DD[&node=NAME]``: the stored frames of a day
+  with their motion scores as JSON, over all birdhouses
+
+The sending node is named by the ``X-Meisencam-Node`` header (its address
+otherwise).  With ``MEISENCAM_COLLECTOR_SECRET`` set, every request must
+carry the secret as its Basic auth user, like the share token; without
+one the collector only listens on loopback.
+
+Frames are stored in one :class:`~meisencam.archive.FrameArchive` per node
+and day (``<store>/<node>/<YYYY-MM-DD>/``), and a request is only
+answered once its frames are flushed, so a batch costs one sequential
+write.  The oldest forwarded days are deleted once the store exceeds
+``MEISENCAM_COLLECTOR_MAX_BYTES``.  A forwarder sends stored frames on to the share
+with the node tagged after the capture time (``<stem>-<node>.jpg``, see
+:func:`forwarded_filename`, so the digest still finds them by day) over a
+pool of keep-alive connections and marks
+them uploaded; frames received while the share is unreachable are
+forwarded once it is back.
+
+Usage:
+    meisencam collector [--host 127.0.0.1] [--port 8080] [--store /var/lib/meisencam]
+        [--no-forward]
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import hmac
+import ipaddress
+import json
+import logging
+import re
+import shutil
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from meisencam import config, metrics
+from meisencam.archive import ArchiveEntry, FrameArchive
+from meisencam.digest import frame_time
+from meisencam.upload import META_HEADER, NODE_HEADER, WebDavUploader
+
+logger = logging.getLogger(__name__)
+
+WEBDAV_PREFIX = "/public.php/webdav/"
+# node and file names become path components; archive entries hold 40-byte names
+_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,39}")
+DAY_FORMAT = "%Y-%m-%d"
+
+
+class HttpError(Exception):
+    """A request that is answered with an error status."""
+
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes
+
+
+@dataclass
+class Upload:
+    """A received frame under its remote filename."""
+
+    filename: str
+    data: bytes
+    meta: str = ""
+
+
+def _check_name(name: str, what: str) -> str:
+    if not _NAME.fullmatch(name):
+        raise HttpError(400, f"invalid {what} {name!r}")
+    return name
+
+
+def _parse_headers(lines: list[bytes]) -> dict[str, str]:
+    headers = {}
+    for line in lines:
+        name, sep, value = line.decode("latin-1").partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def _parse_size(text: bytes, base: int = 10) -> int:
+    """A body or chunk size from the client; garbage and negative sizes are a 400."""
+    try:
+        size = int(text.strip() or b"0", base)
+    except ValueError:
+        raise HttpError(400, f"invalid size {text[:20]!r}") from None
+    if size < 0:
+        raise HttpError(400, f"invalid size {size}")
+    return size
+
+
+async def _read_chunked(reader: asyncio.StreamReader, max_bytes: int) -> bytes:
+    body = bytearray()
+    while size := _parse_size((await reader.readline()).split(b";")[0], 16):
+        if len(body) + size > max_bytes:
+            raise HttpError(413)
+        body += await reader.readexactly(size)
+        await reader.readline()
+    # trailers end with an empty line
+    while (await reader.readline()).strip():
+        pass
+    return bytes(body)
+
+
+async def read_request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_bytes: int
+) -> Request | None:
+    """Read the next request of a connection, or None once the client closed it.
+
+    Clients waiting for ``100 Continue`` before sending a body get it.
+
+    Raises:
+        HttpError: On a malformed request line or body size, or a body over
+            ``max_bytes``.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400) from None
+    lines = []
+    while (line := await reader.readline()).strip():
+        lines.append(line)
+    headers = _parse_headers(lines)
+
+    if headers.get("expect", "").lower() == "100-continue":
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        await writer.drain()
+    if "chunked" in headers.get("transfer-encoding", ""):
+        body = await _read_chunked(reader, max_bytes)
+    else:
+        length = _parse_size(headers.get("content-length", "").encode("latin-1"))
+        if length > max_bytes:
+            raise HttpError(413)
+        body = await reader.readexactly(length)
+    url = urlsplit(target)
+    return Request(method, unquote(url.path), dict(parse_qsl(url.query)), headers, body)
+
+
+def parse_multipart(body: bytes, content_type: str) -> list[Upload]:
+    """Frames of a ``multipart/form-data`` body, one per part with a filename.
+
+    Raises:
+        HttpError: If the body is not multipart or a part is malformed.
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not content_type.startswith("multipart/form-data") or not match:
+        raise HttpError(400, "expected multipart/form-data")
+    delimiter = b"\r\n--" + match.group(1).encode()
+    uploads = []
+    # the first delimiter has no preceding line break; the last one ends with "--"
+    for part in (b"\r\n" + body).split(delimiter)[1:]:
+        if part.startswith(b"--"):
+            break
+        head, sep, data = part.partition(b"\r\n\r\n")
+        if not sep:
+            raise HttpError(400, "malformed multipart part")
+        headers = _parse_headers(head.split(b"\r\n"))
+        disposition = dict(re.findall(r'(\w+)="([^"]*)"', headers.get("content-disposition", "")))
+        if "filename" in disposition:
+            filename = _check_name(disposition["filename"], "filename")
+            uploads.append(Upload(filename, data, headers.get(META_HEADER.lower(), "")))
+    return uploads
+
+
+def forwarded_filename(node: str, filename: str) -> str:
+    """Share filename of a frame from ``node``, e.g. ``2026-02-21-12-00-00-m1-roof.jpg``.
+
+    The node goes after the capture time so the name still sorts and parses
+    like a frame uploaded by the node itself.
+    """
+    path = Path(filename)
+    return f"{path.stem}-{node}{path.suffix}"
+
+
+def _event(node: str, entry: ArchiveEntry) -> dict:
+    score = mode = None
+    fields = entry.meta.split(";")
+    if len(fields) >= 3:
+        try:
+            score, mode = float(fields[1]), int(fields[2])
+        except ValueError:
+            pass
+    return {
+        "node": node,
+        "time": entry.captured_at.isoformat(timespec="seconds"),
+        "filename": entry.filename,
+        "score": score,
+        "mode": mode,
+    }
+
+
+class CollectorStore:
+    """Frame archives partitioned by node and day under ``root``.
+
+    Only partitions that still take frames (today's) or still have frames
+    to forward are kept open; the others are closed and just counted by
+    size.  Once all partitions together exceed ``max_bytes`` the oldest
+    days are deleted as a whole, but never while frames in them wait to
+    be forwarded (with ``forward`` off every partition counts as done).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = config.COLLECTOR_MAX_BYTES,
+        partition_max_bytes: int = config.COLLECTOR_PARTITION_MAX_BYTES,
+        forward: bool = True,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.partition_max_bytes = partition_max_bytes
+        self.forward = forward
+        self._archives: dict[tuple[str, str], FrameArchive] = {}
+        self._sizes: dict[tuple[str, str], int] = {}
+        self._lock = threading.RLock()
+        root.mkdir(parents=True, exist_ok=True)
+        # look at the partitions of earlier runs once; those with frames to forward stay open
+        for directory in sorted(root.glob("*/*")):
+            if directory.is_dir():
+                key = (directory.parent.name, directory.name)
+                self._sizes[key] = self.archive(*key).nbytes
+                self._release_done(key)
+        self._enforce_retention()
+
+    def _open(self, node: str, day: str) -> FrameArchive:
+        return FrameArchive(
+            self.root / node / day,
+            max_bytes=self.partition_max_bytes,
+            segment_bytes=min(config.ARCHIVE_SEGMENT_BYTES, self.partition_max_bytes),
+        )
+
+    def archive(self, node: str, day: str) -> FrameArchive:
+        """The archive of ``node`` for ``day`` (``YYYY-MM-DD``), opened on first use."""
+        with self._lock:
+            key = (node, day)
+            if key not in self._archives:
+                self._archives[key] = self._open(node, day)
+                self._sizes.setdefault(key, 0)
+            return self._archives[key]
+
+    def _done(self, archive: FrameArchive) -> bool:
+        return not self.forward or not archive.pending(1)
+
+    def _release_done(self, key: tuple[str, str]) -> None:
+        """Close a past day's partition once nothing in it is left to forward."""
+        archive = self._archives.get(key)
+        today = date.today().strftime(DAY_FORMAT)
+        if archive is not None and key[1] < today and self._done(archive):
+            archive.close()
+            del self._archives[key]
+
+    def partitions(self) -> list[tuple[str, str]]:
+        """(node, day) of every partition, oldest day first."""
+        with self._lock:
+            return sorted(self._sizes, key=lambda key: (key[1], key[0]))
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def store(self, node: str, uploads: list[Upload]) -> int:
+        """Store frames of ``node`` and flush them; returns the number stored."""
+        with self._lock:
+            touched = {}
+            for upload in uploads:
+                when = frame_time(upload.filename) or datetime.now()
+                key = (node, when.strftime(DAY_FORMAT))
+                self.archive(*key).append(
+                    upload.data, upload.filename, upload.meta, when.timestamp()
+                )
+                touched[key] = self._archives[key]
+            for key, archive in touched.items():
+                archive.flush()
+                self._sizes[key] = archive.nbytes
+            self._enforce_retention()
+        metrics.inc("collector_frames", len(uploads))
+        return len(uploads)
+
+    def _enforce_retention(self) -> None:
+        total = sum(self._sizes.values())
+        for key in self.partitions():
+            if total <= self.max_bytes:
+                return
+            archive = self._archives.get(key)
+            if archive is not None and not self._done(archive):
+                continue
+            if archive is not None:
+                archive.close()
+                del self._archives[key]
+            logger.info("Store over %d bytes, deleting %s/%s", self.max_bytes, *key)
+            directory = self.root / key[0] / key[1]
+            shutil.rmtree(directory, ignore_errors=True)
+            if not any(directory.parent.iterdir()):
+                directory.parent.rmdir()
+            total -= self._sizes.pop(key)
+        if total > self.max_bytes:
+            logger.warning(
+                "Store over %d bytes, but the oldest frames still wait to be forwarded",
+                self.max_bytes,
+            )
+
+    def events(self, day: str, node: str | None = None) -> list[dict]:
+        """The frames stored for ``day`` (of one node, or all) as dicts, in time order."""
+        events = {}
+        for name, partition_day in self.partitions():
+            if partition_day != day or node not in (None, name):
+                continue
+            with self._lock:
+                archive = self._archives.get((name, day)) or self._open(name, day)
+                entries = archive.query()
+            for entry in entries:
+                # a frame sent twice (retried after a lost reply) is listed once
+                events[(name, entry.filename)] = _event(name, entry)
+        return sorted(events.values(), key=lambda event: (event["time"], event["node"]))
+
+    def pending(self, limit: int) -> list[tuple[str, FrameArchive, ArchiveEntry]]:
+        """Up to ``limit`` stored frames not forwarded yet, oldest day first.
+
+        Only open partitions are looked at; past days found fully
+        forwarded are closed on the way.
+        """
+        found: list[tuple[str, FrameArchive, ArchiveEntry]] = []
+        with self._lock:
+            for key in sorted(self._archives, key=lambda key: (key[1], key[0])):
+                archive = self._archives[key]
+                entries = archive.pending(limit - len(found))
+                if not entries:
+                    self._release_done(key)
+                    continue
+                found.extend((key[0], archive, entry) for entry in entries)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def close(self) -> None:
+        with self._lock:
+            for archive in self._archives.values():
+                archive.close()
+
+
+class Forwarder:
+    """Forward stored frames to the share, ``connections`` at a time.
+
+    All uploads go through one :class:`~meisencam.upload.WebDavUploader`,
+    whose pooled session keeps that many connections open, from a pool
+    of as many threads.  After a failure the next round is delayed with
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        store: CollectorStore,
+        uploader: WebDavUploader | None = None,
+        connections: int = config.COLLECTOR_FORWARD_CONNECTIONS,
+        backoff_base: float = 1.0,
+        backoff_max: float = config.UPLOAD_BACKOFF_MAX_S,
+    ):
+        self.store = store
+        self.connections = max(1, connections)
+        self.uploader = uploader or WebDavUploader(pool_size=self.connections)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._executor = ThreadPoolExecutor(self.connections, thread_name_prefix="forward")
+        self._wake: asyncio.Event | None = None
+        self._failures = 0
+
+    def notify(self) -> None:
+        """Wake the forwarder after new frames were stored."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def _forward(self, node: str, archive: FrameArchive, entry: ArchiveEntry) -> bool:
+        name = forwarded_filename(node, entry.filename)
+        try:
+            response = self.uploader.put(archive.read(entry), name)
+        except Exception as exc:
+            logger.warning("Forwarding %s failed: %s", name, exc)
+            return False
+        if not response.ok:
+            logger.warning("Forwarding %s rejected: %d", name, response.status_code)
+            return False
+        archive.mark_uploaded(entry.filename)
+        return True
+
+    async def forward_pending(self) -> tuple[int, int]:
+        """Forward up to two rounds of ``connections`` frames; returns (forwarded, failed)."""
+        loop = asyncio.get_running_loop()
+        batch = await asyncio.to_thread(self.store.pending, 2 * self.connections)
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._forward, *item) for item in batch)
+        )
+        forwarded = sum(results)
+        metrics.inc("collector_forwarded", forwarded)
+        return forwarded, len(results) - forwarded
+
+    async def run(self) -> None:
+        """Forward until cancelled; idle until :meth:`notify` when nothing is pending."""
+        self._wake = asyncio.Event()
+        while True:
+            self._wake.clear()
+            forwarded, failed = await self.forward_pending()
+            if failed:
+                self._failures += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (self._failures - 1))
+                logger.info("Retrying forwarding in %.0fs", delay)
+                await asyncio.sleep(delay)
+            elif forwarded:
+                self._failures = 0
+            else:
+                self._failures = 0
+                await self._wake.wait()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.uploader.close()
+
+
+def _authorized(request: Request, secret: str) -> bool:
+    """Whether the request carries ``secret`` as its Basic auth user, like a share token."""
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        user = base64.b64decode(credentials, validate=True).decode().partition(":")[0]
+    except (binascii.Error, UnicodeDecodeError):
+        return False
+    return hmac.compare_digest(user.encode(), secret.encode())
+
+
+def _response(
+    status: int,
+    body: bytes = b"",
+    content_type: str = "text/plain",
+    headers: dict[str, str] | None = None,
+) -> bytes:
+    head = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        f"Content-Length: {len(body)}",
+    ]
+    if body:
+        head.append(f"Content-Type: {content_type}")
+    head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+class Collector:
+    """The HTTP front end: parses requests and hands frames to the store."""
+
+    def __init__(
+        self,
+        store: CollectorStore,
+        forwarder: Forwarder | None = None,
+        max_request_bytes: int = config.COLLECTOR_MAX_REQUEST_BYTES,
+        secret: str = config.COLLECTOR_SECRET,
+    ):
+        self.store = store
+        self.forwarder = forwarder
+        self.max_request_bytes = max_request_bytes
+        self.secret = secret
+        self._forward_task: asyncio.Task | None = None
+
+    async def start(
+        self, host: str = config.COLLECTOR_HOST, port: int = config.COLLECTOR_PORT
+    ) -> asyncio.Server:
+        """Listen on ``host:port`` (0 picks a free port) and start the forwarder."""
+        server = await asyncio.start_server(self._handle, host or None, port)
+        if self.forwarder is not None:
+            self._forward_task = asyncio.create_task(self.forwarder.run())
+        return server
+
+    async def close(self) -> None:
+        if self._forward_task is not None:
+            self._forward_task.cancel()
+            await asyncio.gather(self._forward_task, return_exceptions=True)
+        if self.forwarder is not None:
+            await asyncio.to_thread(self.forwarder.close)
+        self.store.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        address = peer[0] if peer else "unknown"
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, writer, self.max_request_bytes)
+                    if request is None:
+                        break
+                    status, body = await self.dispatch(request, address)
+                except HttpError as exc:
+                    logger.warning("Request from %s refused: %s", address, exc)
+                    challenge = {"WWW-Authenticate": 'Basic realm="meisencam"'}
+                    headers = challenge if exc.status == 401 else {}
+                    writer.write(_response(exc.status, str(exc).encode(), headers=headers))
+                    await writer.drain()
+                    break
+                writer.write(_response(status, body, "application/json"))
+                await writer.drain()
+                if request.headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Request, address: str) -> tuple[int, bytes]:
+        """Status and JSON body for ``request`` from the client at ``address``.
+
+        Raises:
+            HttpError: For unauthorized requests, unknown paths and invalid uploads.
+        """
+        if self.secret and not _authorized(request, self.secret):
+            raise HttpError(401)
+        if request.method == "GET" and request.path == "/events":
+            day = request.query.get("day") or date.today().strftime(DAY_FORMAT)
+            events = await asyncio.to_thread(self.store.events, day, request.query.get("node"))
+            return 200, json.dumps(events).encode()
+
+        if request.method == "PUT" and request.path.startswith(WEBDAV_PREFIX):
+            filename = _check_name(request.path[len(WEBDAV_PREFIX) :], "filename")
+            uploads = [Upload(filename, request.body, request.headers.get(META_HEADER.lower(), ""))]
+            status = 201
+        elif request.method == "POST" and request.path == "/batch":
+            uploads = parse_multipart(request.body, request.headers.get("content-type", ""))
+            status = 200
+        else:
+            raise HttpError(404 if request.method in ("GET", "PUT", "POST") else 405)
+
+        node = request.headers.get(NODE_HEADER.lower()) or address.replace(":", "-")
+        stored = await asyncio.to_thread(self.store.store, _check_name(node, "node"), uploads)
+        logger.info("Stored %d frame(s) from %s", stored, node)
+        if self.forwarder is not None:
+            self.forwarder.notify()
+        return status, (json.dumps({"stored": stored}).encode() if status == 200 else b"")
+
+
+async def serve(collector: Collector, host: str, port: int) -> None:
+    """Run ``collector`` until SIGTERM or SIGINT."""
+    server = await collector.start(host, port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info("Collector listening on port %d", server.sockets[0].getsockname()[1])
+    async with server:
+        await stop.wait()
+    await collector.close()
+    logger.info("Collector stopped")
+
+
+def _loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="meisencam collector", description="Receive and forward the frames of several nodes"
+    )
+    parser.add_argument(
+        "--host",
+        default=config.COLLECTOR_HOST,
+        help="address to listen on, '' for all (default: %(default)s)",
+    )
+    parser.add_argument("--port", type=int, default=config.COLLECTOR_PORT)
+    parser.add_argument("--store", type=Path, default=Path(config.COLLECTOR_STORE_DIR))
+    parser.add_argument(
+        "--no-forward",
+        dest="forward",
+        action="store_false",
+        default=config.COLLECTOR_FORWARD,
+        help="only store frames, do not forward them to the share",
+    )
+    args = parser.parse_args(argv)
+    if not _loopback(args.host) and not config.COLLECTOR_SECRET:
+        parser.error("set MEISENCAM_COLLECTOR_SECRET to listen beyond loopback")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    store = CollectorStore(args.store, forward=args.forward)
+    forwarder = Forwarder(store) if args.forward else None
+    asyncio.run(serve(Collector(store, forwarder), args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
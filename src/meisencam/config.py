@@ -1,15 +1,19 @@
-"""Centralised configuration loaded from environment / .env file."""
+"""Centralised configuration loaded from environment / .env file.
 
+The parsed ``.env`` is kept as a marshal snapshot next to it and reused
+by later starts until the file's size or modification time changes.
+"""
+
+import marshal
 import os
 from pathlib import Path
 
 ENV_FILE = Path("/mnt/ramdisk/.env")
+ENV_SNAPSHOT = ENV_FILE.with_name(".env.snapshot")
 
 
-def _load_env_file(path: Path = ENV_FILE) -> None:
-    """Load key=value pairs from an env file into os.environ."""
-    if not path.is_file():
-        return
+def _parse_env_file(path: Path) -> dict[str, str]:
+    values = {}
     with open(path) as f:
         for line in f:
             line = line.strip()
@@ -17,18 +21,57 @@ def _load_env_file(path: Path = ENV_FILE) -> None:
                 continue
             key, _, value = line.partition("=")
             if key and value:
-                os.environ.setdefault(key.strip(), value.strip())
+                values[key.strip()] = value.strip()
+    return values
+
+
+def _read_env_file(path: Path, snapshot: Path) -> dict[str, str]:
+    """Key/value pairs of ``path``, from ``snapshot`` if the file is unchanged."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(snapshot, "rb") as f:
+            cached_key, values = marshal.load(f)
+        if cached_key == key:
+            return values
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    values = _parse_env_file(path)
+    tmp = snapshot.with_name(snapshot.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            marshal.dump((key, values), f)
+        os.replace(tmp, snapshot)
+    except OSError:
+        pass  # read-only location: parse again next time
+    return values
+
+
+def _load_env_file(path: Path = ENV_FILE, snapshot: Path = ENV_SNAPSHOT) -> None:
+    """Load key=value pairs from an env file into os.environ."""
+    for key, value in _read_env_file(path, snapshot).items():
+        os.environ.setdefault(key, value)
 
 
 _load_env_file()
 
 
 def _int(key: str, default: int) -> int:
-    return int(os.environ.get(key, default))
+    try:
+        return int(os.environ.get(key, default))
+    except ValueError:
+        raise ValueError(f"{key} must be an integer, got {os.environ[key]!r}") from None
 
 
 def _float(key: str, default: float) -> float:
-    return float(os.environ.get(key, default))
+    try:
+        return float(os.environ.get(key, default))
+    except ValueError:
+        raise ValueError(f"{key} must be a number, got {os.environ[key]!r}") from None
 
 
 # -- Camera ------------------------------------------------------------------
@@ -41,6 +84,44 @@ CAMERA_CONTRAST = _float("MEISENCAM_CONTRAST", 1.6)
 CAMERA_SATURATION = _float("MEISENCAM_SATURATION", 0.1)
 CAMERA_SHARPNESS = _float("MEISENCAM_SHARPNESS", 1.5)
 IR_LED_GPIO = _int("MEISENCAM_IR_LED_GPIO", 21)
+IR_LED_CHIP = os.environ.get("MEISENCAM_IR_LED_CHIP", "/dev/gpiochip0")
+IR_LED_BACKEND = os.environ.get("MEISENCAM_IR_LED_BACKEND", "auto")
+SETTLE_MAX_WAIT_S = _float("MEISENCAM_SETTLE_MAX_WAIT_S", 5.0)
+LORES_WIDTH = _int("MEISENCAM_LORES_WIDTH", 320)
+LORES_HEIGHT = _int("MEISENCAM_LORES_HEIGHT", 240)
+FRAME_JPEG_QUALITY = _int("MEISENCAM_FRAME_JPEG_QUALITY", 90)
+CAMERA_BACKEND = os.environ.get("MEISENCAM_CAMERA_BACKEND", "picamera2")
+CAMERA_REPLAY_DIR = os.environ.get("MEISENCAM_CAMERA_REPLAY_DIR", "sample_images")
+CAMERA_SIM_FPS = _float("MEISENCAM_CAMERA_SIM_FPS", 10.0)
+CAMERA_SIM_MOTION_PERIOD = _int("MEISENCAM_CAMERA_SIM_MOTION_PERIOD", 10)
+CAMERA_SIM_MOTION_FRAMES = _int("MEISENCAM_CAMERA_SIM_MOTION_FRAMES", 3)
+
+# -- Burst --------------------------------------------------------------------
+BURST_FRAMES = _int("MEISENCAM_BURST_FRAMES", 0)
+BURST_SELECT = os.environ.get("MEISENCAM_BURST_SELECT", "sharpest")
+BURST_MAX_BYTES = _int("MEISENCAM_BURST_MAX_BYTES", 64 * 1024 * 1024)
+
+# -- Pre-motion buffer ---------------------------------------------------------
+PREBUFFER_FRAMES = _int("MEISENCAM_PREBUFFER_FRAMES", 0)
+PREBUFFER_MAX_BYTES = _int("MEISENCAM_PREBUFFER_MAX_BYTES", 8 * 1024 * 1024)
+PREBUFFER_JPEG_QUALITY = _int("MEISENCAM_PREBUFFER_JPEG_QUALITY", 85)
+
+# -- Daemon -------------------------------------------------------------------
+CAPTURE_INTERVAL_S = _float("MEISENCAM_CAPTURE_INTERVAL_S", 120.0)
+STREAM_INTERVAL_S = _float("MEISENCAM_STREAM_INTERVAL_S", 0.25)
+
+# -- Schedule -----------------------------------------------------------------
+SCHEDULE_ADAPTIVE = bool(_int("MEISENCAM_SCHEDULE_ADAPTIVE", 0))
+SCHEDULE_MIN_INTERVAL_S = _float("MEISENCAM_SCHEDULE_MIN_INTERVAL_S", 5.0)
+SCHEDULE_MAX_INTERVAL_S = _float("MEISENCAM_SCHEDULE_MAX_INTERVAL_S", 600.0)
+SCHEDULE_BACKOFF = _float("MEISENCAM_SCHEDULE_BACKOFF", 2.0)
+SCHEDULE_HOLD_CYCLES = _int("MEISENCAM_SCHEDULE_HOLD_CYCLES", 6)
+SCHEDULE_STREAM_MAX_INTERVAL_S = _float("MEISENCAM_SCHEDULE_STREAM_MAX_INTERVAL_S", 60.0)
+SCHEDULE_PROFILES = os.environ.get("MEISENCAM_SCHEDULE_PROFILES", "")
+
+# -- Pipeline -----------------------------------------------------------------
+PIPELINE_QUEUE_SIZE = _int("MEISENCAM_PIPELINE_QUEUE_SIZE", 2)
+PIPELINE_ENCODE_WORKERS = _int("MEISENCAM_PIPELINE_ENCODE_WORKERS", 2)
 
 # -- Motion -------------------------------------------------------------------
 MOTION_THRESHOLD = _float("MEISENCAM_MOTION_THRESHOLD", 5.0)
@@ -49,6 +130,38 @@ MOTION_COMPARE_SIZE_H = _int("MEISENCAM_MOTION_COMPARE_SIZE_H", 48)
 MOTION_PIXEL_THRESHOLD = _int("MEISENCAM_MOTION_PIXEL_THRESHOLD", 15)
 MOTION_BLUR_RADIUS = _int("MEISENCAM_MOTION_BLUR_RADIUS", 2)
 MOTION_REF_MAX_AGE_S = _int("MEISENCAM_MOTION_REF_MAX_AGE_S", 600)
+MOTION_BACKEND = os.environ.get("MEISENCAM_MOTION_BACKEND", "auto")
+MOTION_ZONES = os.environ.get("MEISENCAM_MOTION_ZONES", "")
+MOTION_MASK_IMAGE = os.environ.get("MEISENCAM_MOTION_MASK_IMAGE", "")
+MOTION_BACKGROUND = os.environ.get("MEISENCAM_MOTION_BACKGROUND", "reference")
+MOTION_BG_ALPHA = _float("MEISENCAM_MOTION_BG_ALPHA", 0.05)
+MOTION_BG_SIGMA = _float("MEISENCAM_MOTION_BG_SIGMA", 3.0)
+MOTION_BG_MIN_THRESHOLD = _int("MEISENCAM_MOTION_BG_MIN_THRESHOLD", 6)
+
+# -- Deduplication ------------------------------------------------------------
+DEDUP_ENABLED = bool(_int("MEISENCAM_DEDUP_ENABLED", 0))
+DEDUP_MAX_DISTANCE = _int("MEISENCAM_DEDUP_MAX_DISTANCE", 4)
+DEDUP_REPEAT_S = _float("MEISENCAM_DEDUP_REPEAT_S", 300.0)
+DEDUP_MAX_ITEMS = _int("MEISENCAM_DEDUP_MAX_ITEMS", 256)
+DEDUP_MAX_AGE_S = _float("MEISENCAM_DEDUP_MAX_AGE_S", 3600.0)
+
+# -- Archive ------------------------------------------------------------------
+ARCHIVE_DIR = os.environ.get("MEISENCAM_ARCHIVE_DIR", "")
+ARCHIVE_MAX_BYTES = _int("MEISENCAM_ARCHIVE_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+ARCHIVE_SEGMENT_BYTES = _int("MEISENCAM_ARCHIVE_SEGMENT_BYTES", 32 * 1024 * 1024)
+ARCHIVE_FLUSH_BYTES = _int("MEISENCAM_ARCHIVE_FLUSH_BYTES", 2 * 1024 * 1024)
+ARCHIVE_CATCHUP_BATCH = _int("MEISENCAM_ARCHIVE_CATCHUP_BATCH", 10)
+
+# -- Digest -------------------------------------------------------------------
+# half of the 64 MB ramdisk the digest is written to by default
+DIGEST_MAX_BYTES = _int("MEISENCAM_DIGEST_MAX_BYTES", 32 * 1024 * 1024)
+
+# -- Metrics ------------------------------------------------------------------
+METRICS_ENABLED = bool(_int("MEISENCAM_METRICS_ENABLED", 0))
+METRICS_INTERVAL_S = _float("MEISENCAM_METRICS_INTERVAL_S", 60.0)
+METRICS_FILE_MAX_BYTES = _int("MEISENCAM_METRICS_FILE_MAX_BYTES", 1024 * 1024)
+METRICS_FILE_BACKUPS = _int("MEISENCAM_METRICS_FILE_BACKUPS", 2)
+METRICS_PORT = _int("MEISENCAM_METRICS_PORT", 0)
 
 # -- Upload -------------------------------------------------------------------
 WEBDAV_BASE = os.environ.get(
@@ -56,3 +169,26 @@ WEBDAV_BASE = os.environ.get(
     "https://nc-6283277816195226543.nextcloud-ionos.com/public.php/webdav",
 )
 SHARE_TOKEN = os.environ.get("MEISENCAM_SHARE_TOKEN", "")
+UPLOAD_CONNECT_TIMEOUT_S = _float("MEISENCAM_UPLOAD_CONNECT_TIMEOUT_S", 10.0)
+UPLOAD_TIMEOUT_S = _float("MEISENCAM_UPLOAD_TIMEOUT_S", 30.0)
+UPLOAD_SPOOL_MAX_ITEMS = _int("MEISENCAM_UPLOAD_SPOOL_MAX_ITEMS", 40)
+UPLOAD_BACKOFF_MAX_S = _float("MEISENCAM_UPLOAD_BACKOFF_MAX_S", 300.0)
+UPLOAD_DRAIN_TIMEOUT_S = _float("MEISENCAM_UPLOAD_DRAIN_TIMEOUT_S", 60.0)
+UPLOAD_MAX_WIDTH = _int("MEISENCAM_UPLOAD_MAX_WIDTH", 0)
+UPLOAD_PROGRESSIVE = bool(_int("MEISENCAM_UPLOAD_PROGRESSIVE", 0))
+UPLOAD_MAX_BYTES = _int("MEISENCAM_UPLOAD_MAX_BYTES", 0)
+UPLOAD_MIN_QUALITY = _int("MEISENCAM_UPLOAD_MIN_QUALITY", 50)
+
+# -- Collector ----------------------------------------------------------------
+COLLECTOR_URL = os.environ.get("MEISENCAM_COLLECTOR_URL", "")
+COLLECTOR_NODE = os.environ.get("MEISENCAM_COLLECTOR_NODE", "")
+COLLECTOR_BATCH_SIZE = _int("MEISENCAM_COLLECTOR_BATCH_SIZE", 10)
+COLLECTOR_SECRET = os.environ.get("MEISENCAM_COLLECTOR_SECRET", "")
+COLLECTOR_HOST = os.environ.get("MEISENCAM_COLLECTOR_HOST", "127.0.0.1")
+COLLECTOR_PORT = _int("MEISENCAM_COLLECTOR_PORT", 8080)
+COLLECTOR_STORE_DIR = os.environ.get("MEISENCAM_COLLECTOR_STORE_DIR", "/var/lib/meisencam")
+COLLECTOR_MAX_BYTES = _int("MEISENCAM_COLLECTOR_MAX_BYTES", 32 * 1024**3)
+COLLECTOR_PARTITION_MAX_BYTES = _int("MEISENCAM_COLLECTOR_PARTITION_MAX_BYTES", 1024**3)
+COLLECTOR_MAX_REQUEST_BYTES = _int("MEISENCAM_COLLECTOR_MAX_REQUEST_BYTES", 64 * 1024 * 1024)
+COLLECTOR_FORWARD = bool(_int("MEISENCAM_COLLECTOR_FORWARD", 1))
+COLLECTOR_FORWARD_CONNECTIONS = _int("MEISENCAM_COLLECTOR_FORWARD_CONNECTIONS", 4)
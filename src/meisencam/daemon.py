@@ -0,0 +1,84 @@
+"""Long-running capture loop that keeps one camera open across cycles."""
+
+import logging
+import signal
+import threading
+import time
+from collections.abc import Callable
+
+from meisencam import metrics
+
+logger = logging.getLogger(__name__)
+
+CycleFn = Callable[[], dict[str, float]]
+
+
+class Daemon:
+    """Run a capture cycle repeatedly at a fixed interval until stopped.
+
+    The cycle callable returns a mapping of stage name to duration in
+    seconds, which is logged after every cycle and recorded in
+    :mod:`~meisencam.metrics`.  Cycles are scheduled at
+    a fixed rate; if a cycle overruns the interval the next one starts
+    immediately instead of trying to catch up on missed slots.
+
+    If ``next_interval`` is given it is called after every cycle and its
+    result replaces the interval (see
+    :class:`~meisencam.schedule.AdaptiveScheduler`).
+    """
+
+    def __init__(
+        self,
+        cycle: CycleFn,
+        interval: float,
+        next_interval: Callable[[], float] | None = None,
+    ):
+        self.cycle = cycle
+        self.interval = max(0.0, interval)
+        self.next_interval = next_interval
+        self._stop = threading.Event()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self, signum: int | None = None, _frame: object = None) -> None:
+        """Request shutdown after the current cycle (usable as a signal handler)."""
+        if signum is not None:
+            logger.info("Received %s, shutting down", signal.Signals(signum).name)
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run(self, max_cycles: int | None = None) -> int:
+        """Run cycles until stopped; return the number of completed cycles."""
+        count = 0
+        next_start = time.monotonic()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                timings = self.cycle()
+            except Exception:
+                logger.exception("Capture cycle failed")
+                timings = {}
+            count += 1
+            elapsed = time.monotonic() - started
+            stages = " ".join(f"{name}={secs:.3f}s" for name, secs in timings.items())
+            logger.info("Cycle %d took %.3fs (%s)", count, elapsed, stages or "no stages")
+            metrics.observe("cycle", elapsed)
+            metrics.observe_stages(timings, "cycle_")
+            metrics.maybe_flush()
+
+            if max_cycles is not None and count >= max_cycles:
+                break
+
+            if self.next_interval is not None:
+                self.interval = max(0.0, self.next_interval())
+            next_start += self.interval
+            now = time.monotonic()
+            if next_start < now:
+                next_start = now
+            self._stop.wait(next_start - now)
+        return count
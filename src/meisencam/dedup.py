@@ -0,0 +1,150 @@
+"""Perceptual-hash index of recent uploads to suppress near-duplicates.
+
+A bird sitting still in the box keeps crossing the motion threshold and
+would upload the same picture every cycle.  Each frame about to be
+uploaded gets a 64-bit difference hash (dHash) computed from the small
+blurred grayscale grid motion detection already prepared; if a hash
+within ``max_distance`` bits (Hamming distance) was uploaded less than
+``repeat_s`` seconds ago, the frame is skipped.  A still-sitting bird
+thus still yields one picture every ``repeat_s`` seconds, while any real
+change produces a different hash and is uploaded at once.
+
+The index keeps at most ``max_items`` hashes in least-recently-matched
+order, forgets hashes older than ``max_age_s``, and is persisted on the
+ramdisk so the cron mode remembers uploads across runs.  With a few
+hundred entries a linear scan of XOR popcounts is faster than any tree.
+"""
+
+import logging
+import os
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image
+
+from meisencam import config
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"MCDUP1"
+# hash, time of the last upload of a frame with this hash
+_ENTRY = struct.Struct("<Qd")
+
+_indexes: dict[Path, "DedupIndex"] = {}
+
+
+def dhash(pixels: bytes, size: tuple[int, int]) -> int:
+    """64-bit difference hash of an 8-bit grayscale grid of ``size`` (width, height).
+
+    Each bit says whether a cell of a 9x8 downscale is brighter than its
+    right-hand neighbour, which ignores overall brightness changes.
+    """
+    small = Image.frombytes("L", size, pixels).resize((9, 8), Image.Resampling.BOX).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = small[row * 9 + col]
+            value = (value << 1) | (left > small[row * 9 + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class DedupIndex:
+    """Bounded LRU of recently uploaded frame hashes with their upload time."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_items: int = config.DEDUP_MAX_ITEMS,
+        max_age_s: float = config.DEDUP_MAX_AGE_S,
+    ):
+        self.path = path
+        self.max_items = max(1, max_items)
+        self.max_age_s = max_age_s
+        self._entries: OrderedDict[int, float] = OrderedDict()
+        if path is not None:
+            self._load(path)
+
+    def _load(self, path: Path) -> None:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return
+        if not data.startswith(_MAGIC):
+            logger.warning("Ignoring unreadable dedup index %s", path)
+            return
+        body = data[len(_MAGIC) :]
+        body = body[: len(body) - len(body) % _ENTRY.size]
+        for value, sent_at in _ENTRY.iter_unpack(body):
+            self._entries[value] = sent_at
+
+    def save(self) -> None:
+        """Atomically write the index to :attr:`path`, oldest entry first."""
+        if self.path is None:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC + b"".join(_ENTRY.pack(*item) for item in self._entries.items()))
+        os.replace(tmp, self.path)
+
+    def _expire(self, now: float) -> None:
+        if self.max_age_s > 0:
+            for value, sent_at in list(self._entries.items()):
+                if now - sent_at > self.max_age_s:
+                    del self._entries[value]
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def nearest(self, value: int) -> tuple[int, float] | None:
+        """The closest stored hash and its upload time, or None if the index is empty."""
+        if not self._entries:
+            return None
+        return min(self._entries.items(), key=lambda item: hamming(value, item[0]))
+
+    def check(
+        self,
+        value: int,
+        max_distance: int = config.DEDUP_MAX_DISTANCE,
+        repeat_s: float = config.DEDUP_REPEAT_S,
+        now: float | None = None,
+    ) -> bool:
+        """Return True if a frame with hash ``value`` should be uploaded, and record it.
+
+        A frame within ``max_distance`` of a hash uploaded less than
+        ``repeat_s`` seconds ago is a duplicate; the matched entry then
+        counts as recently used but keeps its upload time.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+        nearest = self.nearest(value)
+        if nearest is not None and hamming(value, nearest[0]) <= max_distance:
+            match, sent_at = nearest
+            if now - sent_at < repeat_s:
+                self._entries.move_to_end(match)
+                return False
+            del self._entries[match]
+        self._entries[value] = now
+        self._expire(now)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def should_upload(pixels: bytes, size: tuple[int, int], index_path: Path) -> bool:
+    """Check a motion frame's comparison grid against the index at ``index_path``.
+
+    The index is kept in memory for the process lifetime and saved after
+    every check, like the motion reference.
+    """
+    index = _indexes.get(index_path)
+    if index is None:
+        index = _indexes[index_path] = DedupIndex(index_path)
+    upload = index.check(dhash(pixels, size))
+    index.save()
+    return upload
@@ -0,0 +1,336 @@
+"""Daily digest: contact sheets and an MJPEG timelapse of one day's frames.
+
+Paging through hundreds of ``YYYY-MM-DD-HH-MM-SS-mN.jpg`` files is
+tedious; ``meisencam digest`` condenses a day into a few contact sheets
+(a grid of thumbnails labelled with capture time and motion score) and
+one timelapse, which can be uploaded instead of the single frames::
+
+    meisencam digest /media/share/birds --day 2026-02-21 -o /tmp/digest
+
+Without a directory the frames come from the on-device archive.  Scores
+are taken from the archive entries or from ``meisencam.log``.
+
+Frames are streamed, never loaded all at once: a process pool decodes
+each JPEG at reduced scale (libjpeg DCT scaling via ``Image.draft``) and
+renders its tile and timelapse frame, with only a few frames per worker
+in flight.  The parent keeps one contact sheet page in memory and
+appends each timelapse frame to the file as it arrives.  The timelapse
+is Motion JPEG (concatenated JPEG frames), which unlike an animated GIF
+can be written frame by frame; ``ffplay`` and VLC play it directly.
+"""
+
+import argparse
+import functools
+import io
+import logging
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PIL import Image, ImageDraw, ImageOps
+
+from meisencam import config
+
+if TYPE_CHECKING:
+    from meisencam.upload import WebDavUploader
+
+logger = logging.getLogger(__name__)
+
+# same as meisencam.__main__.LOG_FILE
+LOG_FILE = Path("/mnt/ramdisk/meisencam.log")
+DIGEST_DIR = Path("/mnt/ramdisk/digest")
+
+FILENAME_TIME = "%Y-%m-%d-%H-%M-%S"
+LOG_TIME = "%Y%m%d-%H%M%S"
+TILE_ASPECT = 3 / 4
+JPEG_QUALITY = 75
+
+# (label, frame file or JPEG bytes)
+DigestItem = tuple[str, Path | bytes]
+
+
+def frame_time(name: str) -> datetime | None:
+    """Capture time encoded in a remote filename, or None for other files."""
+    try:
+        return datetime.strptime(name[:19], FILENAME_TIME)
+    except ValueError:
+        return None
+
+
+def load_scores(log_path: Path, day: date | None = None) -> dict[str, float]:
+    """Motion score per frame timestamp (``20260221-120000``) from the upload log.
+
+    With ``day`` only that day's lines are parsed, the others are skipped
+    by their prefix.
+    """
+    prefix = day.strftime("%Y%m%d-") if day is not None else ""
+    scores: dict[str, float] = {}
+    try:
+        with open(log_path) as f:
+            for line in f:
+                if not line.startswith(prefix):
+                    continue
+                fields = line.split(";")
+                try:
+                    scores[fields[0]] = float(fields[1])
+                except (IndexError, ValueError):
+                    continue
+    except FileNotFoundError:
+        logger.warning("No upload log at %s, frames are not labelled with scores", log_path)
+    return scores
+
+
+def label(when: datetime, score: float | None) -> str:
+    text = when.strftime("%H:%M:%S")
+    return text if score is None else f"{text}  {score:.1f}"
+
+
+def directory_items(directory: Path, day: date, scores: dict[str, float]) -> Iterator[DigestItem]:
+    """Frames of ``day`` in ``directory`` in capture order."""
+    prefix = day.isoformat()
+    names = sorted(p.name for p in directory.glob(f"{prefix}-*.jpg"))
+    for name in names:
+        when = frame_time(name)
+        if when is not None:
+            yield label(when, scores.get(when.strftime(LOG_TIME))), directory / name
+
+
+def archive_items(archive_dir: Path, day: date, scores: dict[str, float]) -> Iterator[DigestItem]:
+    """Frames of ``day`` in the archive; each is read only when the pool asks for it."""
+    from meisencam.archive import FrameArchive
+
+    archive = FrameArchive(archive_dir)
+    start = datetime.combine(day, time())
+    for entry in archive.query(start, start + timedelta(days=1)):
+        timestamp, _, rest = entry.meta.partition(";")
+        try:
+            score = float(rest.split(";")[0])
+        except ValueError:
+            score = scores.get(timestamp)
+        yield label(entry.captured_at, score), archive.read(entry)
+
+
+def _annotate(image: Image.Image, text: str) -> Image.Image:
+    draw = ImageDraw.Draw(image)
+    left, top, right, bottom = draw.textbbox((4, 0), text)
+    y = image.height - (bottom - top) - 6
+    draw.rectangle((0, y - 2, right + 4, image.height), fill=(0, 0, 0))
+    draw.text((4, y - top), text, fill=(255, 255, 255))
+    return image
+
+
+def render_frame(
+    item: DigestItem, tile_size: tuple[int, int], timelapse_width: int
+) -> tuple[bytes, bytes | None]:
+    """Pool worker: the raw RGB tile and the timelapse JPEG (if enabled) of one frame."""
+    text, source = item
+    with Image.open(source if isinstance(source, Path) else io.BytesIO(source)) as image:
+        width = max(tile_size[0], timelapse_width)
+        # decode at the smallest DCT scale that is still at least this large
+        image.draft("RGB", (width, round(width * image.height / image.width)))
+        image = image.convert("RGB")
+
+    tile = _annotate(ImageOps.pad(image, tile_size), text)
+    frame = None
+    if timelapse_width:
+        scaled = ImageOps.contain(image, (timelapse_width, timelapse_width))
+        buf = io.BytesIO()
+        _annotate(scaled, text).save(buf, format="JPEG", quality=JPEG_QUALITY)
+        frame = buf.getvalue()
+    return tile.tobytes(), frame
+
+
+def bounded_map(pool: Executor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """Like ``pool.map`` but with at most ``window`` items submitted and not yet consumed.
+
+    ``Executor.map`` submits the whole input at once, which would read
+    every archived frame into memory before the first result is used.
+    """
+    pending: deque[Future] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class ContactSheet:
+    """Pages of ``columns`` x ``rows`` tiles, each saved once full."""
+
+    def __init__(self, prefix: Path, columns: int, rows: int, tile_size: tuple[int, int]):
+        self.prefix = prefix
+        self.columns = columns
+        self.rows = rows
+        self.tile_size = tile_size
+        self.pages: list[Path] = []
+        self.nbytes = 0
+        self._page: Image.Image | None = None
+        self._count = 0
+
+    def add(self, tile: bytes) -> None:
+        if self._page is None:
+            w, h = self.tile_size
+            self._page = Image.new("RGB", (self.columns * w, self.rows * h))
+        row, col = divmod(self._count, self.columns)
+        image = Image.frombytes("RGB", self.tile_size, tile)
+        self._page.paste(image, (col * self.tile_size[0], row * self.tile_size[1]))
+        self._count += 1
+        if self._count == self.columns * self.rows:
+            self._save()
+
+    def _save(self) -> None:
+        used_rows = -(-self._count // self.columns)
+        page = self._page.crop((0, 0, self._page.width, used_rows * self.tile_size[1]))
+        path = self.prefix.with_name(f"{self.prefix.name}-{len(self.pages) + 1}.jpg")
+        page.save(path, format="JPEG", quality=JPEG_QUALITY)
+        self.pages.append(path)
+        self.nbytes += path.stat().st_size
+        self._page = None
+        self._count = 0
+
+    def close(self) -> list[Path]:
+        """Save the last, partly filled page; return all pages written."""
+        if self._count:
+            self._save()
+        return self.pages
+
+
+def build_digest(
+    items: Iterable[DigestItem],
+    output_dir: Path,
+    name: str,
+    *,
+    columns: int = 6,
+    rows: int = 8,
+    tile_width: int = 240,
+    timelapse_width: int = 480,
+    jobs: int | None = None,
+    max_bytes: int = 0,
+) -> list[Path]:
+    """Render contact sheets and a timelapse of ``items`` into ``output_dir``.
+
+    Files are named ``{name}-digest-N.jpg`` and ``{name}-timelapse.mjpeg``;
+    ``timelapse_width=0`` skips the timelapse.  With ``max_bytes`` the
+    remaining frames are left out once the next one would take the files
+    past it (only the last, partly filled sheet page is saved after that).
+    Returns the files written.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tile_size = (tile_width, round(tile_width * TILE_ASPECT))
+    sheet = ContactSheet(output_dir / f"{name}-digest", columns, rows, tile_size)
+    timelapse_path = output_dir / f"{name}-timelapse.mjpeg"
+    jobs = jobs or os.cpu_count() or 1
+
+    frames = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool, open(timelapse_path, "wb") as timelapse:
+        render = functools.partial(
+            render_frame, tile_size=tile_size, timelapse_width=timelapse_width
+        )
+        for tile, frame in bounded_map(pool, render, items, window=2 * jobs):
+            size = sheet.nbytes + timelapse.tell() + len(frame or b"")
+            if max_bytes and size > max_bytes:
+                logger.warning(
+                    "Digest stopped after %d frame(s): output would exceed %d bytes",
+                    frames,
+                    max_bytes,
+                )
+                break
+            sheet.add(tile)
+            if frame is not None:
+                timelapse.write(frame)
+            frames += 1
+    files = sheet.close()
+    if timelapse_width and frames:
+        files.append(timelapse_path)
+    else:
+        timelapse_path.unlink()
+    logger.info("Digest of %d frame(s): %s", frames, ", ".join(p.name for p in files))
+    return files
+
+
+def upload_digest(files: list[Path], uploader: "WebDavUploader | None" = None) -> bool:
+    """Upload the digest files to the share, removing each one once accepted."""
+    from meisencam.upload import WebDavUploader
+
+    uploader = uploader or WebDavUploader()
+    ok = True
+    try:
+        for path in files:
+            response = uploader.put(path, path.name)
+            if response.ok:
+                path.unlink()
+            else:
+                logger.warning("Upload of %s rejected: %d", path.name, response.status_code)
+                ok = False
+    finally:
+        uploader.close()
+    return ok
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="meisencam digest",
+        description="Build contact sheets and a timelapse of one day's frames",
+    )
+    parser.add_argument(
+        "directory", type=Path, nargs="?", help="frame directory (default: the archive)"
+    )
+    parser.add_argument(
+        "--day", type=date.fromisoformat, help="e.g. 2026-02-21 (default: yesterday)"
+    )
+    parser.add_argument("--log", type=Path, default=LOG_FILE, help="upload log with the scores")
+    parser.add_argument("-o", "--output", type=Path, default=DIGEST_DIR)
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=config.DIGEST_MAX_BYTES,
+        help="stop adding frames once the output reaches this size (0: no limit)",
+    )
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--tile-width", type=int, default=240)
+    parser.add_argument(
+        "--timelapse-width", type=int, default=480, help="0 disables the timelapse"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--upload", action="store_true", help="upload the digest and delete the local files"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    day = args.day or date.today() - timedelta(days=1)
+    scores = load_scores(args.log, day)
+    if args.directory is not None:
+        items = directory_items(args.directory, day, scores)
+    elif config.ARCHIVE_DIR:
+        items = archive_items(Path(config.ARCHIVE_DIR), day, scores)
+    else:
+        parser.error("no frame directory given and MEISENCAM_ARCHIVE_DIR is unset")
+
+    files = build_digest(
+        items,
+        args.output,
+        day.isoformat(),
+        columns=args.columns,
+        rows=args.rows,
+        tile_width=args.tile_width,
+        timelapse_width=args.timelapse_width,
+        jobs=args.jobs,
+        max_bytes=args.max_bytes,
+    )
+    if not files:
+        logging.info("No frames for %s", day)
+        return
+    if args.upload and not upload_digest(files):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
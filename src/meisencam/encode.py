@@ -0,0 +1,88 @@
+"""JPEG encoding of frames for upload.
+
+Upload time over the WiFi dongle grows with the file size, so motion
+frames are encoded with configurable settings instead of at full
+resolution and camera quality: an optional maximum width, the JPEG
+quality, progressive encoding, and a per-image byte budget.  When a
+frame exceeds the budget the highest quality that fits is searched
+(down to ``min_quality``), and only if even that is too large is the
+frame scaled down further.
+"""
+
+import io
+import logging
+from dataclasses import dataclass
+
+from PIL import Image
+
+from meisencam import config
+
+logger = logging.getLogger(__name__)
+
+# Each further downscale when the budget cannot be met at min_quality
+BUDGET_SCALE_STEP = 0.75
+# Never scale below this width to meet a budget
+BUDGET_MIN_WIDTH = 320
+
+
+@dataclass(frozen=True)
+class EncodeSettings:
+    """How frames are encoded for upload; 0 disables the width limit and budget."""
+
+    max_width: int = config.UPLOAD_MAX_WIDTH
+    quality: int = config.FRAME_JPEG_QUALITY
+    progressive: bool = config.UPLOAD_PROGRESSIVE
+    max_bytes: int = config.UPLOAD_MAX_BYTES
+    min_quality: int = config.UPLOAD_MIN_QUALITY
+
+
+def _scaled(image: Image.Image, width: int) -> Image.Image:
+    if not width or image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def _save(image: Image.Image, quality: int, progressive: bool) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=quality, progressive=progressive)
+    return buf.getvalue()
+
+
+def _fit_quality(image: Image.Image, settings: EncodeSettings) -> bytes | None:
+    """Highest quality in [min_quality, quality) within the budget, by bisection."""
+    best = None
+    lo, hi = settings.min_quality, settings.quality - 1
+    while lo <= hi:
+        quality = (lo + hi) // 2
+        data = _save(image, quality, settings.progressive)
+        if len(data) <= settings.max_bytes:
+            best, lo = data, quality + 1
+        else:
+            hi = quality - 1
+    return best
+
+
+def encode_jpeg(image: Image.Image, settings: EncodeSettings | None = None) -> bytes:
+    """Encode ``image`` as JPEG according to ``settings`` (the configured ones by default)."""
+    settings = settings or EncodeSettings()
+    image = _scaled(image, settings.max_width)
+    data = _save(image, settings.quality, settings.progressive)
+    if not settings.max_bytes or len(data) <= settings.max_bytes:
+        return data
+
+    fitted = _fit_quality(image, settings)
+    while fitted is None and image.width > BUDGET_MIN_WIDTH:
+        image = _scaled(image, max(BUDGET_MIN_WIDTH, int(image.width * BUDGET_SCALE_STEP)))
+        data = _save(image, settings.min_quality, settings.progressive)
+        if len(data) <= settings.max_bytes:
+            fitted = data
+    if fitted is None:
+        logger.warning(
+            "Frame is %d bytes at %dpx, over the %d byte budget",
+            len(data),
+            image.width,
+            settings.max_bytes,
+        )
+        return data
+    return fitted
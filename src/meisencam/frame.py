@@ -0,0 +1,56 @@
+"""Captured stills held in memory."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from meisencam import metrics
+from meisencam.encode import EncodeSettings, encode_jpeg
+
+
+@dataclass
+class Frame:
+    """A full-resolution still kept in memory instead of on the ramdisk.
+
+    ``array`` is the raw RGB frame from the camera (anything Pillow's
+    ``Image.fromarray`` accepts), used for motion detection without a
+    JPEG decode.  The image built from it is kept, so motion detection
+    and the upload encoder share the same pixels.  :attr:`jpeg` is
+    encoded with ``encoding`` on first access and cached, so a frame is
+    encoded at most once however often it is uploaded or spooled.
+    """
+
+    array: Any = field(repr=False)
+    captured_at: datetime = field(default_factory=datetime.now)
+    encoding: EncodeSettings = field(default_factory=EncodeSettings)
+    _jpeg: bytes | None = field(default=None, repr=False)
+    _image: Image.Image | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_jpeg(cls, data: bytes, captured_at: datetime | None = None) -> "Frame":
+        """A frame that is already encoded, e.g. read back from disk; it has no pixels."""
+        return cls(None, captured_at or datetime.now(), _jpeg=data)
+
+    @property
+    def timestamp(self) -> str:
+        """Capture time in the ``YYYYmmdd-HHMMSS`` form used in the upload log."""
+        return self.captured_at.strftime("%Y%m%d-%H%M%S")
+
+    def image(self) -> Image.Image:
+        if self._image is None:
+            self._image = Image.fromarray(self.array)
+        return self._image
+
+    @property
+    def jpeg(self) -> bytes:
+        if self._jpeg is None:
+            with metrics.timer("encode"):
+                self._jpeg = encode_jpeg(self.image(), self.encoding)
+        return self._jpeg
+
+    def save(self, path: Path) -> None:
+        """Write the JPEG to ``path``, for frames that must outlive the process."""
+        path.write_bytes(self.jpeg)
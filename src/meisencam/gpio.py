@@ -0,0 +1,101 @@
+"""IR LED control through a persistent GPIO handle.
+
+The LED line is requested once via libgpiod (``python3-libgpiod``) and
+then toggled with a plain ioctl, instead of forking ``pinctrl`` twice per
+frame.  ``pinctrl`` remains as a fallback when libgpiod is not installed,
+and :class:`StubLed` stands in for the hardware in tests.
+"""
+
+import logging
+import subprocess
+
+from meisencam import config
+
+logger = logging.getLogger(__name__)
+
+
+class IrLed:
+    """Base class; subclasses implement :meth:`_write`."""
+
+    def __init__(self) -> None:
+        self.state: bool | None = None
+
+    def set(self, on: bool) -> None:
+        """Switch the LED, skipping the write if it is already in that state."""
+        if on == self.state:
+            return
+        self._write(on)
+        self.state = on
+        logger.info("IR LED %s", "on" if on else "off")
+
+    def _write(self, on: bool) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class GpiodLed(IrLed):
+    """LED on a GPIO line held open through the libgpiod v2 bindings."""
+
+    def __init__(self, gpio: int, chip: str = config.IR_LED_CHIP):
+        super().__init__()
+        import gpiod
+        from gpiod.line import Direction, Value
+
+        self._gpio = gpio
+        self._values = {True: Value.ACTIVE, False: Value.INACTIVE}
+        self._request = gpiod.request_lines(
+            chip,
+            consumer="meisencam",
+            config={gpio: gpiod.LineSettings(direction=Direction.OUTPUT)},
+        )
+
+    def _write(self, on: bool) -> None:
+        self._request.set_value(self._gpio, self._values[on])
+
+    def close(self) -> None:
+        self._request.release()
+
+
+class PinctrlLed(IrLed):
+    """LED switched by running ``pinctrl`` (one process per change)."""
+
+    def __init__(self, gpio: int):
+        super().__init__()
+        self._gpio = gpio
+
+    def _write(self, on: bool) -> None:
+        state = "dh" if on else "dl"
+        subprocess.run(["pinctrl", "set", str(self._gpio), "op", state], check=False)
+
+
+class StubLed(IrLed):
+    """No-op LED that records every write, for tests and off-device runs."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[bool] = []
+
+    def _write(self, on: bool) -> None:
+        self.writes.append(on)
+
+
+def open_ir_led(gpio: int = config.IR_LED_GPIO, backend: str = config.IR_LED_BACKEND) -> IrLed:
+    """Open the IR LED using ``backend`` ("auto", "gpiod", "pinctrl" or "stub").
+
+    "auto" uses libgpiod when it is importable and falls back to pinctrl.
+    """
+    if backend == "stub":
+        return StubLed()
+    if backend == "pinctrl":
+        return PinctrlLed(gpio)
+    if backend not in ("auto", "gpiod"):
+        raise ValueError(f"Unknown IR LED backend: {backend!r}")
+    try:
+        return GpiodLed(gpio)
+    except (ImportError, OSError) as exc:
+        if backend == "gpiod":
+            raise
+        logger.info("libgpiod unavailable (%s), using pinctrl for the IR LED", exc)
+        return PinctrlLed(gpio)
@@ -0,0 +1,40 @@
+"""Deferred imports of heavy optional-at-start-up dependencies.
+
+Under cron every capture starts a fresh interpreter, and most cycles see
+no motion and upload nothing.  :func:`lazy_import` returns a module
+object that is only executed on first attribute access, so importing
+``requests`` (urllib3, ssl, charset detection) or ``picamera2`` costs
+nothing until a stage actually uses it, while the module stays a normal
+attribute that tests can patch (``meisencam.upload.requests.put``).
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+class _MissingModule(ModuleType):
+    """Stand-in for a module that is not installed; fails on first use."""
+
+    def __getattr__(self, attr: str) -> object:
+        raise ModuleNotFoundError(f"No module named {self.__name__!r}", name=self.__name__)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module ``name``, deferring its execution until first use.
+
+    A module that is not installed (e.g. ``picamera2`` off the Pi) only
+    raises :class:`ModuleNotFoundError` once it is actually used, so
+    commands that do not need it still work.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
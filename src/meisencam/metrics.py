@@ -0,0 +1,212 @@
+"""Lightweight stage timings and counters.
+
+Code under measurement wraps a stage in :func:`timer` (monotonic clock)
+or bumps a counter with :func:`inc`.  Instrumentation is off until
+:func:`enable` is called (``MEISENCAM_METRICS_ENABLED=1``); until then
+:func:`timer` hands out one shared no-op context manager and the other
+functions return after a single flag check.
+
+When enabled, :func:`flush` appends one JSON line per window to a
+rotating file on the ramdisk, with count/sum/max per stage and the
+counter increments since the previous line.  :func:`serve` additionally
+exposes the running totals in Prometheus text format on ``/metrics``;
+the HTTP server and the rotating file handler are only imported then.
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from meisencam import config
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+@dataclass
+class StageStats:
+    """Number, total and longest duration (seconds) of one stage."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, secs: float) -> None:
+        self.count += 1
+        self.total += secs
+        self.max = max(self.max, secs)
+
+
+class Registry:
+    """Thread-safe store of stage timings and counters.
+
+    Keeps running totals (for Prometheus) and the values of the current
+    window (for the next line of the metrics file).
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, float] = {}
+        self._window_stages: dict[str, StageStats] = {}
+        self._window_counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._file: logging.Logger | None = None
+        self._last_flush = time.monotonic()
+
+    def enable(self, path: Path | None = None, max_bytes: int = 0, backups: int = 0) -> None:
+        """Start recording; write windows to ``path`` (rotated at ``max_bytes``) if given."""
+        if path is not None:
+            from logging.handlers import RotatingFileHandler
+
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._file = logging.getLogger(f"{__name__}.file")
+            self._file.propagate = False
+            self._file.setLevel(logging.INFO)
+            for old in self._file.handlers:
+                old.close()
+            self._file.handlers = [handler]
+        self.enabled = True
+
+    def observe(self, stage: str, secs: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.stages.setdefault(stage, StageStats()).add(secs)
+            self._window_stages.setdefault(stage, StageStats()).add(secs)
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            self._window_counters[name] = self._window_counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started)
+
+    def timer(self, stage: str) -> contextlib.AbstractContextManager:
+        """Context manager recording the duration of ``stage``."""
+        return self._timed(stage) if self.enabled else _NULL_TIMER
+
+    def window(self) -> dict:
+        """Return and reset the stages and counters recorded since the last call."""
+        with self._lock:
+            stages, counters = self._window_stages, self._window_counters
+            self._window_stages, self._window_counters = {}, {}
+        return {
+            "stages": {
+                name: {"count": s.count, "sum": round(s.total, 6), "max": round(s.max, 6)}
+                for name, s in stages.items()
+            },
+            "counters": counters,
+        }
+
+    def flush(self) -> None:
+        """Append the current window as one JSON line to the metrics file."""
+        self._last_flush = time.monotonic()
+        if not self.enabled or self._file is None:
+            return
+        record = {"time": datetime.now().isoformat(timespec="seconds"), **self.window()}
+        self._file.info(json.dumps(record, separators=(",", ":")))
+
+    def maybe_flush(self, interval: float) -> None:
+        """:meth:`flush` if at least ``interval`` seconds passed since the last one."""
+        if self.enabled and time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def prometheus(self) -> str:
+        """Running totals in the Prometheus text exposition format."""
+        with self._lock:
+            stages = dict(self.stages)
+            counters = dict(self.counters)
+        lines = [
+            "# TYPE meisencam_stage_seconds summary",
+            "# TYPE meisencam_stage_seconds_max gauge",
+        ]
+        for name, s in sorted(stages.items()):
+            lines.append(f'meisencam_stage_seconds_count{{stage="{name}"}} {s.count}')
+            lines.append(f'meisencam_stage_seconds_sum{{stage="{name}"}} {s.total:.6f}')
+            lines.append(f'meisencam_stage_seconds_max{{stage="{name}"}} {s.max:.6f}')
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE meisencam_{name}_total counter")
+            lines.append(f"meisencam_{name}_total {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def enable(path: Path | None = None) -> None:
+    """Enable instrumentation with the rotation settings from the config."""
+    registry.enable(path, config.METRICS_FILE_MAX_BYTES, config.METRICS_FILE_BACKUPS)
+
+
+def timer(stage: str) -> contextlib.AbstractContextManager:
+    return registry.timer(stage)
+
+
+def observe(stage: str, secs: float) -> None:
+    registry.observe(stage, secs)
+
+
+def observe_stages(timings: dict[str, float], prefix: str) -> None:
+    """Record a mapping of stage name to seconds under ``prefix``."""
+    if registry.enabled:
+        for name, secs in timings.items():
+            registry.observe(f"{prefix}{name}", secs)
+
+
+def inc(name: str, amount: float = 1) -> None:
+    registry.inc(name, amount)
+
+
+def flush() -> None:
+    registry.flush()
+
+
+def maybe_flush(interval: float = config.METRICS_INTERVAL_S) -> None:
+    registry.maybe_flush(interval)
+
+
+def serve(port: int, host: str = "") -> "ThreadingHTTPServer":
+    """Serve ``/metrics`` on a daemon thread; returns the server for shutdown."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            logger.debug("metrics %s - %s", self.address_string(), format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logger.info("Serving metrics on port %d", server.server_address[1])
+    return server
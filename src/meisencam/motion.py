@@ -7,74 +7,425 @@ a noise floor — cleanly separating localised motion from distributed
 sensor noise.
 """
 
+import functools
+import io
 import logging
-import shutil
+import os
+import struct
 import time
+from collections.abc import Callable
 from pathlib import Path
 
 from PIL import Image, ImageFilter
 
 from meisencam import config as cfg
+from meisencam import metrics
+from meisencam.background import background_class
+from meisencam.frame import Frame
+from meisencam.scoring import get_scorer
+from meisencam.state import DetectorState, load_state, save_state
+from meisencam.zones import MotionResult, Zone, ZoneScore, combine, load_zones
 
 logger = logging.getLogger(__name__)
 
-_ref_update_time: float = 0.0
+_REF_MAGIC = b"MCREF1"
+_REF_HEADER = struct.Struct("<4H")
+_BG_MAGIC = b"MCBGM1"
 
+_scorer = None
+_detectors: dict[Path, "MotionDetector"] = {}
 
-def detect_motion(current_path: Path, old_path: Path) -> float:
-    """Compare two images and return a motion score (0-100).
+
+def _get_scorer():
+    global _scorer
+    if _scorer is None:
+        _scorer = get_scorer()
+        logger.debug("Using %s motion scoring backend", _scorer.name)
+    return _scorer
+
+
+def open_for_motion(source: Path | io.BytesIO) -> Image.Image:
+    """Open an image for motion comparison, decoding as little as possible.
+
+    For JPEGs this enables Pillow's draft mode: the decoder emits
+    grayscale directly and uses DCT scaling (down to 1/8) to the smallest
+    size that still covers the comparison grid, so a 1080p still is
+    decoded at 240x135 instead of 1920x1080 RGB.  Other formats are
+    opened unchanged.
+    """
+    image = Image.open(source)
+    image.draft("L", (cfg.MOTION_COMPARE_SIZE_W, cfg.MOTION_COMPARE_SIZE_H))
+    return image
+
+
+def reduce_image(image: Image.Image) -> Image.Image:
+    """Convert an image to grayscale at the comparison grid size."""
+    compare_size = (cfg.MOTION_COMPARE_SIZE_W, cfg.MOTION_COMPARE_SIZE_H)
+    # reducing_gap box-reduces large inputs by an integer factor before
+    # the final resample, which is much cheaper than a full bicubic pass
+    return image.convert("L").resize(compare_size, reducing_gap=3.0)
+
+
+def blur_image(image: Image.Image) -> Image.Image:
+    """Apply the configured Gaussian blur (suppresses sensor noise)."""
+    if cfg.MOTION_BLUR_RADIUS > 0:
+        image = image.filter(ImageFilter.GaussianBlur(radius=cfg.MOTION_BLUR_RADIUS))
+    return image
+
+
+def prepare_pixels(image: Image.Image) -> bytes:
+    """Reduce an image to the blurred grayscale comparison grid."""
+    return blur_image(reduce_image(image)).tobytes()
+
+
+def motion_heatmap(
+    pixels_new: bytes, pixels_old: bytes, grid: tuple[int, int]
+) -> list[list[float]]:
+    """Per-region changed-pixel percentages for two prepared comparison grids.
+
+    Returns ``grid[1]`` rows of ``grid[0]`` percentages (0-100).
+    """
+    compare_size = (cfg.MOTION_COMPARE_SIZE_W, cfg.MOTION_COMPARE_SIZE_H)
+    return _get_scorer().heatmap(
+        pixels_new, pixels_old, compare_size, cfg.MOTION_PIXEL_THRESHOLD, grid
+    )
+
+
+def _reference_due(score: float, ref_update_time: float, now: float) -> bool:
+    """Apply the reference update policy described in :func:`detect_motion`."""
+    motion_detected = score > cfg.MOTION_THRESHOLD
+    ref_age = now - ref_update_time if ref_update_time > 0 else 0.0
+    ref_expired = ref_update_time > 0 and ref_age > cfg.MOTION_REF_MAX_AGE_S
+    if ref_expired and not motion_detected:
+        logger.info("Reference image refreshed after %.0fs (max age)", ref_age)
+    return motion_detected or ref_expired or ref_update_time == 0.0
+
+
+def detect_motion(current: Path | Frame, old_path: Path) -> float:
+    """Compare an image with the stored reference and return a motion score (0-100).
+
+    ``current`` is an image file or an in-memory :class:`~meisencam.frame.Frame`,
+    whose raw array is used directly without a JPEG round trip.
 
     The score is the percentage of pixels whose absolute difference
     exceeds the per-pixel noise threshold, after downscaling and
     Gaussian blur.
 
-    Reference image update policy:
+    ``old_path`` is the reference sidecar (see :func:`save_reference`).
+    The reference is kept in memory for the lifetime of the process, so a
+    long-running process only reads the sidecar once; a one-shot process
+    reads ~3 KB instead of decoding a full-resolution JPEG.  A legacy
+    reference image at ``old_path`` is decoded once and converted.
+    Detector state (reference age, noise statistics, last score) is kept
+    next to it with a ``.state`` suffix, so the policy below behaves the
+    same under cron as in a long-running process.
+
+    Reference update policy:
     - Updated when motion IS detected (score > threshold)
     - Updated when reference is older than max age (gradual lighting)
     - NOT updated on no-motion frames (prevents noise drift)
 
-    If no previous image exists, copies the current image and returns 0.
+    With ``MEISENCAM_MOTION_BACKGROUND=adaptive`` the reference is an
+    adaptive :mod:`~meisencam.background` model instead (sidecar with a
+    ``.bg`` suffix): motion frames still replace its mean, while quiet
+    frames are blended in and refine the per-pixel noise estimate, which
+    takes the place of the max-age refresh.
+
+    If no reference exists, stores the current image and returns 0.
+    """
+    detector = _detectors.get(old_path)
+    if detector is None:
+        detector = _detectors[old_path] = MotionDetector(
+            reference_path=old_path, state_path=old_path.with_suffix(".state")
+        )
+
+    image = current.image() if isinstance(current, Frame) else open_for_motion(current)
+    result = detector.evaluate_image(image)
+    if result.total:
+        logger.info(
+            "Motion score: %.2f%% (%d/%d pixels changed)",
+            result.score,
+            result.changed,
+            result.total,
+        )
+    for name, zone in result.zones.items():
+        logger.info(
+            "  zone %s: %.2f%% (%d/%d, weight %g)",
+            name,
+            zone.score,
+            zone.changed,
+            zone.total,
+            zone.weight,
+        )
+    return result.score
+
+
+def last_pixels(old_path: Path) -> bytes | None:
+    """The comparison grid of the frame last scored by :func:`detect_motion` for ``old_path``."""
+    detector = _detectors.get(old_path)
+    return detector.last_pixels if detector is not None else None
+
+
+def _reference_key() -> tuple[int, int, int, int]:
+    """Settings that determine the content of a prepared reference."""
+    return (
+        cfg.MOTION_COMPARE_SIZE_W,
+        cfg.MOTION_COMPARE_SIZE_H,
+        cfg.MOTION_BLUR_RADIUS,
+        cfg.MOTION_PIXEL_THRESHOLD,
+    )
+
+
+def save_reference(path: Path, pixels: bytes) -> None:
+    """Atomically write a prepared reference grid as a raw sidecar file.
+
+    The file is a small header (magic plus the :func:`_reference_key`
+    settings) followed by the raw 8-bit grayscale comparison grid.
     """
-    global _ref_update_time
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_REF_MAGIC + _REF_HEADER.pack(*_reference_key()))
+        f.write(pixels)
+    os.replace(tmp, path)
+
+
+def load_reference(path: Path) -> bytes | None:
+    """Load a prepared reference grid, or None if missing or stale.
 
+    Sidecars written with different comparison settings are ignored.
+    Any other readable image (a legacy reference JPEG) is decoded and
+    prepared with the current settings.
+    """
     try:
-        img_new = Image.open(current_path).convert("L")
-        img_old = Image.open(old_path).convert("L")
+        data = path.read_bytes()
     except FileNotFoundError:
-        logger.info("No previous image found, initialising with current image")
-        shutil.copy2(str(current_path), str(old_path))
-        _ref_update_time = time.time()
-        return 0.0
+        return None
 
-    compare_size = (cfg.MOTION_COMPARE_SIZE_W, cfg.MOTION_COMPARE_SIZE_H)
+    header_size = len(_REF_MAGIC) + _REF_HEADER.size
+    if data.startswith(_REF_MAGIC):
+        key = _REF_HEADER.unpack_from(data, len(_REF_MAGIC))
+        if key != _reference_key():
+            logger.info("Reference settings changed, discarding %s", path)
+            return None
+        pixels = data[header_size:]
+        width, height = key[:2]
+        return pixels if len(pixels) == width * height else None
 
-    img_new = img_new.resize(compare_size)
-    img_old = img_old.resize(compare_size)
+    try:
+        return prepare_pixels(open_for_motion(io.BytesIO(data)))
+    except (OSError, ValueError):
+        logger.warning("Unreadable reference %s, discarding", path)
+        return None
 
-    if cfg.MOTION_BLUR_RADIUS > 0:
-        img_new = img_new.filter(ImageFilter.GaussianBlur(radius=cfg.MOTION_BLUR_RADIUS))
-        img_old = img_old.filter(ImageFilter.GaussianBlur(radius=cfg.MOTION_BLUR_RADIUS))
 
-    pixels_new = img_new.tobytes()
-    pixels_old = img_old.tobytes()
-    total_pixels = len(pixels_new)
+def save_background(path: Path, model) -> None:
+    """Atomically write an adaptive background model as a sidecar file.
 
-    changed = sum(
-        1 for pn, po in zip(pixels_new, pixels_old) if abs(pn - po) > cfg.MOTION_PIXEL_THRESHOLD
-    )
+    Same layout as :func:`save_reference`, followed by the ``float32``
+    mean and variance arrays.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_BG_MAGIC + _REF_HEADER.pack(*_reference_key()))
+        f.write(model.to_bytes())
+    os.replace(tmp, path)
 
-    score = (changed / total_pixels) * 100.0
 
-    # Update reference image based on policy
-    motion_detected = score > cfg.MOTION_THRESHOLD
-    ref_age = time.time() - _ref_update_time if _ref_update_time > 0 else 0.0
-    ref_expired = _ref_update_time > 0 and ref_age > cfg.MOTION_REF_MAX_AGE_S
+def load_background(path: Path, model_class: type):
+    """Load a background model sidecar, or None if missing or stale."""
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+    if not data.startswith(_BG_MAGIC):
+        logger.warning("Unreadable background model %s, discarding", path)
+        return None
+    key = _REF_HEADER.unpack_from(data, len(_BG_MAGIC))
+    if key != _reference_key():
+        logger.info("Reference settings changed, discarding %s", path)
+        return None
+    payload = data[len(_BG_MAGIC) + _REF_HEADER.size :]
+    width, height = key[:2]
+    if len(payload) != 2 * 4 * width * height:
+        return None
+    return model_class.from_bytes(payload)
+
+
+class MotionDetector:
+    """Score a stream of frames against an in-memory reference.
+
+    Used directly by the streaming pipeline, where frames arrive as raw
+    grayscale planes (e.g. the Y plane of the camera's lores stream), and
+    by :func:`detect_motion`.  The reference is the prepared comparison
+    grid, tagged with the settings it was prepared with; if
+    ``reference_path`` is given it is loaded from and saved to that
+    sidecar file so it survives the process.  Likewise, ``state_path``
+    persists the :class:`~meisencam.state.DetectorState` after every frame.
+
+    ``background`` selects the reference kind ("reference" or "adaptive",
+    default ``MEISENCAM_MOTION_BACKGROUND``); an adaptive model is kept in
+    :attr:`background` and persisted next to ``reference_path`` with a
+    ``.bg`` suffix.  Scoring is restricted to ``zones`` (default: the configured
+    :mod:`~meisencam.zones`; none means the whole frame).  If
+    ``heatmap_grid`` is given, the per-region changed-pixel percentages
+    of the latest frame are kept in :attr:`last_heatmap`.
+    """
+
+    def __init__(
+        self,
+        heatmap_grid: tuple[int, int] | None = None,
+        reference_path: Path | None = None,
+        state_path: Path | None = None,
+        zones: list[Zone] | None = None,
+        background: str | None = None,
+    ) -> None:
+        mode = background or cfg.MOTION_BACKGROUND
+        if mode not in ("reference", "adaptive"):
+            raise ValueError(f"Unknown motion background model: {mode!r}")
+        self.adaptive = mode == "adaptive"
+        self.background = None
+        self.background_path: Path | None = None
+        self.reference: bytes | None = None
+        self.reference_key: tuple[int, int, int, int] | None = None
+        self.reference_path = reference_path
+        self.state_path = state_path
+        self.state = load_state(state_path) if state_path is not None else DetectorState()
+        self.heatmap_grid = heatmap_grid
+        self.last_heatmap: list[list[float]] | None = None
+        self.last_pixels: bytes | None = None
+        self.last_result = MotionResult(0.0, 0, 0)
+        self._zones = zones
+        self._zone_index: list[tuple[Zone, object]] | None = None
+        self._zone_size: tuple[int, int] | None = None
+
+        if reference_path is not None and self.adaptive:
+            self.background_path = reference_path.with_suffix(".bg")
+            model_class = background_class(_get_scorer().name)
+            self.background = load_background(self.background_path, model_class)
+            if self.background is not None:
+                self.reference_key = _reference_key()
+        elif reference_path is not None:
+            self.reference = load_reference(reference_path)
+            if self.reference is not None:
+                self.reference_key = _reference_key()
+                if self.state.ref_update_time == 0.0:
+                    # reference predates the state file
+                    self.state.ref_update_time = reference_path.stat().st_mtime
+
+    def _set_reference(self, pixels: bytes, now: float) -> None:
+        if not self.adaptive:
+            self.reference = pixels
+            if self.reference_path is not None:
+                save_reference(self.reference_path, pixels)
+        elif self.background is not None and self.reference_key == _reference_key():
+            self.background.reset_mean(pixels)
+        else:
+            # start with per-pixel gates equal to the global noise gate
+            variance = (cfg.MOTION_PIXEL_THRESHOLD / cfg.MOTION_BG_SIGMA) ** 2
+            self.background = background_class(_get_scorer().name).seed(pixels, variance)
+        self.reference_key = _reference_key()
+        self.state.ref_update_time = now
+
+    def _zone_indexes(self) -> list[tuple[Zone, object]]:
+        """Zones with backend-native pixel indices, rebuilt if the grid size changes."""
+        size = (cfg.MOTION_COMPARE_SIZE_W, cfg.MOTION_COMPARE_SIZE_H)
+        if self._zone_index is None or self._zone_size != size:
+            zones = self._zones if self._zones is not None else load_zones(size)
+            scorer = _get_scorer()
+            self._zone_index = [(zone, scorer.make_index(zone.indices)) for zone in zones]
+            self._zone_size = size
+        return self._zone_index
+
+    def _counter(self, pixels: bytes) -> Callable[..., int]:
+        """Changed-pixel counter for a frame, over the whole grid or at a zone index."""
+        if self.background is not None:
+            mask = self.background.changed(pixels, cfg.MOTION_BG_SIGMA, cfg.MOTION_BG_MIN_THRESHOLD)
+            return functools.partial(self.background.count, mask)
+
+        scorer = _get_scorer()
+        threshold = cfg.MOTION_PIXEL_THRESHOLD
+
+        def count(index=None) -> int:
+            if index is None:
+                return scorer.count_changed(pixels, self.reference, threshold)
+            return scorer.count_changed_at(pixels, self.reference, threshold, index)
+
+        return count
+
+    def _compare(self, pixels: bytes) -> MotionResult:
+        zones = self._zone_indexes()
+        count = self._counter(pixels)
+        if not zones:
+            changed = count()
+            return MotionResult(changed / len(pixels) * 100.0, changed, len(pixels))
+
+        return combine(
+            {
+                zone.name: ZoneScore(count(index), len(zone.indices), zone.weight)
+                for zone, index in zones
+            }
+        )
+
+    def score_plane(self, plane: bytes, size: tuple[int, int]) -> float:
+        """Score a raw 8-bit grayscale plane of the given (width, height)."""
+        return self.evaluate_plane(plane, size).score
+
+    def score_image(self, image: Image.Image) -> float:
+        """Score an image against the reference and return a motion score (0-100)."""
+        return self.evaluate_image(image).score
+
+    def evaluate_plane(self, plane: bytes, size: tuple[int, int]) -> MotionResult:
+        """Like :meth:`evaluate_image` for a raw 8-bit grayscale plane."""
+        return self.evaluate_image(Image.frombytes("L", size, plane))
+
+    def evaluate_image(self, image: Image.Image) -> MotionResult:
+        """Compare an image with the reference and return the per-zone result."""
+        with metrics.timer("motion_prepare"):
+            pixels = prepare_pixels(image)
+        return self.evaluate_pixels(pixels)
+
+    def evaluate_pixels(self, pixels: bytes) -> MotionResult:
+        """Like :meth:`evaluate_image` for an already prepared comparison grid."""
+        self.last_pixels = pixels
+        if self.reference_key != _reference_key():
+            logger.info("No reference frame yet, initialising with current frame")
+            self._set_reference(pixels, time.time())
+            self.last_result = MotionResult(0.0, 0, 0)
+            self._record(0.0)
+            return self.last_result
+
+        with metrics.timer("motion_score"):
+            result = self.last_result = self._compare(pixels)
+        score = result.score
+        metrics.inc("frames_scored")
+        if score > cfg.MOTION_THRESHOLD:
+            metrics.inc("motion_triggers")
+        if self.heatmap_grid is not None:
+            reference = self.reference if self.background is None else self.background.mean_pixels()
+            self.last_heatmap = motion_heatmap(pixels, reference, self.heatmap_grid)
+
+        now = time.time()
+        if self.background is not None:
+            if score > cfg.MOTION_THRESHOLD:
+                self._set_reference(pixels, now)
+            else:
+                self.background.update(pixels, cfg.MOTION_BG_ALPHA)
+        elif _reference_due(score, self.state.ref_update_time, now):
+            self._set_reference(pixels, now)
+
+        if score <= cfg.MOTION_THRESHOLD:
+            self.state.observe_noise(score)
+        self._record(score)
 
-    if motion_detected or ref_expired or _ref_update_time == 0.0:
-        shutil.copy2(str(current_path), str(old_path))
-        _ref_update_time = time.time()
-        if ref_expired and not motion_detected:
-            logger.info("Reference image refreshed after %.0fs (max age)", ref_age)
+        logger.debug(
+            "Motion score: %.2f%% (%d/%d pixels changed)", score, result.changed, result.total
+        )
+        return result
 
-    logger.info("Motion score: %.2f%% (%d/%d pixels changed)", score, changed, total_pixels)
-    return score
+    def _record(self, score: float) -> None:
+        self.state.last_score = score
+        if self.background is not None and self.background_path is not None:
+            save_background(self.background_path, self.background)
+        if self.state_path is not None:
+            save_state(self.state_path, self.state)
@@ -0,0 +1,180 @@
+"""Staged capture pipeline on worker threads.
+
+In pipeline mode the daemon loop only captures; each frame is handed to a
+chain of stages (motion analysis, then JPEG encoding and spooling) that
+run on their own threads, and the :class:`~meisencam.spool.UploadWorker`
+uploads from the spool as before.  The sensor therefore keeps capturing
+while earlier frames are still being scored, encoded and uploaded, and
+Pillow's decoding, resizing and encoding (which release the GIL) spread
+over the Pi's cores.
+
+Stages are connected by :class:`DropOldestQueue`: when a stage falls
+behind, the oldest waiting frame is dropped rather than blocking the
+camera or growing memory without bound.  :meth:`Pipeline.close` lets
+every stage finish the frames already queued before its threads exit.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar
+
+from meisencam import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+StageFn = Callable[[Any], Any]
+
+
+class QueueClosed(Exception):
+    """Raised by :meth:`DropOldestQueue.get` once the queue is closed and empty."""
+
+
+class DropOldestQueue(Generic[T]):
+    """Thread-safe FIFO bounded to ``maxsize``; a full queue drops its oldest item."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, maxsize)
+        self.dropped = 0
+        self._items: deque[T] = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item: T) -> T | None:
+        """Append ``item``; return the item dropped to make room, if any."""
+        with self._cond:
+            if self._closed:
+                raise QueueClosed
+            dropped = None
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+            return dropped
+
+    def get(self) -> T:
+        """Remove and return the oldest item, waiting for one if necessary.
+
+        Raises:
+            QueueClosed: If the queue is closed and has no items left.
+        """
+        with self._cond:
+            while not self._items:
+                if self._closed:
+                    raise QueueClosed
+                self._cond.wait()
+            return self._items.popleft()
+
+    def close(self) -> None:
+        """Refuse new items; :meth:`get` still returns those already queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+
+class Stage:
+    """A named step run by ``workers`` threads between two queues.
+
+    ``fn`` takes an item and returns the item for the next stage, or
+    None to stop processing it (e.g. a frame without motion).
+    """
+
+    def __init__(self, name: str, fn: StageFn, workers: int = 1, maxsize: int = 2):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.inbox: DropOldestQueue = DropOldestQueue(maxsize)
+        self.outbox: DropOldestQueue | None = None
+        self._threads: list[threading.Thread] = []
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._running = self.workers
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"pipeline-{self.name}-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _forward(self, item: Any) -> None:
+        if self.outbox is None:
+            return
+        if self.outbox.put(item) is not None:
+            logger.warning("Pipeline stage after %s is behind, dropped oldest frame", self.name)
+            metrics.inc("pipeline_dropped")
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self.inbox.get()
+            except QueueClosed:
+                break
+            started = time.monotonic()
+            try:
+                result = self.fn(item)
+            except Exception:
+                logger.exception("Pipeline stage %s failed", self.name)
+                result = None
+            metrics.observe(f"pipeline_{self.name}", time.monotonic() - started)
+            if result is not None:
+                self._forward(result)
+
+        with self._lock:
+            self._running -= 1
+            last = not self._running
+        # the last worker to finish closes the next stage's inbox, so it drains in turn
+        if last and self.outbox is not None:
+            self.outbox.close()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait for the workers to exit; return False if some are still running."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self._threads = [t for t in self._threads if t.is_alive()]
+        return not self._threads
+
+
+class Pipeline:
+    """Chain of :class:`Stage` objects fed by :meth:`submit`."""
+
+    def __init__(self, stages: list[Stage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        for stage, following in zip(stages, stages[1:]):
+            stage.outbox = following.inbox
+
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+
+    def submit(self, item: Any) -> None:
+        """Hand an item to the first stage, dropping the oldest waiting one if it is behind."""
+        if self.stages[0].inbox.put(item) is not None:
+            logger.warning("Pipeline stage %s is behind, dropped oldest frame", self.stages[0].name)
+            metrics.inc("pipeline_dropped")
+
+    @property
+    def dropped(self) -> int:
+        return sum(stage.inbox.dropped for stage in self.stages)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting items and wait until every stage has drained its queue."""
+        self.stages[0].inbox.close()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for stage in self.stages:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not stage.join(remaining):
+                logger.warning("Pipeline stage %s still busy after %.0fs", stage.name, timeout)
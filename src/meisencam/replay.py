@@ -0,0 +1,258 @@
+"""Offline replay of image sequences through the motion detector.
+
+Tuning ``MOTION_THRESHOLD``, ``MOTION_PIXEL_THRESHOLD`` or
+``MOTION_BLUR_RADIUS`` does not need the birdhouse: ``meisencam replay``
+feeds a directory of timestamped images (``sample_images/``, a night of
+uploads) through the same detector the camera uses and reports the score
+and decision per frame, plus throughput, per-stage timings and peak
+memory.  With ``--sweep`` it scores every combination of a parameter
+grid instead, one combination per task on a process pool::
+
+    meisencam replay sample_images --sweep PIXEL_THRESHOLD=10,15,20 --sweep BLUR_RADIUS=1,2
+
+Sweep names are ``MOTION_*`` settings with or without the prefix.  The
+module has no camera dependency, so ``python -m meisencam.replay`` also
+works off the Pi.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+from meisencam import config
+from meisencam.motion import MotionDetector, blur_image, open_for_motion, reduce_image
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+STAGES = ("decode", "resize", "blur", "score")
+
+
+@dataclass
+class FrameResult:
+    """Score, decision and stage timings (seconds) of one replayed frame."""
+
+    name: str
+    score: float
+    changed: int
+    total: int
+    motion: bool
+    timings: dict[str, float]
+
+
+@dataclass
+class ReplaySummary:
+    """Totals of one replay run with the settings it used."""
+
+    params: dict[str, object]
+    frames: int = 0
+    motion_frames: int = 0
+    elapsed_s: float = 0.0
+    stage_s: dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+    peak_rss_kb: int = 0
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def reset_peak_rss() -> None:
+    """Reset the peak RSS counter of this process (Linux only, else a no-op)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_kb() -> int:
+    """Peak RSS since the last :func:`reset_peak_rss` (since start elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def find_images(directory: Path) -> list[Path]:
+    """Images in ``directory`` in name order, which is capture order for timestamped names."""
+    return sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def replay(
+    paths: list[Path], params: dict[str, object] | None = None
+) -> tuple[list[FrameResult], ReplaySummary]:
+    """Score ``paths`` in order with a fresh in-memory detector.
+
+    The first frame becomes the reference, as on a fresh start of the
+    camera.  ``params`` is only recorded in the summary; the detector
+    uses the current :mod:`~meisencam.config` values.
+    """
+    detector = MotionDetector()
+    summary = ReplaySummary(params=dict(params or {}))
+    results = []
+    reset_peak_rss()
+    started = time.perf_counter()
+    for path in paths:
+        t0 = time.perf_counter()
+        image = open_for_motion(path)
+        image.load()
+        t1 = time.perf_counter()
+        image = reduce_image(image)
+        t2 = time.perf_counter()
+        pixels = blur_image(image).tobytes()
+        t3 = time.perf_counter()
+        result = detector.evaluate_pixels(pixels)
+        t4 = time.perf_counter()
+        timings = dict(zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)))
+
+        motion = result.score > config.MOTION_THRESHOLD
+        results.append(
+            FrameResult(path.name, result.score, result.changed, result.total, motion, timings)
+        )
+        summary.frames += 1
+        summary.motion_frames += motion
+        for stage, secs in timings.items():
+            summary.stage_s[stage] += secs
+    summary.elapsed_s = time.perf_counter() - started
+    summary.peak_rss_kb = peak_rss_kb()
+    return results, summary
+
+
+def _setting(name: str) -> str:
+    name = name.strip().upper()
+    return name if name.startswith("MOTION_") else f"MOTION_{name}"
+
+
+def parse_grid(specs: list[str]) -> dict[str, list]:
+    """Parse ``NAME=v1,v2`` sweep options into setting name -> values.
+
+    Values are converted to the type of the current setting.
+
+    Raises:
+        ValueError: If a spec is malformed or names an unknown setting.
+    """
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        setting = _setting(name)
+        if not sep or not values or not hasattr(config, setting):
+            raise ValueError(f"Invalid sweep {spec!r}, expected a MOTION_* setting=v1,v2,...")
+        kind = type(getattr(config, setting))
+        grid[setting] = [kind(v) for v in values.split(",")]
+    return grid
+
+
+def _replay_with(paths: list[Path], params: dict[str, object]) -> ReplaySummary:
+    # runs in a pool worker: the settings only change in this process
+    for setting, value in params.items():
+        setattr(config, setting, value)
+    return replay(paths, params)[1]
+
+
+def sweep(paths: list[Path], grid: dict[str, list], jobs: int | None = None) -> list[ReplaySummary]:
+    """Replay ``paths`` once per combination of ``grid`` on ``jobs`` processes."""
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_replay_with, itertools.repeat(paths), combos))
+
+
+def _summary_row(summary: ReplaySummary) -> dict[str, object]:
+    row = dict(summary.params)
+    row.update(
+        frames=summary.frames,
+        motion_frames=summary.motion_frames,
+        fps=round(summary.fps, 1),
+        peak_rss_kb=summary.peak_rss_kb,
+    )
+    for stage, secs in summary.stage_s.items():
+        row[f"{stage}_ms"] = round(secs / summary.frames * 1000, 3) if summary.frames else 0.0
+    return row
+
+
+def _frame_row(frame: FrameResult) -> dict[str, object]:
+    row = asdict(frame)
+    timings = row.pop("timings")
+    row["score"] = round(frame.score, 3)
+    row["motion"] = int(frame.motion)
+    for stage, secs in timings.items():
+        row[f"{stage}_ms"] = round(secs * 1000, 3)
+    return row
+
+
+def write_rows(rows: list[dict[str, object]], out: TextIO, fmt: str) -> None:
+    """Write rows as CSV (header from the first row) or as a JSON list."""
+    if fmt == "json":
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+        return
+    if rows:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="meisencam replay", description="Replay an image sequence through motion detection"
+    )
+    parser.add_argument("directory", type=Path, help="directory of timestamped images")
+    parser.add_argument("-f", "--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("-o", "--output", type=Path, help="write results here instead of stdout")
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2",
+        help="score every combination of these settings (repeatable)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(), help="sweep worker processes"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(message)s")
+    paths = find_images(args.directory)
+    if not paths:
+        parser.error(f"no images in {args.directory}")
+    try:
+        grid = parse_grid(args.sweep)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if grid:
+        summaries = sweep(paths, grid, args.jobs)
+        rows = [_summary_row(summary) for summary in summaries]
+    else:
+        frames, summary = replay(paths)
+        rows = [_frame_row(frame) for frame in frames]
+        stages = " ".join(
+            f"{stage}={secs / summary.frames * 1000:.2f}ms"
+            for stage, secs in summary.stage_s.items()
+        )
+        print(
+            f"{summary.frames} frames, {summary.motion_frames} with motion, "
+            f"{summary.fps:.1f} frames/s ({stages}), peak RSS {summary.peak_rss_kb / 1024:.1f} MB",
+            file=sys.stderr,
+        )
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_rows(rows, f, args.format)
+    else:
+        write_rows(rows, sys.stdout, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Bounded in-memory ring buffer for frames."""
+
+from collections import deque
+from collections.abc import Iterator
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class FrameRing(Generic[T]):
+    """FIFO of frames bounded by item count and total bytes.
+
+    Appending beyond either limit evicts the oldest frames, so memory use
+    never exceeds ``max_bytes`` (plus the newest frame if it alone is
+    larger).  ``size`` is passed per item because frames may be encoded
+    JPEG bytes or raw arrays.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int | None = None):
+        self.max_items = max(1, max_items)
+        self.max_bytes = max_bytes
+        self._items: deque[tuple[T, int]] = deque()
+        self.nbytes = 0
+        self.evicted = 0
+
+    def append(self, item: T, size: int) -> None:
+        self._items.append((item, size))
+        self.nbytes += size
+        while len(self._items) > self.max_items or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._items) > 1
+        ):
+            _, dropped = self._items.popleft()
+            self.nbytes -= dropped
+            self.evicted += 1
+
+    def drain(self) -> list[T]:
+        """Remove and return all frames, oldest first."""
+        items = [item for item, _ in self._items]
+        self._items.clear()
+        self.nbytes = 0
+        return items
+
+    def __iter__(self) -> Iterator[T]:
+        return (item for item, _ in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
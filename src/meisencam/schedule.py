@@ -0,0 +1,115 @@
+"""Activity-driven capture intervals and time-of-day camera profiles.
+
+:class:`AdaptiveScheduler` sets the daemon's capture interval from the
+recent motion scores: right after a trigger it captures at the fast
+``min_interval`` for ``hold_cycles`` more cycles, then every idle cycle
+multiplies the interval by ``backoff`` up to ``max_interval``.  An empty
+box at night is thus photographed every few minutes, a feeding visit
+every few seconds.
+
+Profiles switch exposure, gain and the IR LED by time of day::
+
+    MEISENCAM_SCHEDULE_PROFILES=day=07:00,20000,2.0,off;night=20:30,250000,10.0,on
+
+Each profile is ``name=HH:MM,exposure_us,gain,ir`` and applies from its
+start time until the next profile starts, wrapping around midnight.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import time as dtime
+
+from meisencam import config
+
+logger = logging.getLogger(__name__)
+
+_IR_STATES = {"on": True, "1": True, "off": False, "0": False}
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Camera settings in effect from ``start`` until the next profile."""
+
+    name: str
+    start: dtime
+    exposure_time: int
+    analogue_gain: float
+    ir_led: bool
+
+
+def parse_profiles(spec: str) -> list[Profile]:
+    """Parse a profile spec into profiles sorted by start time.
+
+    Raises:
+        ValueError: If the spec is malformed.
+    """
+    profiles = []
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        name, sep, values = entry.partition("=")
+        parts = [v.strip() for v in values.split(",")]
+        if not sep or len(parts) != 4 or parts[3].lower() not in _IR_STATES:
+            raise ValueError(
+                f"Invalid schedule profile {entry!r}, expected name=HH:MM,exposure_us,gain,on|off"
+            )
+        profiles.append(
+            Profile(
+                name.strip(),
+                dtime.fromisoformat(parts[0]),
+                int(parts[1]),
+                float(parts[2]),
+                _IR_STATES[parts[3].lower()],
+            )
+        )
+    return sorted(profiles, key=lambda p: p.start)
+
+
+def load_profiles() -> list[Profile]:
+    """Profiles from ``MEISENCAM_SCHEDULE_PROFILES``."""
+    return parse_profiles(config.SCHEDULE_PROFILES)
+
+
+def profile_at(profiles: list[Profile], when: datetime) -> Profile | None:
+    """The profile in effect at ``when``; before the first start, the last one of the day."""
+    if not profiles:
+        return None
+    current = profiles[-1]
+    for profile in profiles:
+        if profile.start > when.time():
+            break
+        current = profile
+    return current
+
+
+class AdaptiveScheduler:
+    """Capture interval that ramps up on motion and backs off while idle."""
+
+    def __init__(
+        self,
+        min_interval: float = config.SCHEDULE_MIN_INTERVAL_S,
+        max_interval: float = config.SCHEDULE_MAX_INTERVAL_S,
+        backoff: float = config.SCHEDULE_BACKOFF,
+        hold_cycles: int = config.SCHEDULE_HOLD_CYCLES,
+        threshold: float = config.MOTION_THRESHOLD,
+    ):
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.backoff = max(1.0, backoff)
+        self.hold_cycles = max(0, hold_cycles)
+        self.threshold = threshold
+        self.interval = self.min_interval
+        self._hold = 0
+
+    def observe(self, score: float) -> float:
+        """Update the interval from the latest motion score and return it."""
+        previous = self.interval
+        if score > self.threshold:
+            self.interval = self.min_interval
+            self._hold = self.hold_cycles
+        elif self._hold:
+            self._hold -= 1
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        if self.interval != previous:
+            logger.info("Capture interval %.1fs -> %.1fs", previous, self.interval)
+        return self.interval
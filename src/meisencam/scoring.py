@@ -0,0 +1,136 @@
+"""Pluggable pixel-difference scoring backends for motion detection.
+
+Both backends work on raw 8-bit grayscale buffers of equal length and
+count the pixels whose absolute difference exceeds a noise threshold.
+The NumPy backend does this in a handful of vectorised operations and is
+used automatically when NumPy is importable (it is always present on the
+Pi as a dependency of picamera2); the pure-Python backend is kept as a
+fallback and as the reference implementation.
+"""
+
+import logging
+
+from meisencam import config as cfg
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+def _region_edges(length: int, parts: int) -> list[int]:
+    """Start offsets of ``parts`` near-equal regions along one axis."""
+    return [i * length // parts for i in range(parts)]
+
+
+class PythonScorer:
+    """Reference implementation using plain Python iteration."""
+
+    name = "python"
+
+    def count_changed(self, pixels_new: bytes, pixels_old: bytes, threshold: int) -> int:
+        return sum(1 for pn, po in zip(pixels_new, pixels_old) if abs(pn - po) > threshold)
+
+    def make_index(self, indices: tuple[int, ...]) -> tuple[int, ...]:
+        return indices
+
+    def count_changed_at(
+        self, pixels_new: bytes, pixels_old: bytes, threshold: int, index: tuple[int, ...]
+    ) -> int:
+        """Count changed pixels among the positions in ``index`` only."""
+        return sum(1 for i in index if abs(pixels_new[i] - pixels_old[i]) > threshold)
+
+    def heatmap(
+        self,
+        pixels_new: bytes,
+        pixels_old: bytes,
+        size: tuple[int, int],
+        threshold: int,
+        grid: tuple[int, int],
+    ) -> list[list[float]]:
+        """Percentage of changed pixels per region, as ``grid[1]`` rows of ``grid[0]``."""
+        width, height = size
+        grid_w, grid_h = grid
+        xs = _region_edges(width, grid_w) + [width]
+        ys = _region_edges(height, grid_h) + [height]
+
+        rows = []
+        for gy in range(grid_h):
+            row = []
+            for gx in range(grid_w):
+                changed = 0
+                for y in range(ys[gy], ys[gy + 1]):
+                    offset = y * width
+                    for x in range(offset + xs[gx], offset + xs[gx + 1]):
+                        if abs(pixels_new[x] - pixels_old[x]) > threshold:
+                            changed += 1
+                area = (ys[gy + 1] - ys[gy]) * (xs[gx + 1] - xs[gx])
+                row.append(changed / area * 100.0 if area else 0.0)
+            rows.append(row)
+        return rows
+
+
+class NumpyScorer:
+    """Vectorised implementation operating on ``uint8`` arrays."""
+
+    name = "numpy"
+
+    @staticmethod
+    def _changed_mask(pixels_new: bytes, pixels_old: bytes, threshold: int):
+        new = np.frombuffer(pixels_new, dtype=np.uint8)
+        old = np.frombuffer(pixels_old, dtype=np.uint8)
+        # |a - b| without widening to a signed type
+        return (np.maximum(new, old) - np.minimum(new, old)) > threshold
+
+    def count_changed(self, pixels_new: bytes, pixels_old: bytes, threshold: int) -> int:
+        return int(np.count_nonzero(self._changed_mask(pixels_new, pixels_old, threshold)))
+
+    def make_index(self, indices: tuple[int, ...]):
+        return np.asarray(indices, dtype=np.intp)
+
+    def count_changed_at(self, pixels_new: bytes, pixels_old: bytes, threshold: int, index) -> int:
+        """Count changed pixels among the positions in ``index`` only."""
+        new = np.frombuffer(pixels_new, dtype=np.uint8)[index]
+        old = np.frombuffer(pixels_old, dtype=np.uint8)[index]
+        return int(np.count_nonzero((np.maximum(new, old) - np.minimum(new, old)) > threshold))
+
+    def heatmap(
+        self,
+        pixels_new: bytes,
+        pixels_old: bytes,
+        size: tuple[int, int],
+        threshold: int,
+        grid: tuple[int, int],
+    ) -> list[list[float]]:
+        """Percentage of changed pixels per region, as ``grid[1]`` rows of ``grid[0]``."""
+        width, height = size
+        grid_w, grid_h = grid
+        mask = self._changed_mask(pixels_new, pixels_old, threshold).reshape(height, width)
+        xs = _region_edges(width, grid_w)
+        ys = _region_edges(height, grid_h)
+
+        counts = np.add.reduceat(np.add.reduceat(mask, ys, axis=0, dtype=np.int32), xs, axis=1)
+        region_h = np.diff(ys + [height])
+        region_w = np.diff(xs + [width])
+        return (counts / np.outer(region_h, region_w) * 100.0).tolist()
+
+
+def get_scorer(name: str | None = None) -> PythonScorer | NumpyScorer:
+    """Return the scoring backend for ``name`` ("auto", "numpy" or "python").
+
+    Defaults to ``MEISENCAM_MOTION_BACKEND``.  "auto" picks NumPy when it
+    is installed; requesting "numpy" without NumPy falls back to Python
+    with a warning.
+    """
+    name = (name or cfg.MOTION_BACKEND).lower()
+    if name not in ("auto", "numpy", "python"):
+        raise ValueError(f"Unknown motion backend: {name!r}")
+    if name == "python":
+        return PythonScorer()
+    if np is None:
+        if name == "numpy":
+            logger.warning("NumPy not installed, falling back to pure-Python scoring")
+        return PythonScorer()
+    return NumpyScorer()
@@ -0,0 +1,212 @@
+"""Camera sensor backends: Picamera2 or a simulated sensor.
+
+:class:`~meisencam.camera.MeisenCamera` drives a ``Picamera2`` object: it
+configures the main and lores streams, sets controls, waits for settled
+frame metadata and grabs arrays.  The simulated sensors implement that
+same subset of the Picamera2 API without hardware, so the whole capture
+path (settling, lores scoring, bursts, profiles, uploads) also runs on a
+plain Linux machine, e.g. for end-to-end benchmarks in CI:
+
+* :class:`ReplaySensor` serves the images of a directory such as
+  ``sample_images/`` in a loop.
+* :class:`SyntheticSensor` renders a noisy background that a dark "bird"
+  crosses on a fixed script, so the frames with motion are known.
+
+Both deliver frames at the configured stream sizes and at most ``fps``
+frames per second, like a free-running sensor.  ``MEISENCAM_CAMERA_BACKEND``
+selects the backend.  Arrays are NumPy arrays as with Picamera2, so the
+simulated sensors need NumPy.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from PIL import Image, ImageChops, ImageDraw
+
+from meisencam import config
+from meisencam.lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# loaded when the first camera is opened, not by subcommands that never capture
+picamera2 = lazy_import("picamera2")
+
+# Chroma value of the simulated YUV420 planes (no colour)
+NEUTRAL_CHROMA = 128
+# Pre-rendered noisy backgrounds the synthetic sensor cycles through
+NOISE_VARIANTS = 4
+
+
+class SimulatedSensor:
+    """Picamera2 stand-in; subclasses implement :meth:`_render`."""
+
+    def __init__(self, fps: float = config.CAMERA_SIM_FPS):
+        import numpy
+
+        self._np = numpy
+        self.fps = fps
+        self.sizes = {
+            "main": (config.CAMERA_WIDTH, config.CAMERA_HEIGHT),
+            "lores": (config.LORES_WIDTH, config.LORES_HEIGHT),
+        }
+        self.controls: dict[str, Any] = {}
+        self.started = False
+        # frames delivered by capture_array/capture_file, which drive the script
+        self.frames = 0
+        self._next_frame = 0.0
+
+    def _render(self, index: int, size: tuple[int, int]) -> Image.Image:
+        """Frame number ``index`` as an RGB image of ``size``."""
+        raise NotImplementedError
+
+    # -- Picamera2 API ---------------------------------------------------------
+
+    def create_still_configuration(self, main: dict, lores: dict | None = None, **_: Any) -> dict:
+        return {"main": main, "lores": lores}
+
+    def configure(self, conf: dict) -> None:
+        for stream in ("main", "lores"):
+            if conf.get(stream):
+                self.sizes[stream] = tuple(conf[stream]["size"])
+
+    def set_controls(self, controls: dict[str, Any]) -> None:
+        self.controls.update(controls)
+
+    def start(self) -> None:
+        self.started = True
+        self._next_frame = time.monotonic()
+
+    def stop(self) -> None:
+        self.started = False
+
+    def close(self) -> None:
+        self.stop()
+
+    def capture_metadata(self) -> dict[str, Any]:
+        """Metadata of the next frame: the requested exposure and gain, settled at once."""
+        self._wait_frame()
+        return {
+            "ExposureTime": self.controls.get("ExposureTime"),
+            "AnalogueGain": self.controls.get("AnalogueGain"),
+        }
+
+    def capture_array(self, name: str = "main") -> Any:
+        """The next frame of stream ``name``: RGB for "main", YUV420 for "lores"."""
+        image = self._next_image(name)
+        if name == "main":
+            return self._np.asarray(image)
+        width, height = image.size
+        planes = self._np.full((height * 3 // 2, width), NEUTRAL_CHROMA, dtype=self._np.uint8)
+        planes[:height] = self._np.asarray(image.convert("L"))
+        return planes
+
+    def capture_file(self, path: str) -> None:
+        self._next_image("main").save(path, format="JPEG", quality=config.FRAME_JPEG_QUALITY)
+
+    # -- frame timing ----------------------------------------------------------
+
+    def _wait_frame(self) -> None:
+        """Block until the next frame is due, like a sensor running at ``fps``."""
+        if self.fps <= 0:
+            return
+        now = time.monotonic()
+        if self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        self._next_frame = max(self._next_frame, now) + 1 / self.fps
+
+    def _next_image(self, name: str) -> Image.Image:
+        self._wait_frame()
+        image = self._render(self.frames, self.sizes[name])
+        self.frames += 1
+        return image
+
+
+class ReplaySensor(SimulatedSensor):
+    """Serves the images of a directory in name order, starting over at the end."""
+
+    def __init__(self, directory: Path, fps: float = config.CAMERA_SIM_FPS):
+        from meisencam.replay import find_images
+
+        super().__init__(fps)
+        self.paths = find_images(directory)
+        if not self.paths:
+            raise ValueError(f"No images to replay in {directory}")
+        logger.info("Replaying %d image(s) from %s", len(self.paths), directory)
+
+    def _render(self, index: int, size: tuple[int, int]) -> Image.Image:
+        with Image.open(self.paths[index % len(self.paths)]) as image:
+            image.draft("RGB", size)
+            return image.convert("RGB").resize(size)
+
+
+class SyntheticSensor(SimulatedSensor):
+    """Noisy gradient background with scripted motion.
+
+    Of every ``motion_period`` frames, the last ``motion_frames`` show a
+    dark disc moving across the frame; the others only differ by sensor
+    noise of standard deviation ``noise``.  A period of 0 never shows
+    motion.
+    """
+
+    def __init__(
+        self,
+        fps: float = config.CAMERA_SIM_FPS,
+        motion_period: int = config.CAMERA_SIM_MOTION_PERIOD,
+        motion_frames: int = config.CAMERA_SIM_MOTION_FRAMES,
+        noise: float = 4.0,
+    ):
+        super().__init__(fps)
+        self.motion_period = motion_period
+        self.motion_frames = motion_frames
+        self.noise = noise
+        self._backgrounds: dict[tuple[int, int], list[Image.Image]] = {}
+
+    def has_motion(self, index: int) -> bool:
+        if not self.motion_period:
+            return False
+        return index % self.motion_period >= self.motion_period - self.motion_frames
+
+    def _quiet_frames(self, size: tuple[int, int]) -> list[Image.Image]:
+        """A few noisy backgrounds per size, rendered once and then cycled.
+
+        Rendering noise for every frame would cost more than the code
+        under test at full resolution; a real sensor delivers frames for free.
+        """
+        if size not in self._backgrounds:
+            gradient = Image.linear_gradient("L").resize(size).point(lambda v: 60 + v // 2)
+            frames = []
+            for _ in range(NOISE_VARIANTS if self.noise else 1):
+                frame = gradient
+                if self.noise:
+                    # effect_noise is centred on 128
+                    noise = Image.effect_noise(size, self.noise)
+                    frame = ImageChops.add(gradient, noise, offset=-128)
+                frames.append(frame)
+            self._backgrounds[size] = frames
+        return self._backgrounds[size]
+
+    def _render(self, index: int, size: tuple[int, int]) -> Image.Image:
+        backgrounds = self._quiet_frames(size)
+        image = backgrounds[index % len(backgrounds)]
+        if self.has_motion(index):
+            image = image.copy()
+            width, height = size
+            step = index % self.motion_period - (self.motion_period - self.motion_frames)
+            x = (step + 1) * width // (self.motion_frames + 1)
+            y = height // 2
+            r = height // 5
+            ImageDraw.Draw(image).ellipse((x - r, y - r, x + r, y + r), fill=20)
+        return image.convert("RGB")
+
+
+def open_sensor(backend: str = config.CAMERA_BACKEND) -> Any:
+    """Open the sensor for ``backend`` ("picamera2", "replay" or "synthetic")."""
+    if backend == "picamera2":
+        return picamera2.Picamera2()
+    if backend == "replay":
+        return ReplaySensor(Path(config.CAMERA_REPLAY_DIR))
+    if backend == "synthetic":
+        return SyntheticSensor()
+    raise ValueError(f"Unknown camera backend: {backend!r}")
@@ -0,0 +1,336 @@
+"""Bounded on-disk upload queue drained by a background worker.
+
+Frames are copied into a spool directory on the ramdisk under their final
+remote filename, so a failed upload is retried later instead of being
+lost.  When the spool is full the oldest frames are evicted first.  Each
+frame may carry a short metadata string (the ``timestamp;score;mode``
+log prefix) in a ``.meta`` sidecar.
+
+With a :class:`~meisencam.archive.FrameArchive` attached, every enqueued
+frame is also archived, and once the spool runs empty the worker refills
+it with archived frames that never reached the share (evicted during a
+long outage, or lost with the ramdisk on power-off).
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from meisencam import metrics
+from meisencam.archive import FrameArchive
+
+logger = logging.getLogger(__name__)
+
+# Remote filenames remembered by the worker to keep names unique
+RECENT_NAMES = 256
+
+
+@dataclass
+class SpoolItem:
+    """A spooled frame waiting for upload."""
+
+    path: Path
+
+    @property
+    def filename(self) -> str:
+        return self.path.name
+
+    @property
+    def meta_path(self) -> Path:
+        return self.path.with_suffix(".meta")
+
+    @property
+    def meta(self) -> str:
+        try:
+            return self.meta_path.read_text()
+        except FileNotFoundError:
+            return ""
+
+    @property
+    def spooled_at(self) -> float:
+        """When the frame was spooled; now if it has been evicted meanwhile."""
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return time.time()
+
+
+class UploadSpool:
+    """Directory-backed FIFO of frames, bounded to ``max_items``."""
+
+    def __init__(self, directory: Path, max_items: int):
+        self.directory = directory
+        self.max_items = max(1, max_items)
+        self.evicted = 0
+        self._lock = threading.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _tmp_path(item: SpoolItem) -> Path:
+        # per thread, so frames written concurrently never share a temporary file
+        return item.path.with_name(f"{item.path.name}.{threading.get_ident()}.tmp")
+
+    def add(self, source: Path, filename: str, meta: str = "") -> SpoolItem:
+        """Copy ``source`` into the spool as ``filename`` and evict overflow."""
+        item = SpoolItem(self.directory / filename)
+        tmp = self._tmp_path(item)
+        shutil.copyfile(source, tmp)
+        self._commit(item, tmp, meta)
+        return item
+
+    def add_bytes(self, data: bytes, filename: str, meta: str = "") -> SpoolItem:
+        """Store in-memory JPEG ``data`` in the spool as ``filename``."""
+        item = SpoolItem(self.directory / filename)
+        tmp = self._tmp_path(item)
+        tmp.write_bytes(data)
+        self._commit(item, tmp, meta)
+        return item
+
+    def _commit(self, item: SpoolItem, tmp: Path, meta: str) -> None:
+        with self._lock:
+            if meta:
+                item.meta_path.write_text(meta)
+            os.replace(tmp, item.path)
+            for old in self._pending()[: -self.max_items]:
+                logger.warning("Upload spool full, dropping %s", old.filename)
+                self._remove(old)
+                self.evicted += 1
+                metrics.inc("upload_evicted")
+
+    def _pending(self) -> list[SpoolItem]:
+        # remote filenames start with the capture timestamp, so name order is age order
+        return [SpoolItem(p) for p in sorted(self.directory.glob("*.jpg"))]
+
+    def pending(self) -> list[SpoolItem]:
+        """Spooled frames, oldest first."""
+        with self._lock:
+            return self._pending()
+
+    def _remove(self, item: SpoolItem) -> None:
+        item.path.unlink(missing_ok=True)
+        item.meta_path.unlink(missing_ok=True)
+
+    def remove(self, item: SpoolItem) -> None:
+        with self._lock:
+            self._remove(item)
+
+    def __len__(self) -> int:
+        return len(self.pending())
+
+
+@dataclass
+class UploadMetrics:
+    """Counters describing the upload queue."""
+
+    queue_depth: int = 0
+    uploaded: int = 0
+    failures: int = 0
+    evicted: int = 0
+    last_latency_s: float = 0.0
+    total_latency_s: float = 0.0
+
+    @property
+    def mean_latency_s(self) -> float:
+        return self.total_latency_s / self.uploaded if self.uploaded else 0.0
+
+
+class UploadWorker:
+    """Drain an :class:`UploadSpool` with exponential backoff on failure.
+
+    ``send`` uploads one item and returns True on success; exceptions
+    count as failures.  Use :meth:`start` for a background thread in
+    long-running mode, or :meth:`drain` to upload synchronously within a
+    time budget (cron mode, where leftovers are retried on the next run).
+    With an ``archive``, idle time is used to catch up on archived frames
+    in batches of ``catchup_batch``.
+
+    Remote filenames only have second resolution, so a frame enqueued
+    under a name the worker handed out recently (several stills within a
+    second in stream mode) gets a sequence tag (``...-m1-s2.jpg``) instead
+    of replacing the earlier frame in the spool, archive and share.
+
+    ``send_batch``, if given, is used instead of ``send`` and uploads up
+    to ``batch_size`` items in one request; a batch succeeds or fails as
+    a whole.
+    """
+
+    def __init__(
+        self,
+        spool: UploadSpool,
+        send: Callable[[SpoolItem], bool] | None,
+        backoff_base: float = 1.0,
+        backoff_max: float = 300.0,
+        archive: FrameArchive | None = None,
+        catchup_batch: int = 10,
+        send_batch: Callable[[list[SpoolItem]], bool] | None = None,
+        batch_size: int = 1,
+    ):
+        self.spool = spool
+        self.send = send
+        self.send_batch = send_batch
+        self.batch_size = max(1, batch_size) if send_batch is not None else 1
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.archive = archive
+        self.catchup_batch = max(1, min(catchup_batch, spool.max_items))
+        self._metrics = UploadMetrics()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._consecutive_failures = 0
+        self._recent: OrderedDict[str, None] = OrderedDict()
+        # frames are enqueued from several encode threads in pipeline mode
+        self._recent_lock = threading.Lock()
+
+    @property
+    def metrics(self) -> UploadMetrics:
+        self._metrics.queue_depth = len(self.spool)
+        self._metrics.evicted = self.spool.evicted
+        return self._metrics
+
+    def _unique(self, filename: str) -> str:
+        stem, _, ext = filename.rpartition(".")
+        name, seq = filename, 1
+        with self._recent_lock:
+            while name in self._recent:
+                seq += 1
+                name = f"{stem}-s{seq}.{ext}"
+            self._recent[name] = None
+            if len(self._recent) > RECENT_NAMES:
+                self._recent.popitem(last=False)
+        return name
+
+    def enqueue(self, source: Path, filename: str, meta: str = "") -> SpoolItem:
+        """Spool a frame and wake the worker thread."""
+        filename = self._unique(filename)
+        item = self.spool.add(source, filename, meta)
+        if self.archive is not None:
+            self.archive.append(item.path.read_bytes(), filename, meta)
+        self._wake.set()
+        return item
+
+    def enqueue_bytes(self, data: bytes, filename: str, meta: str = "") -> SpoolItem:
+        """Spool an in-memory frame and wake the worker thread."""
+        filename = self._unique(filename)
+        item = self.spool.add_bytes(data, filename, meta)
+        if self.archive is not None:
+            self.archive.append(data, filename, meta)
+        self._wake.set()
+        return item
+
+    def _upload(self, items: list[SpoolItem]) -> bool:
+        if self._consecutive_failures:
+            metrics.inc("upload_retries")
+        started = time.time()
+        names = ", ".join(item.filename for item in items)
+        # taken before sending: a full spool may evict the frames while they are in flight
+        spooled = [item.spooled_at for item in items]
+        try:
+            if self.send_batch is not None:
+                ok = self.send_batch(items)
+            else:
+                ok = self.send(items[0])
+        except Exception:
+            logger.exception("Upload of %s failed", names)
+            ok = False
+
+        if not ok:
+            self._metrics.failures += 1
+            self._consecutive_failures += 1
+            metrics.inc("upload_failures")
+            return False
+
+        self._consecutive_failures = 0
+        for item, spooled_at in zip(items, spooled):
+            latency = time.time() - spooled_at
+            self.spool.remove(item)
+            if self.archive is not None:
+                self.archive.mark_uploaded(item.filename)
+            self._metrics.uploaded += 1
+            self._metrics.last_latency_s = latency
+            self._metrics.total_latency_s += latency
+            metrics.inc("uploads")
+            metrics.observe("upload_latency", latency)
+        logger.info(
+            "Uploaded %s in %.2fs (%.1fs after capture)",
+            names,
+            time.time() - started,
+            latency,
+        )
+        return True
+
+    def _backoff(self) -> float:
+        exponent = max(0, self._consecutive_failures - 1)
+        return min(self.backoff_max, self.backoff_base * 2**exponent)
+
+    def _catch_up(self) -> list[SpoolItem]:
+        """Move the next batch of never-uploaded archived frames into the spool."""
+        if self.archive is None:
+            return []
+        entries = self.archive.pending(self.catchup_batch)
+        for entry in entries:
+            try:
+                data = self.archive.read(entry)
+            except OSError:
+                # the segment was dropped by retention in the meantime
+                logger.warning("Archived frame %s is gone", entry.filename)
+                continue
+            self.spool.add_bytes(data, entry.filename, entry.meta)
+        if entries:
+            logger.info("Catching up on %d archived frame(s)", len(entries))
+            metrics.inc("upload_catchup", len(entries))
+        return self.spool.pending()
+
+    def drain(self, timeout: float | None = None) -> int:
+        """Upload pending items until empty, a failure, or ``timeout``; return count."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        uploaded = 0
+        items = self.spool.pending() or self._catch_up()
+        while items:
+            for start in range(0, len(items), self.batch_size):
+                if self._stop.is_set():
+                    return uploaded
+                if deadline is not None and time.monotonic() >= deadline:
+                    return uploaded
+                batch = items[start : start + self.batch_size]
+                if not self._upload(batch):
+                    return uploaded
+                uploaded += len(batch)
+            items = self.spool.pending() or self._catch_up()
+        return uploaded
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception:
+                # never let the thread die: queued frames would then wait forever
+                logger.exception("Upload worker error")
+                self._consecutive_failures += 1
+            if self._stop.is_set():
+                break
+            if self._consecutive_failures:
+                delay = self._backoff()
+                logger.info("Retrying uploads in %.0fs (%d queued)", delay, len(self.spool))
+                self._stop.wait(delay)
+            else:
+                self._wake.wait()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="upload-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the worker thread; frames still queued stay in the spool."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,61 @@
+"""Persistent motion detector state shared between capture cycles.
+
+Cron starts a fresh process for every frame, so anything the detector
+needs to remember (when the reference was taken, how noisy recent
+no-motion frames were, the last score) is kept in a small JSON file on
+the ramdisk.  Writes are atomic so a killed process never leaves a
+half-written file behind.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+NOISE_ALPHA = 0.05
+
+
+@dataclass
+class DetectorState:
+    """Detector bookkeeping that must survive between processes."""
+
+    ref_update_time: float = 0.0
+    last_score: float = 0.0
+    noise_mean: float = 0.0
+    noise_var: float = 0.0
+    samples: int = 0
+
+    def observe_noise(self, score: float, alpha: float = NOISE_ALPHA) -> None:
+        """Fold a no-motion score into the exponentially weighted noise statistics."""
+        if self.samples == 0:
+            self.noise_mean, self.noise_var = score, 0.0
+        else:
+            diff = score - self.noise_mean
+            self.noise_mean += alpha * diff
+            self.noise_var = (1 - alpha) * (self.noise_var + alpha * diff * diff)
+        self.samples += 1
+
+
+def load_state(path: Path) -> DetectorState:
+    """Load detector state, returning a fresh state if missing or unreadable."""
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return DetectorState()
+    except (OSError, ValueError):
+        logger.warning("Unreadable detector state %s, starting fresh", path)
+        return DetectorState()
+
+    names = {f.name for f in dataclasses.fields(DetectorState)}
+    return DetectorState(**{k: v for k, v in data.items() if k in names})
+
+
+def save_state(path: Path, state: DetectorState) -> None:
+    """Atomically write detector state as JSON."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(dataclasses.asdict(state)))
+    os.replace(tmp, path)
@@ -1,27 +1,103 @@
-"""WebDAV upload to Nextcloud public share."""
+"""WebDAV upload to Nextcloud public share.
 
+``requests`` is imported lazily: a capture cycle without motion never
+loads it (nor urllib3 and ssl), which shortens every cron start.
+"""
+
+import functools
 import logging
+import socket
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
-import requests
+from meisencam import config, metrics
+from meisencam.frame import Frame
+from meisencam.lazy import lazy_import
 
-from meisencam import config
+requests = lazy_import("requests")
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 64 * 1024
+# headers naming the sending birdhouse and a frame's ``timestamp;score;mode`` record
+NODE_HEADER = "X-Meisencam-Node"
+META_HEADER = "X-Meisencam-Meta"
+
+
+def remote_filename(mode: int, when: datetime | None = None, tag: str | None = None) -> str:
+    """Return the remote filename for a frame, e.g. ``2026-02-21-12-00-00-m1.jpg``.
+
+    Extra frames of one event get a tag appended (``...-m1-b2.jpg`` for
+    burst frame 2, ``...-m1-p1.jpg`` for the last pre-motion frame) so
+    frames captured within the same second do not overwrite each other.
+    Other names repeated within a second (stills in stream mode) are made
+    unique by :class:`~meisencam.spool.UploadWorker`.
+    """
+    timestamp = (when or datetime.now()).strftime("%Y-%m-%d-%H-%M-%S")
+    suffix = f"-{tag}" if tag else ""
+    return f"{timestamp}-m{mode}{suffix}.jpg"
+
+
+def _in_memory(image: Path | Frame | bytes) -> bytes | None:
+    """The JPEG bytes of an in-memory frame or of raw bytes; None for a file."""
+    if isinstance(image, Frame):
+        return image.jpeg
+    if isinstance(image, bytes):
+        return image
+    return None
+
+
+@contextmanager
+def _open_body(image: Path | Frame | bytes) -> Iterator[object]:
+    """Request body for a file (streamed from disk), an in-memory frame or JPEG bytes."""
+    data = _in_memory(image)
+    if data is not None:
+        yield data
+    else:
+        with open(image, "rb") as f:
+            yield f
+
+
+def put_file(
+    image_path: Path | Frame | bytes,
+    filename: str,
+    *,
+    webdav_base: str = config.WEBDAV_BASE,
+    share_token: str = config.SHARE_TOKEN,
+    timeout: float | tuple[float, float] = (
+        config.UPLOAD_CONNECT_TIMEOUT_S,
+        config.UPLOAD_TIMEOUT_S,
+    ),
+) -> "requests.Response":
+    """PUT a file, in-memory frame or JPEG bytes to the WebDAV share under ``filename``.
+
+    Raises:
+        FileNotFoundError: If the image file does not exist.
+        requests.RequestException: On connection errors and timeouts.
+    """
+    url = f"{webdav_base}/{filename}"
+    logger.info("Uploading %s -> %s", image_path, url)
+    with _open_body(image_path) as img, metrics.timer("upload_put"):
+        response = requests.put(url, data=img, auth=(share_token, ""), timeout=timeout)
+    _count_upload(image_path, response)
+    logger.info("Upload response: %d", response.status_code)
+    return response
+
 
 def upload_image(
-    image_path: Path,
+    image_path: Path | Frame,
     mode: int,
     *,
     webdav_base: str = config.WEBDAV_BASE,
     share_token: str = config.SHARE_TOKEN,
-) -> requests.Response | None:
+) -> "requests.Response | None":
     """Upload an image via WebDAV if motion was detected.
 
     Args:
-        image_path: Path to the image file.
+        image_path: Path to the image file, or a :class:`~meisencam.frame.Frame`
+            uploaded straight from memory.
         mode: Motion mode (1 = motion detected, 0 = no motion).
         webdav_base: WebDAV endpoint URL.
         share_token: Nextcloud public share token used as username.
@@ -33,18 +109,164 @@ def upload_image(
         logger.info("No motion (mode=%d), skipping upload", mode)
         return None
 
-    timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-    filename = f"{timestamp}-m{mode}.jpg"
-    url = f"{webdav_base}/{filename}"
-
-    logger.info("Uploading %s -> %s", image_path, url)
     try:
-        with open(image_path, "rb") as img:
-            response = requests.put(
-                url, data=img, auth=(share_token, "")
-            )
-        logger.info("Upload response: %d", response.status_code)
-        return response
+        when = image_path.captured_at if isinstance(image_path, Frame) else None
+        return put_file(
+            image_path,
+            remote_filename(mode, when),
+            webdav_base=webdav_base,
+            share_token=share_token,
+        )
     except FileNotFoundError:
         logger.error("Image file not found: %s", image_path)
         return None
+
+
+def _count_upload(image: Path | Frame | bytes, response: "requests.Response") -> None:
+    metrics.inc("upload_requests")
+    if response.ok:
+        data = _in_memory(image)
+        metrics.inc("upload_bytes", len(data) if data is not None else image.stat().st_size)
+
+
+def _read_chunks(image: Path | Frame | bytes, chunk_size: int):
+    data = _in_memory(image)
+    if data is not None:
+        view = memoryview(data)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset : offset + chunk_size]
+        return
+    with open(image, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+class WebDavUploader:
+    """Upload frames over one pooled, keep-alive HTTP session.
+
+    Creating the uploader once and reusing it across cycles means only
+    the first upload pays for the TCP connect and TLS handshake; later
+    uploads reuse the pooled connection.  Requests use separate connect
+    and read timeouts.  The body is streamed from disk in
+    ``chunk_size`` blocks with a Content-Length header; set
+    ``chunked=True`` to use ``Transfer-Encoding: chunked`` instead (not
+    supported by every Nextcloud/PHP-FPM setup).
+    """
+
+    def __init__(
+        self,
+        webdav_base: str = config.WEBDAV_BASE,
+        share_token: str = config.SHARE_TOKEN,
+        *,
+        connect_timeout: float = config.UPLOAD_CONNECT_TIMEOUT_S,
+        read_timeout: float = config.UPLOAD_TIMEOUT_S,
+        chunk_size: int = CHUNK_SIZE,
+        chunked: bool = False,
+        pool_size: int = 2,
+    ):
+        self.webdav_base = webdav_base
+        self.timeout = (connect_timeout, read_timeout)
+        self.chunk_size = chunk_size
+        self.chunked = chunked
+        self._auth = (share_token, "")
+        self._pool_size = pool_size
+
+    @functools.cached_property
+    def session(self) -> "requests.Session":
+        """The pooled session, created on the first upload."""
+        session = requests.Session()
+        session.auth = self._auth
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def put(self, image_path: Path | Frame | bytes, filename: str) -> "requests.Response":
+        """PUT a file, in-memory frame or JPEG bytes to the share under ``filename``.
+
+        Raises:
+            FileNotFoundError: If the image file does not exist.
+            requests.RequestException: On connection errors and timeouts.
+        """
+        url = f"{self.webdav_base}/{filename}"
+        logger.info("Uploading %s -> %s", image_path, url)
+        if self.chunked:
+            if _in_memory(image_path) is None and not image_path.is_file():
+                raise FileNotFoundError(image_path)
+            with metrics.timer("upload_put"):
+                response = self.session.put(
+                    url, data=_read_chunks(image_path, self.chunk_size), timeout=self.timeout
+                )
+        else:
+            with _open_body(image_path) as img, metrics.timer("upload_put"):
+                response = self.session.put(url, data=img, timeout=self.timeout)
+        _count_upload(image_path, response)
+        logger.info("Upload response: %d", response.status_code)
+        return response
+
+    def close(self) -> None:
+        if "session" in self.__dict__:
+            self.session.close()
+
+
+class CollectorUploader:
+    """Send frames to a meisencam collector, several per request.
+
+    Each :meth:`post_batch` is one ``multipart/form-data`` POST to
+    ``{url}/batch``: one part per frame, named by its remote filename and
+    carrying its ``timestamp;score;mode`` record in a part header.  The
+    node name and the shared secret (as Basic auth user, like a share
+    token) are sent with every request.  Like :class:`WebDavUploader` it
+    keeps one pooled, keep-alive session.
+    """
+
+    def __init__(
+        self,
+        url: str = config.COLLECTOR_URL,
+        node: str = config.COLLECTOR_NODE,
+        secret: str = config.COLLECTOR_SECRET,
+        *,
+        connect_timeout: float = config.UPLOAD_CONNECT_TIMEOUT_S,
+        read_timeout: float = config.UPLOAD_TIMEOUT_S,
+    ):
+        self.url = url.rstrip("/")
+        self.node = node or socket.gethostname()
+        self.timeout = (connect_timeout, read_timeout)
+        self._auth = (secret, "") if secret else None
+
+    @functools.cached_property
+    def session(self) -> "requests.Session":
+        """The pooled session, created on the first batch."""
+        session = requests.Session()
+        session.auth = self._auth
+        session.headers[NODE_HEADER] = self.node
+        return session
+
+    def post_batch(
+        self, frames: list[tuple[Path | Frame | bytes, str, str]]
+    ) -> "requests.Response":
+        """POST (image, remote filename, meta) triples in one request.
+
+        Raises:
+            FileNotFoundError: If an image file does not exist.
+            requests.RequestException: On connection errors and timeouts.
+        """
+        parts = []
+        for image, filename, meta in frames:
+            data = _in_memory(image)
+            if data is None:
+                data = image.read_bytes()
+            parts.append(("frame", (filename, data, "image/jpeg", {META_HEADER: meta})))
+        url = f"{self.url}/batch"
+        logger.info("Uploading %d frame(s) -> %s", len(frames), url)
+        with metrics.timer("upload_batch"):
+            response = self.session.post(url, files=parts, timeout=self.timeout)
+        metrics.inc("upload_requests")
+        if response.ok:
+            metrics.inc("upload_bytes", sum(len(part[1][1]) for part in parts))
+        logger.info("Upload response: %d", response.status_code)
+        return response
+
+    def close(self) -> None:
+        if "session" in self.__dict__:
+            self.session.close()
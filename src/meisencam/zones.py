@@ -0,0 +1,120 @@
+"""Regions of interest (zones) for motion scoring.
+
+Zones are rectangles given as fractions of the frame, so they stay valid
+when the comparison grid size changes::
+
+    MEISENCAM_MOTION_ZONES=entrance:0.35,0.2,0.3,0.4:2;edge:0,0,0.1,1:0
+
+Each zone is ``name:x,y,width,height[:weight]``; zones are separated by
+``;``.  A weight of 0 ignores a zone entirely (e.g. swaying nest material
+or an IR reflection).  Optionally ``MEISENCAM_MOTION_MASK_IMAGE`` points
+to a grayscale image where white marks watched pixels; it restricts all
+zones, or forms a single "mask" zone when no rectangles are configured.
+
+Every zone is turned into a precomputed pixel index once, so scoring
+costs O(pixels in the zones) rather than O(frame).
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PIL import Image
+
+from meisencam import config as cfg
+
+
+@dataclass(frozen=True)
+class Zone:
+    """A scored region with its precomputed comparison-grid pixel indices."""
+
+    name: str
+    weight: float
+    indices: tuple[int, ...]
+
+
+@dataclass
+class ZoneScore:
+    """Changed-pixel count of one zone."""
+
+    changed: int
+    total: int
+    weight: float
+
+    @property
+    def score(self) -> float:
+        return self.changed / self.total * 100.0 if self.total else 0.0
+
+
+@dataclass
+class MotionResult:
+    """Outcome of comparing one frame with the reference.
+
+    ``score`` is the percentage of changed pixels over the whole frame,
+    or the weighted mean of the zone scores when zones are configured.
+    ``changed`` and ``total`` count the pixels that contributed.
+    """
+
+    score: float
+    changed: int
+    total: int
+    zones: dict[str, ZoneScore] = field(default_factory=dict)
+
+
+def _rect_indices(rect: tuple[float, ...], size: tuple[int, int]) -> set[int]:
+    width, height = size
+    fx, fy, fw, fh = rect
+    x0, y0 = round(fx * width), round(fy * height)
+    x1, y1 = round((fx + fw) * width), round((fy + fh) * height)
+    x0, x1 = max(0, x0), min(width, x1)
+    y0, y1 = max(0, y0), min(height, y1)
+    return {y * width + x for y in range(y0, y1) for x in range(x0, x1)}
+
+
+def _mask_indices(path: Path, size: tuple[int, int]) -> set[int]:
+    mask = Image.open(path).convert("L").resize(size, Image.Resampling.NEAREST)
+    return {i for i, value in enumerate(mask.tobytes()) if value >= 128}
+
+
+def parse_zones(spec: str, size: tuple[int, int], mask: Path | None = None) -> list[Zone]:
+    """Build zones for a comparison grid of ``size`` from a zone spec and mask.
+
+    Raises:
+        ValueError: If the spec is malformed.
+    """
+    allowed = _mask_indices(mask, size) if mask is not None else None
+    zones = []
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        parts = entry.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid motion zone {entry!r}, expected name:x,y,w,h[:weight]")
+        rect = tuple(float(v) for v in parts[1].split(","))
+        if len(rect) != 4:
+            raise ValueError(f"Invalid motion zone rectangle {parts[1]!r}")
+        weight = float(parts[2]) if len(parts) == 3 else 1.0
+        indices = _rect_indices(rect, size)
+        if allowed is not None:
+            indices &= allowed
+        zones.append(Zone(parts[0], weight, tuple(sorted(indices))))
+
+    if not zones and allowed is not None:
+        zones.append(Zone("mask", 1.0, tuple(sorted(allowed))))
+    return zones
+
+
+def load_zones(size: tuple[int, int]) -> list[Zone]:
+    """Zones from ``MEISENCAM_MOTION_ZONES`` / ``MEISENCAM_MOTION_MASK_IMAGE``."""
+    mask = Path(cfg.MOTION_MASK_IMAGE) if cfg.MOTION_MASK_IMAGE else None
+    return parse_zones(cfg.MOTION_ZONES, size, mask)
+
+
+def combine(zone_scores: dict[str, ZoneScore]) -> MotionResult:
+    """Weighted overall result from per-zone counts; zero-weight zones are ignored."""
+    active = [z for z in zone_scores.values() if z.weight > 0 and z.total]
+    weight_sum = sum(z.weight for z in active)
+    score = sum(z.weight * z.score for z in active) / weight_sum if weight_sum else 0.0
+    return MotionResult(
+        score=score,
+        changed=sum(z.changed for z in active),
+        total=sum(z.total for z in active),
+        zones=zone_scores,
+    )
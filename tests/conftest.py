@@ -0,0 +1,75 @@
+"""Shared test fixtures."""
+
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class WebDavStub:
+    """In-memory stand-in for the Nextcloud public-share WebDAV endpoint."""
+
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+        self.auth: list[str | None] = []
+        self.fail_next = 0
+        self.connections = 0
+        self.base_url = ""
+
+
+def _make_handler(stub: WebDavStub) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            stub.connections += 1
+            super().setup()
+
+        def do_PUT(self) -> None:  # noqa: N802 - http.server naming
+            if "chunked" in self.headers.get("Transfer-Encoding", ""):
+                body = self._read_chunked()
+            else:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            stub.auth.append(self.headers.get("Authorization"))
+            if stub.fail_next > 0:
+                stub.fail_next -= 1
+                self._reply(503)
+                return
+            stub.files[self.path.rsplit("/", 1)[-1]] = body
+            self._reply(201)
+
+        def _read_chunked(self) -> bytes:
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return body
+                body += self.rfile.read(size)
+                self.rfile.readline()
+
+        def _reply(self, status: int) -> None:
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def webdav_server() -> Iterator[WebDavStub]:
+    """Run a local WebDAV stand-in on a free port for the duration of a test."""
+    stub = WebDavStub()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(stub))
+    stub.base_url = f"http://127.0.0.1:{server.server_port}/public.php/webdav"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        yield stub
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,134 @@
+"""Tests for the on-device frame archive."""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from meisencam.archive import FrameArchive, main
+
+T0 = datetime(2026, 2, 21, 12, 0, 0).timestamp()
+
+
+def _fill(archive: FrameArchive, count: int, size: int = 10) -> list[str]:
+    names = []
+    for i in range(count):
+        name = f"2026-02-21-12-00-{i:02d}-m1.jpg"
+        archive.append(bytes([i]) * size, name, f"meta{i}", when=T0 + i)
+        names.append(name)
+    return names
+
+
+class TestFrameArchive:
+    def test_frames_are_buffered_until_flush(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path, flush_bytes=1000)
+        _fill(archive, 3)
+
+        assert not list(tmp_path.glob("*.seg"))
+        archive.flush()
+
+        assert [p.name for p in tmp_path.glob("*.seg")] == ["000001.seg"]
+        assert (tmp_path / "000001.seg").stat().st_size == 30
+
+    def test_frames_survive_reopen(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path)
+        names = _fill(archive, 3)
+        archive.close()
+
+        reopened = FrameArchive(tmp_path)
+        entries = reopened.query()
+
+        assert [e.filename for e in entries] == names
+        assert [e.meta for e in entries] == ["meta0", "meta1", "meta2"]
+        assert reopened.read(entries[1]) == b"\x01" * 10
+        assert entries[0].captured_at == datetime(2026, 2, 21, 12, 0, 0)
+
+    def test_torn_index_entry_is_ignored(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path)
+        _fill(archive, 2)
+        archive.close()
+        index = tmp_path / "000001.idx"
+        index.write_bytes(index.read_bytes()[:-5])
+
+        assert len(FrameArchive(tmp_path)) == 1
+
+    def test_new_segment_when_full(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path, segment_bytes=25, flush_bytes=1)
+        _fill(archive, 5)
+
+        assert sorted(p.name for p in tmp_path.glob("*.seg")) == [
+            "000001.seg",
+            "000002.seg",
+        ]
+        assert [e.segment for e in archive.query()] == [1, 1, 1, 2, 2]
+
+    def test_oldest_segments_dropped_beyond_max_bytes(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path, max_bytes=45, segment_bytes=20, flush_bytes=1)
+        archive.mark_uploaded("2026-02-21-12-00-00-m1.jpg")
+        names = _fill(archive, 6)
+
+        assert not (tmp_path / "000001.seg").exists()
+        assert [e.filename for e in archive.query()] == names[2:]
+        assert archive.dropped_pending == 1
+        assert archive.nbytes <= 45
+
+    def test_query_by_time_range(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path)
+        names = _fill(archive, 5)
+
+        entries = archive.query(
+            datetime(2026, 2, 21, 12, 0, 1), datetime(2026, 2, 21, 12, 0, 3)
+        )
+
+        assert [e.filename for e in entries] == names[1:3]
+
+    def test_pending_skips_uploaded_and_persists(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path)
+        names = _fill(archive, 3)
+        archive.flush()
+        archive.mark_uploaded(names[1])
+
+        assert [e.filename for e in archive.pending()] == [names[0], names[2]]
+        assert [e.filename for e in archive.pending(limit=1)] == [names[0]]
+        assert [e.filename for e in FrameArchive(tmp_path).pending()] == [names[0], names[2]]
+
+    def test_pending_leaves_buffered_frames_unwritten(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path)
+        _fill(archive, 2)
+
+        assert archive.pending() == []
+        assert not list(tmp_path.glob("*.seg"))
+
+
+class TestMain:
+    def test_lists_and_extracts_range(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        archive = FrameArchive(tmp_path / "archive")
+        names = _fill(archive, 3)
+        archive.close()
+
+        main(
+            [
+                "--dir",
+                str(tmp_path / "archive"),
+                "--since",
+                "2026-02-21T12:00:01",
+                "--extract",
+                str(tmp_path / "out"),
+            ]
+        )
+
+        lines = capsys.readouterr().out.splitlines()
+        assert [line.split()[1] for line in lines] == names[1:]
+        assert (tmp_path / "out" / names[2]).read_bytes() == b"\x02" * 10
+
+    def test_pending_only(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        archive = FrameArchive(tmp_path)
+        names = _fill(archive, 2)
+        archive.flush()
+        archive.mark_uploaded(names[0])
+
+        main(["--dir", str(tmp_path), "--pending"])
+
+        assert capsys.readouterr().out.split()[1] == names[1]
@@ -0,0 +1,99 @@
+"""Tests for the adaptive background model."""
+
+import pytest
+
+from meisencam.background import NumpyBackground, PythonBackground, background_class
+from meisencam.scoring import NumpyScorer, PythonScorer, np
+
+BACKENDS = [
+    PythonBackground,
+    pytest.param(
+        NumpyBackground, marks=pytest.mark.skipif(np is None, reason="numpy not installed")
+    ),
+]
+
+
+def _train(model, frames: list[bytes], alpha: float = 0.1) -> None:
+    for frame in frames:
+        model.update(frame, alpha)
+
+
+@pytest.mark.parametrize("model_cls", BACKENDS)
+class TestBackgroundModel:
+    def test_seeded_frame_has_no_changes(self, model_cls: type) -> None:
+        pixels = bytes(range(64))
+        model = model_cls.seed(pixels, 25.0)
+
+        assert model.count(model.changed(pixels, 3.0, 6)) == 0
+
+    def test_seed_variance_sets_initial_gate(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes([100, 100]), 25.0)  # 3 sigma = 15
+
+        mask = model.changed(bytes([115, 116]), 3.0, 6)
+
+        assert [bool(v) for v in mask] == [False, True]
+
+    def test_noisy_pixels_get_a_higher_gate(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes([100, 100]), 25.0)
+        _train(model, [bytes([90 if i % 2 else 110, 100]) for i in range(200)])
+
+        mask = model.changed(bytes([112, 112]), 3.0, 6)
+
+        # pixel 0 flickers by +-10 and tolerates 12, calm pixel 1 does not
+        assert [bool(v) for v in mask] == [False, True]
+
+    def test_gate_never_drops_below_minimum(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes([100]), 25.0)
+        _train(model, [bytes([100])] * 500)
+
+        assert model.count(model.changed(bytes([106]), 3.0, 6)) == 0
+        assert model.count(model.changed(bytes([107]), 3.0, 6)) == 1
+
+    def test_update_tracks_gradual_change(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes([100]), 25.0)
+        _train(model, [bytes([100 + i // 10]) for i in range(300)])
+
+        assert model.count(model.changed(bytes([129]), 3.0, 6)) == 0
+
+    def test_reset_mean_keeps_variance(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes([100]), 100.0)
+
+        model.reset_mean(bytes([200]))
+
+        assert model.mean_pixels() == bytes([200])
+        assert model.count(model.changed(bytes([225]), 3.0, 6)) == 0
+
+    def test_count_at_index(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes(4), 25.0)
+        mask = model.changed(bytes([0, 50, 0, 50]), 3.0, 6)
+
+        assert model.count(mask) == 2
+        scorer = NumpyScorer() if model_cls is NumpyBackground else PythonScorer()
+        assert model.count(mask, scorer.make_index((1, 2))) == 1
+
+    def test_bytes_round_trip(self, model_cls: type) -> None:
+        model = model_cls.seed(bytes([10, 20, 30]), 4.0)
+        model.update(bytes([20, 20, 20]), 0.5)
+
+        restored = model_cls.from_bytes(model.to_bytes())
+
+        assert len(restored) == 3
+        assert list(restored.mean) == pytest.approx(list(model.mean))
+        assert list(restored.var) == pytest.approx(list(model.var))
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_backends_agree() -> None:
+    frames = [bytes((i * 37 + n * 11) % 256 for i in range(48)) for n in range(20)]
+    models = [cls.seed(frames[0], 25.0) for cls in (PythonBackground, NumpyBackground)]
+    for model in models:
+        _train(model, frames[1:])
+
+    python, numpy = models
+    assert list(python.mean) == pytest.approx(list(numpy.mean), rel=1e-4)
+    assert list(python.var) == pytest.approx(list(numpy.var), rel=1e-4)
+
+
+def test_background_class_follows_scoring_backend() -> None:
+    assert background_class("python") is PythonBackground
+    assert background_class("numpy") is NumpyBackground
@@ -0,0 +1,59 @@
+"""Tests for burst frame selection."""
+
+from unittest.mock import patch
+
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from meisencam.burst import select_frames, sharpness
+from meisencam.frame import Frame
+
+
+def _image(blur: float) -> Image.Image:
+    image = Image.new("L", (640, 480), 40)
+    draw = ImageDraw.Draw(image)
+    for x in range(0, 640, 40):
+        draw.rectangle((x, 0, x + 19, 479), fill=220)
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    return image.convert("RGB")
+
+
+def _frame(blur: float) -> Frame:
+    # burst frames are raw camera arrays, like Picamera2 delivers them
+    numpy = pytest.importorskip("numpy")
+    return Frame(numpy.asarray(_image(blur)))
+
+
+class TestSharpness:
+    def test_blurred_frame_scores_lower(self) -> None:
+        assert sharpness(_image(blur=0)) > sharpness(_image(blur=6))
+
+    def test_reduced_before_scoring(self) -> None:
+        large = _image(blur=0).resize((1920, 1440))
+
+        assert sharpness(large) > sharpness(large.filter(ImageFilter.GaussianBlur(12)))
+
+
+class TestSelectFrames:
+    def test_sharpest_picks_unblurred_frame(self) -> None:
+        frames = [_frame(blur=4), _frame(blur=0), _frame(blur=8)]
+
+        assert select_frames(frames, "sharpest") == [1]
+
+    def test_all_keeps_every_frame(self) -> None:
+        frames = [_frame(blur=4), _frame(blur=0)]
+
+        assert select_frames(frames, "all") == [0, 1]
+
+    def test_selection_does_not_encode(self) -> None:
+        frames = [_frame(blur=4), _frame(blur=0)]
+
+        with patch("meisencam.frame.encode_jpeg") as encode:
+            select_frames(frames, "sharpest")
+
+        encode.assert_not_called()
+
+    def test_unknown_mode_raises(self) -> None:
+        with pytest.raises(ValueError):
+            select_frames([_frame(0), _frame(1)], "prettiest")
@@ -0,0 +1,124 @@
+"""Tests for the camera wrapper (Picamera2 is mocked)."""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Mock picamera2 before importing camera (not available off the Pi)
+sys.modules.setdefault("picamera2", MagicMock())
+
+from meisencam.camera import MeisenCamera  # noqa: E402
+from meisencam.gpio import StubLed  # noqa: E402
+from meisencam.schedule import parse_profiles  # noqa: E402
+
+SETTLED = {"ExposureTime": 250000, "AnalogueGain": 10.0}
+UNSETTLED = {"ExposureTime": 33000, "AnalogueGain": 1.0}
+
+
+def _camera(metadata: list[dict], settle_max_wait: float = 5.0) -> MeisenCamera:
+    camera = MeisenCamera(
+        exposure_time=250000,
+        analogue_gain=10.0,
+        settle_max_wait=settle_max_wait,
+        ir_led=StubLed(),
+    )
+    camera._camera = MagicMock()
+    camera._camera.capture_metadata.side_effect = metadata
+    return camera
+
+
+class TestSettling:
+    def test_capture_waits_for_matching_metadata(self, tmp_path: Path) -> None:
+        camera = _camera([UNSETTLED, UNSETTLED, SETTLED, SETTLED])
+
+        camera.capture(tmp_path / "still.jpg")
+
+        assert camera._camera.capture_metadata.call_count == 4
+        assert set(camera.last_timings) == {"led", "start", "settle", "capture", "stop"}
+
+    def test_single_matching_frame_is_not_enough(self) -> None:
+        camera = _camera([SETTLED, UNSETTLED, SETTLED, SETTLED])
+
+        assert camera._wait_settled() == 4
+
+    def test_gives_up_after_max_wait(self) -> None:
+        camera = _camera([UNSETTLED] * 1000, settle_max_wait=0.0)
+
+        assert camera._wait_settled() == 1
+
+    def test_small_deviation_counts_as_settled(self) -> None:
+        nearly = {"ExposureTime": 249800, "AnalogueGain": 10.2}
+        camera = _camera([nearly, nearly])
+
+        assert camera._wait_settled() == 2
+
+
+class TestStreaming:
+    def test_streaming_capture_does_not_restart_sensor(self, tmp_path: Path) -> None:
+        camera = _camera([SETTLED, SETTLED])
+        camera.start_stream()
+        camera._camera.start.reset_mock()
+
+        camera.capture(tmp_path / "a.jpg")
+        camera.capture(tmp_path / "b.jpg")
+
+        camera._camera.start.assert_not_called()
+        camera._camera.stop.assert_not_called()
+        assert set(camera.last_timings) == {"capture"}
+
+    def test_ir_led_switched_once_per_stream(self, tmp_path: Path) -> None:
+        camera = _camera([SETTLED, SETTLED])
+        led = camera._ir_led
+
+        camera.start_stream()
+        camera.capture(tmp_path / "a.jpg")
+        camera.capture(tmp_path / "b.jpg")
+        camera.close()
+
+        assert led.writes == [True, False]
+
+
+class TestCaptureFrame:
+    def test_frame_captured_to_memory(self) -> None:
+        camera = _camera([SETTLED, SETTLED])
+        array = camera._camera.capture_array.return_value
+
+        frame = camera.capture_frame()
+
+        camera._camera.capture_array.assert_called_once_with("main")
+        camera._camera.capture_file.assert_not_called()
+        assert frame.array is array
+        assert set(camera.last_timings) == {"led", "start", "settle", "capture", "stop"}
+
+
+class TestProfiles:
+    def test_profile_sets_controls_and_led(self, tmp_path: Path) -> None:
+        day = parse_profiles("day=07:00,20000,2.0,off")[0]
+        camera = _camera([{"ExposureTime": 20000, "AnalogueGain": 2.0}] * 2)
+        led = camera._ir_led
+
+        camera.apply_profile(day)
+        camera.capture(tmp_path / "a.jpg")
+
+        camera._camera.set_controls.assert_called_with({"ExposureTime": 20000, "AnalogueGain": 2.0})
+        assert led.writes == [False]
+        assert camera._camera.capture_metadata.call_count == 2
+
+    def test_same_profile_is_applied_once(self) -> None:
+        night = parse_profiles("night=20:30,250000,10,on")[0]
+        camera = _camera([])
+
+        camera.apply_profile(night)
+        camera.apply_profile(night)
+
+        assert camera._camera.set_controls.call_count == 1
+
+    def test_switch_while_streaming_resettles(self) -> None:
+        day, night = parse_profiles("day=07:00,20000,2.0,off;night=20:30,250000,10,on")
+        camera = _camera([SETTLED, SETTLED] + [{"ExposureTime": 20000, "AnalogueGain": 2.0}] * 2)
+        camera.start_stream()
+
+        camera.apply_profile(day)
+
+        assert camera._ir_led.writes == [True, False]
+        assert camera._camera.capture_metadata.call_count == 4
@@ -0,0 +1,295 @@
+"""Tests for the multi-node collector service."""
+
+import asyncio
+import json
+import socket
+import time
+from collections.abc import Callable
+from datetime import date, datetime
+from pathlib import Path
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from meisencam.collector import (
+    Collector,
+    CollectorStore,
+    Forwarder,
+    HttpError,
+    Upload,
+    main,
+    parse_multipart,
+)
+from meisencam.frame import Frame
+from meisencam.upload import CollectorUploader, WebDavUploader
+
+T = TypeVar("T")
+
+NAME = "2026-02-21-12-00-00-m1.jpg"
+
+
+def _frame(data: bytes) -> Frame:
+    return Frame.from_jpeg(data, datetime(2026, 2, 21, 12, 0, 0))
+
+
+def _serve(
+    store: CollectorStore, client: Callable[[str], T], forwarder=None, secret: str = ""
+) -> T:
+    """Run ``client(base_url)`` in a thread against a collector on a free port."""
+
+    async def run() -> T:
+        collector = Collector(store, forwarder, secret=secret)
+        server = await collector.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.to_thread(client, f"http://127.0.0.1:{port}")
+        finally:
+            server.close()
+            await collector.close()
+
+    return asyncio.run(run())
+
+
+class TestIngest:
+    def test_webdav_put_is_stored_per_node_and_day(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+
+        def client(url: str) -> requests.Response:
+            uploader = WebDavUploader(f"{url}/public.php/webdav", "tok")
+            uploader.session.headers["X-Meisencam-Node"] = "garden"
+            return uploader.put(_frame(b"jpeg"), NAME)
+
+        response = _serve(store, client)
+
+        assert response.status_code == 201
+        archive = store.archive("garden", "2026-02-21")
+        assert [archive.read(e) for e in archive.query()] == [b"jpeg"]
+        assert (tmp_path / "garden" / "2026-02-21").is_dir()
+
+    def test_put_without_node_header_is_stored_under_client_address(
+        self, tmp_path: Path
+    ) -> None:
+        store = CollectorStore(tmp_path)
+
+        _serve(store, lambda url: requests.put(f"{url}/public.php/webdav/{NAME}", data=b"x"))
+
+        assert store.partitions() == [("127.0.0.1", "2026-02-21")]
+
+    def test_batch_stores_frames_with_records(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+        frames = [
+            (_frame(b"a"), "2026-02-21-12-00-00-m1.jpg", "20260221-120000;42.5;1"),
+            (_frame(b"b"), "2026-02-22-06-30-00-m1.jpg", "20260222-063000;7.0;1"),
+        ]
+
+        response = _serve(store, lambda url: CollectorUploader(url, "roof").post_batch(frames))
+
+        assert response.json() == {"stored": 2}
+        assert store.partitions() == [("roof", "2026-02-21"), ("roof", "2026-02-22")]
+        entry = store.archive("roof", "2026-02-21").query()[0]
+        assert entry.meta == "20260221-120000;42.5;1"
+
+    def test_invalid_node_is_refused(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+
+        response = _serve(
+            store,
+            lambda url: requests.put(
+                f"{url}/public.php/webdav/{NAME}", data=b"x", headers={"X-Meisencam-Node": "../x"}
+            ),
+        )
+
+        assert response.status_code == 400
+        assert not store.partitions()
+
+    @pytest.mark.parametrize(
+        "head",
+        [
+            b"Content-Length: -5\r\n",
+            b"Content-Length: many\r\n",
+            b"Transfer-Encoding: chunked\r\n\r\nzz\r\n",
+            b"Transfer-Encoding: chunked\r\n\r\n-5\r\n",
+        ],
+    )
+    def test_malformed_body_size_is_refused(self, tmp_path: Path, head: bytes) -> None:
+        store = CollectorStore(tmp_path)
+
+        def client(url: str) -> bytes:
+            address = urlsplit(url)
+            with socket.create_connection((address.hostname, address.port)) as conn:
+                conn.sendall(b"PUT /public.php/webdav/" + NAME.encode() + b" HTTP/1.1\r\n")
+                conn.sendall(head + (b"" if b"chunked" in head else b"\r\n"))
+                return conn.recv(1024)
+
+        assert _serve(store, client).startswith(b"HTTP/1.1 400 ")
+        assert not store.partitions()
+
+    def test_unknown_path_is_not_found(self, tmp_path: Path) -> None:
+        response = _serve(CollectorStore(tmp_path), lambda url: requests.get(f"{url}/nope"))
+
+        assert response.status_code == 404
+
+
+class TestAuth:
+    def test_requests_without_secret_are_refused(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+
+        def client(url: str) -> list[int]:
+            target = f"{url}/public.php/webdav/{NAME}"
+            return [
+                requests.put(target, data=b"x").status_code,
+                requests.put(target, data=b"x", auth=("wrong", "")).status_code,
+                requests.get(f"{url}/events").status_code,
+            ]
+
+        assert _serve(store, client, secret="s3cret") == [401, 401, 401]
+        assert store.partitions() == []
+
+    def test_nodes_with_secret_are_accepted(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+        frames = [(_frame(b"a"), NAME, "")]
+
+        def client(url: str) -> list[int]:
+            put = requests.put(f"{url}/public.php/webdav/{NAME}", data=b"x", auth=("s3cret", ""))
+            batch = CollectorUploader(url, "roof", "s3cret").post_batch(frames)
+            return [put.status_code, batch.status_code]
+
+        assert _serve(store, client, secret="s3cret") == [201, 200]
+
+    def test_listening_beyond_loopback_needs_a_secret(self, tmp_path: Path) -> None:
+        with pytest.raises(SystemExit):
+            main(["--host", "0.0.0.0", "--store", str(tmp_path)])
+
+
+class TestRetention:
+    def test_oldest_forwarded_days_are_deleted(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path, max_bytes=2500)
+        for day in ("2026-02-20", "2026-02-21", "2026-02-22"):
+            name = f"{day}-12-00-00-m1.jpg"
+            store.store("roof", [Upload(name, bytes(1000))])
+            store.archive("roof", day).mark_uploaded(name)
+
+        assert store.partitions() == [("roof", "2026-02-21"), ("roof", "2026-02-22")]
+        assert not (tmp_path / "roof" / "2026-02-20").exists()
+        assert store.nbytes <= 2500
+
+    def test_days_waiting_to_be_forwarded_are_kept(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path, max_bytes=1500)
+        store.store("roof", [Upload("2026-02-20-12-00-00-m1.jpg", bytes(1000))])
+        store.store("roof", [Upload(NAME, bytes(1000))])
+        store.archive("roof", "2026-02-21").mark_uploaded(NAME)
+        store.store("roof", [Upload("2026-02-22-12-00-00-m1.jpg", bytes(1000))])
+
+        assert store.partitions() == [("roof", "2026-02-20"), ("roof", "2026-02-22")]
+
+    def test_without_forwarding_every_day_can_go(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path, max_bytes=1500, forward=False)
+        store.store("roof", [Upload("2026-02-20-12-00-00-m1.jpg", bytes(1000))])
+        store.store("roof", [Upload(NAME, bytes(1000))])
+
+        assert store.partitions() == [("roof", "2026-02-21")]
+
+    def test_forwarded_days_are_closed(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+        # "a.jpg" carries no capture time and goes to today's partition
+        store.store("roof", [Upload(NAME, b"x"), Upload("a.jpg", b"y")])
+        store.archive("roof", "2026-02-21").mark_uploaded(NAME)
+
+        assert [entry.filename for _, _, entry in store.pending(10)] == ["a.jpg"]
+        # a past day with nothing left to forward is no longer held in memory
+        assert list(store._archives) == [("roof", date.today().isoformat())]
+        assert [e["filename"] for e in store.events("2026-02-21")] == [NAME]
+        assert list(CollectorStore(tmp_path)._archives) == list(store._archives)
+
+
+class TestEvents:
+    def test_events_of_a_day_over_all_nodes(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+        store.store("roof", [Upload("2026-02-21-12-00-05-m1.jpg", b"x", "20260221-120005;9.5;1")])
+        store.store("garden", [Upload(NAME, b"y", "20260221-120000;42.0;1")])
+        store.store("garden", [Upload("2026-02-22-08-00-00-m1.jpg", b"z")])
+
+        events = _serve(store, lambda url: requests.get(f"{url}/events?day=2026-02-21").json())
+
+        assert [(e["node"], e["score"], e["time"]) for e in events] == [
+            ("garden", 42.0, "2026-02-21T12:00:00"),
+            ("roof", 9.5, "2026-02-21T12:00:05"),
+        ]
+
+    def test_resent_frame_is_listed_once(self, tmp_path: Path) -> None:
+        store = CollectorStore(tmp_path)
+        for _ in range(2):
+            store.store("roof", [Upload(NAME, b"x", "20260221-120000;1.0;1")])
+
+        assert len(store.events("2026-02-21", node="roof")) == 1
+        assert store.events("2026-02-21", node="garden") == []
+
+
+class TestForwarder:
+    def test_frames_forwarded_with_node_tag(self, tmp_path: Path, webdav_server) -> None:
+        store = CollectorStore(tmp_path)
+        store.store("roof", [Upload(NAME, b"x"), Upload("2026-02-21-12-00-01-m1.jpg", b"y")])
+        forwarder = Forwarder(store, WebDavUploader(webdav_server.base_url, "tok"), connections=2)
+
+        forwarded, failed = asyncio.run(forwarder.forward_pending())
+        forwarder.close()
+
+        assert (forwarded, failed) == (2, 0)
+        assert webdav_server.files == {
+            "2026-02-21-12-00-00-m1-roof.jpg": b"x",
+            "2026-02-21-12-00-01-m1-roof.jpg": b"y",
+        }
+        assert store.pending(10) == []
+
+    def test_failed_frames_stay_pending(self, tmp_path: Path, webdav_server) -> None:
+        store = CollectorStore(tmp_path)
+        store.store("roof", [Upload(NAME, b"x")])
+        webdav_server.fail_next = 1
+        forwarder = Forwarder(store, WebDavUploader(webdav_server.base_url, "tok"))
+
+        assert asyncio.run(forwarder.forward_pending()) == (0, 1)
+        assert asyncio.run(forwarder.forward_pending()) == (1, 0)
+        forwarder.close()
+
+    def test_stored_frames_forwarded_while_serving(self, tmp_path: Path, webdav_server) -> None:
+        store = CollectorStore(tmp_path)
+        forwarder = Forwarder(store, WebDavUploader(webdav_server.base_url, "tok"))
+        frames = [(_frame(b"a"), NAME, "20260221-120000;42.5;1")]
+
+        def client(url: str) -> None:
+            CollectorUploader(url, "roof").post_batch(frames)
+            for _ in range(100):
+                if webdav_server.files:
+                    return
+                time.sleep(0.02)
+
+        _serve(store, client, forwarder)
+
+        assert webdav_server.files == {"2026-02-21-12-00-00-m1-roof.jpg": b"a"}
+
+    def test_partitions_of_earlier_runs_reopened(self, tmp_path: Path) -> None:
+        CollectorStore(tmp_path).store("roof", [Upload(NAME, b"x")])
+
+        assert [entry.filename for _, _, entry in CollectorStore(tmp_path).pending(10)] == [NAME]
+
+
+class TestMultipart:
+    def test_parts_without_filename_are_ignored(self) -> None:
+        body = (
+            b"--xyz\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+            b"--xyz\r\nContent-Disposition: form-data; name=\"frame\"; filename=\"a.jpg\"\r\n"
+            b"X-Meisencam-Meta: m\r\n\r\n\r\n--x\r\n"
+            b"--xyz--\r\n"
+        )
+
+        uploads = parse_multipart(body, "multipart/form-data; boundary=xyz")
+
+        # the frame bytes may contain line breaks and partial boundaries
+        assert uploads == [Upload("a.jpg", b"\r\n--x", "m")]
+
+    def test_other_content_type_is_refused(self) -> None:
+        with pytest.raises(HttpError):
+            parse_multipart(json.dumps({}).encode(), "application/json")
+
@@ -0,0 +1,77 @@
+"""Tests for loading the .env file and its parsed snapshot."""
+
+import marshal
+import os
+from pathlib import Path
+
+import pytest
+
+from meisencam import config
+
+
+def _env(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / ".env"
+    path.write_text(text)
+    return path
+
+
+class TestEnvFile:
+    def test_parses_key_value_pairs(self, tmp_path: Path) -> None:
+        path = _env(tmp_path, "# comment\nMEISENCAM_A = 1\n\nMEISENCAM_B=x=y\nEMPTY=\n")
+
+        values = config._read_env_file(path, tmp_path / ".env.snapshot")
+
+        assert values == {"MEISENCAM_A": "1", "MEISENCAM_B": "x=y"}
+
+    def test_unchanged_file_is_read_from_snapshot(self, tmp_path: Path) -> None:
+        path = _env(tmp_path, "MEISENCAM_A=1\n")
+        snapshot = tmp_path / ".env.snapshot"
+        config._read_env_file(path, snapshot)
+
+        # a stale snapshot with the current key proves the file was not parsed again
+        stat = path.stat()
+        with open(snapshot, "wb") as f:
+            marshal.dump(((stat.st_mtime_ns, stat.st_size), {"MEISENCAM_A": "2"}), f)
+
+        assert config._read_env_file(path, snapshot) == {"MEISENCAM_A": "2"}
+
+    def test_changed_file_is_parsed_again(self, tmp_path: Path) -> None:
+        path = _env(tmp_path, "MEISENCAM_A=1\n")
+        snapshot = tmp_path / ".env.snapshot"
+        config._read_env_file(path, snapshot)
+
+        path.write_text("MEISENCAM_A=22\n")
+
+        assert config._read_env_file(path, snapshot) == {"MEISENCAM_A": "22"}
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path: Path) -> None:
+        path = _env(tmp_path, "MEISENCAM_A=1\n")
+        snapshot = tmp_path / ".env.snapshot"
+        snapshot.write_bytes(b"garbage")
+
+        assert config._read_env_file(path, snapshot) == {"MEISENCAM_A": "1"}
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        assert config._read_env_file(tmp_path / ".env", tmp_path / ".env.snapshot") == {}
+
+    def test_environment_wins_over_file(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = _env(tmp_path, "MEISENCAM_TEST_A=file\nMEISENCAM_TEST_B=file\n")
+        monkeypatch.setenv("MEISENCAM_TEST_A", "env")
+        monkeypatch.delenv("MEISENCAM_TEST_B", raising=False)
+
+        config._load_env_file(path, tmp_path / ".env.snapshot")
+
+        assert os.environ["MEISENCAM_TEST_A"] == "env"
+        assert os.environ.pop("MEISENCAM_TEST_B") == "file"
+
+
+class TestValues:
+    def test_invalid_number_names_the_setting(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("MEISENCAM_TEST_N", "ten")
+
+        with pytest.raises(ValueError, match="MEISENCAM_TEST_N must be an integer"):
+            config._int("MEISENCAM_TEST_N", 1)
+        with pytest.raises(ValueError, match="MEISENCAM_TEST_N must be a number"):
+            config._float("MEISENCAM_TEST_N", 1.0)
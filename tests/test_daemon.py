@@ -0,0 +1,62 @@
+"""Tests for the long-running daemon loop."""
+
+import os
+import signal
+
+from meisencam.daemon import Daemon
+
+
+class TestDaemon:
+    def test_runs_until_max_cycles(self) -> None:
+        calls = []
+        daemon = Daemon(lambda: calls.append(1) or {}, interval=0)
+
+        count = daemon.run(max_cycles=3)
+
+        assert count == 3
+        assert len(calls) == 3
+
+    def test_stop_ends_loop_after_current_cycle(self) -> None:
+        calls = []
+
+        def cycle() -> dict[str, float]:
+            calls.append(1)
+            if len(calls) == 2:
+                daemon.stop()
+            return {"capture": 0.0}
+
+        daemon = Daemon(cycle, interval=0)
+
+        assert daemon.run() == 2
+        assert daemon.stopping
+
+    def test_failing_cycle_does_not_stop_daemon(self) -> None:
+        calls = []
+
+        def cycle() -> dict[str, float]:
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("camera hiccup")
+            return {}
+
+        daemon = Daemon(cycle, interval=0)
+
+        assert daemon.run(max_cycles=2) == 2
+
+    def test_next_interval_replaces_interval_after_each_cycle(self) -> None:
+        intervals = iter([0.0, 0.5])
+        daemon = Daemon(lambda: {}, interval=60, next_interval=lambda: next(intervals))
+
+        assert daemon.run(max_cycles=2) == 2
+        assert daemon.interval == 0.0
+
+    def test_sigterm_requests_shutdown(self) -> None:
+        previous = signal.getsignal(signal.SIGTERM)
+        try:
+            daemon = Daemon(lambda: os.kill(os.getpid(), signal.SIGTERM) or {}, interval=60)
+            daemon.install_signal_handlers()
+
+            assert daemon.run() == 1
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
@@ -0,0 +1,92 @@
+"""Tests for the perceptual-hash deduplication index."""
+
+import random
+from pathlib import Path
+
+from meisencam.dedup import DedupIndex, dhash, hamming, should_upload
+
+SIZE = (64, 48)
+
+
+def _scene(seed: int) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.randrange(256) for _ in range(SIZE[0] * SIZE[1]))
+
+
+def _brighter(pixels: bytes, amount: int) -> bytes:
+    return bytes(min(255, p + amount) for p in pixels)
+
+
+class TestDhash:
+    def test_identical_frames_hash_equal(self) -> None:
+        assert dhash(_scene(1), SIZE) == dhash(_scene(1), SIZE)
+
+    def test_brightness_change_keeps_hash_close(self) -> None:
+        pixels = _scene(1)
+
+        assert hamming(dhash(pixels, SIZE), dhash(_brighter(pixels, 10), SIZE)) <= 4
+
+    def test_different_scenes_are_far_apart(self) -> None:
+        assert hamming(dhash(_scene(1), SIZE), dhash(_scene(2), SIZE)) > 16
+
+
+class TestDedupIndex:
+    def test_near_duplicate_is_skipped_until_repeat(self) -> None:
+        index = DedupIndex()
+        value = dhash(_scene(1), SIZE)
+
+        assert index.check(value, max_distance=4, repeat_s=60, now=0)
+        assert not index.check(value ^ 0b101, max_distance=4, repeat_s=60, now=30)
+        assert index.check(value, max_distance=4, repeat_s=60, now=61)
+        assert len(index) == 1
+
+    def test_new_scene_is_uploaded(self) -> None:
+        index = DedupIndex()
+
+        assert index.check(dhash(_scene(1), SIZE), max_distance=4, repeat_s=60, now=0)
+        assert index.check(dhash(_scene(2), SIZE), max_distance=4, repeat_s=60, now=1)
+        assert len(index) == 2
+
+    def test_least_recently_matched_is_evicted(self) -> None:
+        index = DedupIndex(max_items=2, max_age_s=0)
+        index.check(0, max_distance=0, now=0)
+        index.check(0xFF, max_distance=0, now=1)
+        index.check(0, max_distance=0, repeat_s=60, now=2)  # matched, now most recent
+
+        index.check(0xFFFF, max_distance=0, now=3)
+
+        assert index.nearest(0xFF)[0] != 0xFF
+        assert not index.check(0, max_distance=0, repeat_s=60, now=4)
+
+    def test_old_entries_expire(self) -> None:
+        index = DedupIndex(max_age_s=100)
+        index.check(0, now=0)
+
+        assert index.check(0, repeat_s=1000, now=101)
+
+    def test_persisted_across_instances(self, tmp_path: Path) -> None:
+        path = tmp_path / "dedup"
+        index = DedupIndex(path)
+        index.check(1234, now=0)
+        index.save()
+
+        reloaded = DedupIndex(path)
+
+        assert not reloaded.check(1234, max_distance=0, repeat_s=60, now=10)
+
+    def test_unreadable_file_is_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path / "dedup"
+        path.write_bytes(b"junk")
+
+        assert len(DedupIndex(path)) == 0
+
+
+class TestShouldUpload:
+    def test_still_scene_uploaded_once(self, tmp_path: Path) -> None:
+        path = tmp_path / "dedup"
+        pixels = _scene(3)
+
+        assert should_upload(pixels, SIZE, path)
+        assert not should_upload(_brighter(pixels, 5), SIZE, path)
+        assert should_upload(_scene(4), SIZE, path)
+        assert path.exists()
@@ -0,0 +1,192 @@
+"""Tests for the daily digest builder."""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from meisencam import config
+from meisencam.archive import FrameArchive
+from meisencam.collector import forwarded_filename
+from meisencam.digest import (
+    archive_items,
+    bounded_map,
+    build_digest,
+    directory_items,
+    load_scores,
+    main,
+    render_frame,
+    upload_digest,
+)
+from meisencam.upload import WebDavUploader
+
+DAY = date(2026, 2, 21)
+
+
+def _jpeg(shade: int) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (640, 480), (shade, shade, shade)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _frames(directory: Path, count: int, day: str = "2026-02-21") -> None:
+    for i in range(count):
+        (directory / f"{day}-12-00-{i:02d}-m1.jpg").write_bytes(_jpeg(40 + i * 10))
+
+
+class TestSources:
+    def test_scores_read_from_upload_log(self, tmp_path: Path) -> None:
+        log = tmp_path / "meisencam.log"
+        log.write_text("20260221-120000;12.5;1;\n20260221-120001;bad;1;\ngarbage\n")
+
+        assert load_scores(log) == {"20260221-120000": 12.5}
+        assert load_scores(tmp_path / "missing.log") == {}
+
+    def test_scores_of_one_day(self, tmp_path: Path) -> None:
+        log = tmp_path / "meisencam.log"
+        log.write_text("20260220-235959;3.0;1;\n20260221-120000;12.5;1;\n20260222-000000;1.0;1;\n")
+
+        assert load_scores(log, DAY) == {"20260221-120000": 12.5}
+
+    def test_directory_frames_of_day_in_order(self, tmp_path: Path) -> None:
+        _frames(tmp_path, 3)
+        _frames(tmp_path, 2, day="2026-02-22")
+        (tmp_path / "2026-02-21-notes.jpg").write_bytes(b"")
+
+        items = list(directory_items(tmp_path, DAY, {"20260221-120001": 7.0}))
+
+        assert [label for label, _ in items] == ["12:00:00", "12:00:01  7.0", "12:00:02"]
+        assert items[0][1] == tmp_path / "2026-02-21-12-00-00-m1.jpg"
+
+    def test_frames_forwarded_by_the_collector_are_found(self, tmp_path: Path) -> None:
+        for node, second in [("roof", 1), ("garden", 0)]:
+            name = forwarded_filename(node, f"2026-02-21-12-00-{second:02d}-m1.jpg")
+            (tmp_path / name).write_bytes(_jpeg(50))
+
+        items = list(directory_items(tmp_path, DAY, {"20260221-120001": 7.0}))
+
+        assert [label for label, _ in items] == ["12:00:00", "12:00:01  7.0"]
+        assert items[0][1] == tmp_path / "2026-02-21-12-00-00-m1-garden.jpg"
+
+    def test_archive_frames_with_scores_from_meta(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path / "archive")
+        when = datetime(2026, 2, 21, 8, 30).timestamp()
+        archive.append(_jpeg(50), "a.jpg", "20260221-083000;33.3;1", when=when)
+        archive.append(_jpeg(60), "b.jpg", "", when=when + 86400)
+        archive.close()
+
+        items = list(archive_items(tmp_path / "archive", DAY, {}))
+
+        assert items == [("08:30:00  33.3", _jpeg(50))]
+
+
+class TestBoundedMap:
+    def test_results_in_order_with_limited_lookahead(self) -> None:
+        pulled = []
+
+        def source():
+            for i in range(10):
+                pulled.append(i)
+                yield i
+
+        with ThreadPoolExecutor(2) as pool:
+            results = []
+            for result in bounded_map(pool, lambda x: x * 2, source(), window=3):
+                # never more than `window` items ahead of what was consumed
+                assert len(pulled) - len(results) <= 3
+                results.append(result)
+
+        assert results == [i * 2 for i in range(10)]
+
+
+class TestBuildDigest:
+    def test_sheets_paged_and_timelapse_has_every_frame(self, tmp_path: Path) -> None:
+        _frames(tmp_path, 5)
+        items = directory_items(tmp_path, DAY, {})
+
+        files = build_digest(
+            items, tmp_path / "out", "2026-02-21", columns=2, rows=2, tile_width=80, jobs=2
+        )
+
+        assert [p.name for p in files] == [
+            "2026-02-21-digest-1.jpg",
+            "2026-02-21-digest-2.jpg",
+            "2026-02-21-timelapse.mjpeg",
+        ]
+        with Image.open(files[0]) as full, Image.open(files[1]) as last:
+            assert full.size == (160, 120)
+            # the last page only has the rows it uses
+            assert last.size == (160, 60)
+        timelapse = files[2].read_bytes()
+        assert timelapse.count(b"\xff\xd8\xff") == 5
+        with Image.open(io.BytesIO(timelapse)) as first:
+            assert first.width == 480
+
+    def test_timelapse_can_be_disabled(self, tmp_path: Path) -> None:
+        _frames(tmp_path, 1)
+
+        files = build_digest(
+            directory_items(tmp_path, DAY, {}), tmp_path / "out", "d", timelapse_width=0, jobs=1
+        )
+
+        assert [p.name for p in files] == ["d-digest-1.jpg"]
+        assert not (tmp_path / "out" / "d-timelapse.mjpeg").exists()
+
+    def test_frames_left_out_past_max_bytes(self, tmp_path: Path) -> None:
+        _frames(tmp_path, 5)
+        items = list(directory_items(tmp_path, DAY, {}))
+        frame_bytes = len(render_frame(items[0], (80, 60), 480)[1])
+
+        files = build_digest(
+            items, tmp_path / "out", "d", tile_width=80, jobs=1, max_bytes=frame_bytes * 5 // 2
+        )
+
+        timelapse = files[-1].read_bytes()
+        assert timelapse.count(b"\xff\xd8\xff") == 2
+        assert len(timelapse) <= frame_bytes * 5 // 2
+        assert [p.name for p in files] == ["d-digest-1.jpg", "d-timelapse.mjpeg"]
+
+    def test_no_frames_writes_nothing(self, tmp_path: Path) -> None:
+        assert build_digest(iter(()), tmp_path / "out", "d", jobs=1) == []
+        assert list((tmp_path / "out").iterdir()) == []
+
+
+class TestUpload:
+    def test_uploaded_files_are_removed(self, tmp_path: Path, webdav_server) -> None:
+        sheet = tmp_path / "d-digest-1.jpg"
+        sheet.write_bytes(b"sheet")
+
+        uploader = WebDavUploader(webdav_server.base_url, "token")
+
+        assert upload_digest([sheet], uploader)
+        assert webdav_server.files == {"d-digest-1.jpg": b"sheet"}
+        assert not sheet.exists()
+
+    def test_rejected_file_is_kept(self, tmp_path: Path, webdav_server) -> None:
+        sheet = tmp_path / "d-digest-1.jpg"
+        sheet.write_bytes(b"sheet")
+        webdav_server.fail_next = 1
+
+        assert not upload_digest([sheet], WebDavUploader(webdav_server.base_url, "token"))
+        assert sheet.exists()
+
+
+class TestMain:
+    def test_directory_digest(self, tmp_path: Path) -> None:
+        _frames(tmp_path, 2)
+
+        main([str(tmp_path), "--day", "2026-02-21", "-o", str(tmp_path / "out"), "-j", "1"])
+
+        assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+            "2026-02-21-digest-1.jpg",
+            "2026-02-21-timelapse.mjpeg",
+        ]
+
+    def test_archive_digest_needs_archive_dir(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(config, "ARCHIVE_DIR", "")
+
+        with pytest.raises(SystemExit):
+            main(["-o", str(tmp_path)])
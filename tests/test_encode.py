@@ -0,0 +1,64 @@
+"""Tests for the upload JPEG encoder."""
+
+import io
+import random
+
+from PIL import Image
+
+from meisencam.encode import BUDGET_MIN_WIDTH, EncodeSettings, encode_jpeg
+
+
+def _noisy(width: int = 640, height: int = 480) -> Image.Image:
+    rng = random.Random(1)
+    return Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+
+
+def _decoded(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data))
+
+
+class TestEncodeJpeg:
+    def test_defaults_keep_resolution(self) -> None:
+        data = encode_jpeg(_noisy(), EncodeSettings(0, 90, False, 0, 50))
+
+        assert _decoded(data).size == (640, 480)
+
+    def test_max_width_keeps_aspect_ratio(self) -> None:
+        data = encode_jpeg(_noisy(), EncodeSettings(max_width=320, max_bytes=0))
+
+        assert _decoded(data).size == (320, 240)
+
+    def test_smaller_images_are_not_upscaled(self) -> None:
+        data = encode_jpeg(_noisy(), EncodeSettings(max_width=1920, max_bytes=0))
+
+        assert _decoded(data).size == (640, 480)
+
+    def test_progressive(self) -> None:
+        data = encode_jpeg(_noisy(), EncodeSettings(progressive=True, max_bytes=0))
+
+        assert _decoded(data).info.get("progressive")
+
+    def test_budget_lowers_quality_first(self) -> None:
+        image = _noisy()
+        full = encode_jpeg(image, EncodeSettings(0, 90, False, 0, 50))
+        at_min = encode_jpeg(image, EncodeSettings(0, 50, False, 0, 50))
+        budget = (len(full) + len(at_min)) // 2
+
+        data = encode_jpeg(image, EncodeSettings(0, 90, False, budget, 50))
+
+        assert len(at_min) < len(data) <= budget
+        assert _decoded(data).size == (640, 480)
+
+    def test_budget_scales_down_when_quality_is_not_enough(self) -> None:
+        image = _noisy()
+        at_min = encode_jpeg(image, EncodeSettings(0, 50, False, 0, 50))
+
+        data = encode_jpeg(image, EncodeSettings(0, 90, False, len(at_min) // 2, 50))
+
+        assert len(data) <= len(at_min) // 2
+        assert BUDGET_MIN_WIDTH <= _decoded(data).width < 640
+
+    def test_unreachable_budget_returns_smallest_attempt(self) -> None:
+        data = encode_jpeg(_noisy(), EncodeSettings(0, 90, False, 100, 50))
+
+        assert _decoded(data).width == BUDGET_MIN_WIDTH
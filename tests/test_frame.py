@@ -0,0 +1,60 @@
+"""Tests for in-memory frames."""
+
+import io
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from meisencam.encode import EncodeSettings
+from meisencam.frame import Frame
+
+np = pytest.importorskip("numpy")
+
+
+def _frame(value: int = 120) -> Frame:
+    array = np.full((48, 64, 3), value, dtype=np.uint8)
+    return Frame(array, datetime(2026, 2, 21, 12, 0, 5))
+
+
+class TestFrame:
+    def test_timestamp_matches_upload_log_format(self) -> None:
+        assert _frame().timestamp == "20260221-120005"
+
+    def test_jpeg_encoded_once(self) -> None:
+        frame = _frame()
+
+        first = frame.jpeg
+
+        assert frame.jpeg is first
+        decoded = Image.open(io.BytesIO(first))
+        assert decoded.format == "JPEG"
+        assert decoded.size == (64, 48)
+
+    def test_image_uses_raw_array(self) -> None:
+        image = _frame(200).image()
+
+        assert image.mode == "RGB"
+        assert image.getpixel((0, 0)) == (200, 200, 200)
+
+    def test_image_is_shared_between_motion_and_encoder(self) -> None:
+        frame = _frame()
+
+        assert frame.image() is frame.image()
+
+    def test_jpeg_uses_upload_encoding(self) -> None:
+        frame = _frame()
+        frame.encoding = EncodeSettings(max_width=32, max_bytes=0)
+
+        assert Image.open(io.BytesIO(frame.jpeg)).size == (32, 24)
+
+    def test_save_writes_jpeg(self, tmp_path: Path) -> None:
+        frame = _frame()
+
+        frame.save(tmp_path / "still.jpg")
+
+        assert (tmp_path / "still.jpg").read_bytes() == frame.jpeg
+
+    def test_repr_omits_pixel_data(self) -> None:
+        assert "array" not in repr(_frame())
@@ -0,0 +1,41 @@
+"""Tests for IR LED control."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from meisencam.gpio import PinctrlLed, StubLed, open_ir_led
+
+
+class TestIrLed:
+    def test_repeated_state_is_not_rewritten(self) -> None:
+        led = StubLed()
+
+        led.set(True)
+        led.set(True)
+        led.set(False)
+
+        assert led.writes == [True, False]
+
+    @patch("meisencam.gpio.subprocess.run")
+    def test_pinctrl_fallback_command(self, mock_run: MagicMock) -> None:
+        PinctrlLed(21).set(True)
+
+        assert mock_run.call_args.args[0] == ["pinctrl", "set", "21", "op", "dh"]
+
+
+class TestOpenIrLed:
+    def test_stub_backend(self) -> None:
+        assert isinstance(open_ir_led(21, "stub"), StubLed)
+
+    def test_auto_falls_back_to_pinctrl_without_gpiod(self) -> None:
+        with patch.dict("sys.modules", {"gpiod": None}):
+            assert isinstance(open_ir_led(21, "auto"), PinctrlLed)
+
+    def test_explicit_gpiod_without_library_raises(self) -> None:
+        with patch.dict("sys.modules", {"gpiod": None}), pytest.raises(ImportError):
+            open_ir_led(21, "gpiod")
+
+    def test_unknown_backend_raises(self) -> None:
+        with pytest.raises(ValueError):
+            open_ir_led(21, "smoke-signals")
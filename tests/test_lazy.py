@@ -0,0 +1,25 @@
+"""Tests for deferred imports."""
+
+import sys
+
+import pytest
+
+from meisencam.lazy import lazy_import
+
+
+class TestLazyImport:
+    def test_module_runs_on_first_attribute_access(self) -> None:
+        sys.modules.pop("colorsys", None)
+
+        module = lazy_import("colorsys")
+
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+
+    def test_already_imported_module_is_returned(self) -> None:
+        assert lazy_import("sys") is sys
+
+    def test_missing_module_fails_on_use(self) -> None:
+        module = lazy_import("meisencam_no_such_module")
+
+        with pytest.raises(ModuleNotFoundError):
+            module.anything
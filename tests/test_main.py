@@ -1,13 +1,82 @@
 """Tests for the __main__ entry point CLI."""
 
+import subprocess
 import sys
+from datetime import datetime
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
+
+import pytest
 
 # Mock picamera2 before importing __main__ (not available on macOS)
 sys.modules.setdefault("picamera2", MagicMock())
 
 from meisencam.__main__ import main  # noqa: E402
+from meisencam.frame import Frame  # noqa: E402
+from meisencam.schedule import AdaptiveScheduler  # noqa: E402
+from meisencam.sensor import SyntheticSensor  # noqa: E402
+from meisencam.upload import WebDavUploader  # noqa: E402
+
+
+def _frame() -> Frame:
+    """An in-memory still whose JPEG is already encoded."""
+    return Frame.from_jpeg(b"still", datetime(2026, 2, 21, 12, 0, 0))
+
+
+class TestReplayCommand:
+    @patch("meisencam.__main__.replay_main")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_replay_subcommand_needs_no_camera(
+        self, mock_camera_cls: MagicMock, mock_replay: MagicMock
+    ) -> None:
+        main(["replay", "sample_images", "--format", "json"])
+
+        mock_replay.assert_called_once_with(["sample_images", "--format", "json"])
+        mock_camera_cls.assert_not_called()
+
+    @patch("meisencam.__main__.archive_main")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_archive_subcommand_needs_no_camera(
+        self, mock_camera_cls: MagicMock, mock_archive: MagicMock
+    ) -> None:
+        main(["archive", "--pending"])
+
+        mock_archive.assert_called_once_with(["--pending"])
+        mock_camera_cls.assert_not_called()
+
+    @patch("meisencam.__main__.digest_main")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_digest_subcommand_needs_no_camera(
+        self, mock_camera_cls: MagicMock, mock_digest: MagicMock
+    ) -> None:
+        main(["digest", "--day", "2026-02-21"])
+
+        mock_digest.assert_called_once_with(["--day", "2026-02-21"])
+        mock_camera_cls.assert_not_called()
+
+    @patch("meisencam.__main__.collector_main")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_collector_subcommand_needs_no_camera(
+        self, mock_camera_cls: MagicMock, mock_collector: MagicMock
+    ) -> None:
+        main(["collector", "--port", "9000"])
+
+        mock_collector.assert_called_once_with(["--port", "9000"])
+        mock_camera_cls.assert_not_called()
+
+
+class TestStartup:
+    def test_heavy_modules_not_imported_at_start(self) -> None:
+        code = (
+            "import sys, meisencam.__main__; "
+            "print(' '.join(m for m in ('urllib3', 'http.server', 'meisencam.replay', "
+            "'meisencam.digest', 'meisencam.collector', 'asyncio') if m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+
+        assert out.split() == []
 
 
 class TestTestMode:
@@ -42,9 +111,9 @@ class TestTestMode:
     ) -> None:
         mock_camera_cls.return_value.capture.return_value = "20260221-120000"
 
-        with patch("meisencam.__main__.upload_image") as mock_upload:
+        with patch("meisencam.__main__.create_upload_worker") as mock_uploads:
             main(["--test", "--output", str(tmp_path / "test.jpg")])
-            mock_upload.assert_not_called()
+            mock_uploads.assert_not_called()
 
     @patch("meisencam.__main__.MeisenCamera")
     def test_test_flag_uses_default_output_path(
@@ -77,22 +146,388 @@ class TestTestMode:
 class TestFullCycle:
     """Tests that the default (no --test) path still runs the full cycle."""
 
-    @patch("meisencam.__main__.upload_image")
-    @patch("meisencam.__main__.detect_motion", return_value=5.0)
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.detect_motion", return_value=50.0)
     @patch("meisencam.__main__.MeisenCamera")
     def test_no_args_runs_full_cycle(
         self,
         mock_camera_cls: MagicMock,
         mock_detect: MagicMock,
-        mock_upload: MagicMock,
+        mock_uploads: MagicMock,
     ) -> None:
         mock_cam = MagicMock()
-        mock_cam.capture.return_value = "20260221-120000"
+        frame = mock_cam.capture_frame.return_value = _frame()
         mock_camera_cls.return_value = mock_cam
-        mock_upload.return_value = None
 
         main([])
 
-        mock_cam.capture.assert_called_once()
-        mock_detect.assert_called_once()
-        mock_upload.assert_called_once()
+        mock_cam.capture_frame.assert_called_once()
+        assert mock_detect.call_args.args[0] is frame
+        mock_uploads.return_value.enqueue_bytes.assert_called_once_with(
+            b"still", "2026-02-21-12-00-00-m1.jpg", "20260221-120000;50.0;1"
+        )
+        mock_uploads.return_value.drain.assert_called_once()
+
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.detect_motion", return_value=0.0)
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_no_motion_is_not_queued(
+        self,
+        mock_camera_cls: MagicMock,
+        mock_detect: MagicMock,
+        mock_uploads: MagicMock,
+    ) -> None:
+        mock_camera_cls.return_value.capture_frame.return_value = _frame()
+
+        main([])
+
+        mock_uploads.return_value.enqueue_bytes.assert_not_called()
+        # leftovers from earlier runs are still retried
+        mock_uploads.return_value.drain.assert_called_once()
+
+    def test_simulated_camera_uploads_scripted_motion(
+        self, tmp_path: Path, webdav_server
+    ) -> None:
+        pytest.importorskip("numpy")
+        sensor = SyntheticSensor(fps=0, motion_period=2, motion_frames=1)
+
+        with patch("meisencam.camera.open_sensor", return_value=sensor), patch.multiple(
+            "meisencam.__main__",
+            REFERENCE_FILE=tmp_path / "ref",
+            LOG_FILE=tmp_path / "log",
+            SPOOL_DIR=tmp_path / "spool",
+            WebDavUploader=lambda: WebDavUploader(webdav_server.base_url, "token"),
+        ):
+            for _ in range(4):
+                main([])
+
+        # the first frame becomes the reference; the bird then comes, goes and comes back
+        assert len(webdav_server.auth) == 3
+        assert len((tmp_path / "log").read_text().splitlines()) == 3
+
+    def test_collector_url_sends_batches(self, tmp_path: Path) -> None:
+        from meisencam.__main__ import create_upload_worker
+
+        uploader = MagicMock()
+        uploader.post_batch.return_value.ok = True
+        with patch("meisencam.config.COLLECTOR_URL", "http://hub:8080"), patch.multiple(
+            "meisencam.__main__",
+            LOG_FILE=tmp_path / "log",
+            SPOOL_DIR=tmp_path / "spool",
+            CollectorUploader=lambda: uploader,
+        ):
+            worker = create_upload_worker()
+            for second in range(2):
+                worker.enqueue_bytes(b"jpeg", f"2026-02-21-12-00-0{second}-m1.jpg", f"m{second}")
+            worker.drain()
+
+        (frames,) = uploader.post_batch.call_args.args
+        assert [(name, meta) for _, name, meta in frames] == [
+            ("2026-02-21-12-00-00-m1.jpg", "m0"),
+            ("2026-02-21-12-00-01-m1.jpg", "m1"),
+        ]
+        assert (tmp_path / "log").read_text() == "m0;\nm1;\n"
+
+
+class TestDaemonMode:
+    """Tests for --daemon: one camera shared across cycles."""
+
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.Daemon")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_daemon_flag_runs_daemon_with_interval(
+        self,
+        mock_camera_cls: MagicMock,
+        mock_daemon_cls: MagicMock,
+        mock_uploads: MagicMock,
+    ) -> None:
+        main(["--daemon", "--interval", "5"])
+
+        mock_camera_cls.assert_called_once()
+        assert mock_daemon_cls.call_args.args[1] == 5.0
+        mock_daemon_cls.return_value.run.assert_called_once()
+        mock_camera_cls.return_value.close.assert_called_once()
+        mock_uploads.return_value.start.assert_called_once()
+        mock_uploads.return_value.stop.assert_called_once()
+
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.detect_motion", return_value=0.0)
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_daemon_reuses_camera_across_cycles(
+        self,
+        mock_camera_cls: MagicMock,
+        mock_detect: MagicMock,
+        mock_uploads: MagicMock,
+    ) -> None:
+        mock_camera_cls.return_value.capture_frame.return_value = _frame()
+
+        with patch("meisencam.__main__.Daemon.install_signal_handlers"), patch(
+            "meisencam.__main__.Daemon.run",
+            lambda self: [self.cycle() for _ in range(3)],
+        ):
+            main(["--daemon", "--interval", "0"])
+
+        mock_camera_cls.assert_called_once()
+        assert mock_camera_cls.return_value.capture_frame.call_count == 3
+
+    @patch("meisencam.__main__.config.SCHEDULE_STREAM_MAX_INTERVAL_S", 30.0)
+    @patch("meisencam.__main__.config.SCHEDULE_ADAPTIVE", True)
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_adaptive_schedule_follows_motion(
+        self, mock_camera_cls: MagicMock, mock_uploads: MagicMock
+    ) -> None:
+        camera = mock_camera_cls.return_value
+        camera.capture_frame.return_value = _frame()
+        scores = [0.0] * 8 + [50.0]
+        intervals = []
+
+        def run(self) -> None:
+            for _ in scores:
+                self.cycle()
+                intervals.append(self.next_interval())
+
+        with patch("meisencam.__main__.Daemon.install_signal_handlers"), patch(
+            "meisencam.__main__.Daemon.run", run
+        ), patch("meisencam.__main__.detect_motion", side_effect=scores), patch(
+            "meisencam.__main__.AdaptiveScheduler",
+            lambda: AdaptiveScheduler(5, 600, backoff=2, hold_cycles=0, threshold=5),
+        ):
+            main(["--daemon"])
+
+        assert intervals == [10, 20, 40, 80, 160, 320, 600, 600, 5]
+        # the sensor is stopped once captures are sparse and restarted on motion
+        assert camera.stop_stream.call_count == 6
+        assert camera.method_calls[-2] == call.start_stream()
+
+    @patch("meisencam.__main__.config.DEDUP_ENABLED", True)
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.detect_motion", return_value=50.0)
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_still_scene_uploaded_once(
+        self,
+        mock_camera_cls: MagicMock,
+        mock_detect: MagicMock,
+        mock_uploads: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_camera_cls.return_value.capture_frame.return_value = _frame()
+        grid = bytes(range(256)) * 12
+
+        with patch("meisencam.__main__.Daemon.install_signal_handlers"), patch(
+            "meisencam.__main__.Daemon.run",
+            lambda self: [self.cycle() for _ in range(3)],
+        ), patch("meisencam.__main__.DEDUP_FILE", tmp_path / "dedup"), patch(
+            "meisencam.__main__.last_pixels", return_value=grid
+        ):
+            main(["--daemon", "--interval", "0"])
+
+        mock_uploads.return_value.enqueue_bytes.assert_called_once()
+
+
+class TestPipelineMode:
+    """Tests for --pipeline: capture keeps going while frames are scored on threads."""
+
+    @patch("meisencam.__main__.config.PIPELINE_QUEUE_SIZE", 10)
+    @patch("meisencam.__main__.create_upload_worker")
+    @patch("meisencam.__main__.MeisenCamera")
+    def test_captured_frames_are_drained_on_shutdown(
+        self, mock_camera_cls: MagicMock, mock_uploads: MagicMock
+    ) -> None:
+        frames = [
+            Frame.from_jpeg(f"still{i}".encode(), datetime(2026, 2, 21, 12, 0, i))
+            for i in range(3)
+        ]
+        mock_camera_cls.return_value.capture_frame.side_effect = frames
+        uploads = mock_uploads.return_value
+
+        with patch("meisencam.__main__.Daemon.install_signal_handlers"), patch(
+            "meisencam.__main__.Daemon.run", lambda self: [self.cycle() for _ in range(3)]
+        ), patch("meisencam.__main__.detect_motion", side_effect=[50.0, 0.0, 50.0]):
+            main(["--pipeline", "--interval", "0"])
+
+        queued = sorted(c.args[:2] for c in uploads.enqueue_bytes.call_args_list)
+        assert queued == [
+            (b"still0", "2026-02-21-12-00-00-m1.jpg"),
+            (b"still2", "2026-02-21-12-00-02-m1.jpg"),
+        ]
+        uploads.stop.assert_called_once()
+
+
+class TestStreamCycle:
+    """Tests for lores streaming: full still only on motion."""
+
+    def test_no_motion_skips_still_capture(self) -> None:
+        from meisencam.__main__ import run_stream_cycle
+
+        camera = MagicMock()
+        detector = MagicMock()
+        detector.score_plane.return_value = 0.0
+        uploads = MagicMock()
+
+        timings = run_stream_cycle(camera, detector, uploads)
+
+        camera.capture_lores.assert_called_once()
+        camera.capture_frame.assert_not_called()
+        uploads.enqueue_bytes.assert_not_called()
+        assert set(timings) == {"lores", "motion"}
+
+    def test_motion_triggers_still_and_upload(self) -> None:
+        from meisencam.__main__ import run_stream_cycle
+
+        camera = MagicMock()
+        camera.capture_frame.return_value = _frame()
+        detector = MagicMock()
+        detector.score_plane.return_value = 50.0
+        uploads = MagicMock()
+
+        run_stream_cycle(camera, detector, uploads)
+
+        camera.capture_frame.assert_called_once_with()
+        data, filename, meta = uploads.enqueue_bytes.call_args.args
+        assert data == b"still"
+        assert filename == "2026-02-21-12-00-00-m1.jpg"
+        assert meta == "20260221-120000;50.0;1"
+
+    def test_stills_within_one_second_all_spooled(self, tmp_path: Path) -> None:
+        from meisencam.__main__ import run_stream_cycle
+        from meisencam.spool import UploadSpool, UploadWorker
+
+        camera = MagicMock()
+        camera.capture_frame.side_effect = [_frame(), _frame()]
+        detector = MagicMock()
+        detector.score_plane.return_value = 50.0
+        uploads = UploadWorker(UploadSpool(tmp_path, max_items=5), lambda item: True)
+
+        for _ in range(2):
+            run_stream_cycle(camera, detector, uploads)
+
+        assert len(uploads.spool.pending()) == 2
+
+
+class TestBurst:
+    """Tests for burst capture on motion."""
+
+    def _run(self, select: str) -> MagicMock:
+        from meisencam.__main__ import run_stream_cycle
+
+        camera = MagicMock()
+        camera.capture_frame.return_value = _frame()
+        camera.capture_burst.return_value = [
+            Frame.from_jpeg(b"burst-1", datetime(2026, 2, 21, 12, 0, 1)),
+            Frame.from_jpeg(b"burst-2", datetime(2026, 2, 21, 12, 0, 1)),
+        ]
+        detector = MagicMock()
+        detector.score_plane.return_value = 50.0
+        uploads = MagicMock()
+        chosen = [2] if select == "sharpest" else [0, 1, 2]
+
+        with patch("meisencam.__main__.config.BURST_FRAMES", 2), patch(
+            "meisencam.__main__.config.BURST_SELECT", select
+        ), patch("meisencam.__main__.select_frames", return_value=chosen):
+            run_stream_cycle(camera, detector, uploads)
+
+        camera.capture_burst.assert_called_once_with(2)
+        return uploads
+
+    def test_sharpest_frame_uploaded(self) -> None:
+        uploads = self._run("sharpest")
+
+        data, filename, _ = uploads.enqueue_bytes.call_args.args
+        assert data == b"burst-2"
+        assert filename == "2026-02-21-12-00-01-m1.jpg"
+        uploads.enqueue.assert_not_called()
+
+    def test_all_frames_uploaded_with_burst_index(self) -> None:
+        uploads = self._run("all")
+
+        names = [c.args[1] for c in uploads.enqueue_bytes.call_args_list]
+        assert [c.args[0] for c in uploads.enqueue_bytes.call_args_list] == [
+            b"still",
+            b"burst-1",
+            b"burst-2",
+        ]
+        assert names[1:] == ["2026-02-21-12-00-01-m1-b1.jpg", "2026-02-21-12-00-01-m1-b2.jpg"]
+
+    def test_sensor_kept_running_from_trigger_through_burst(self) -> None:
+        from meisencam.__main__ import run_cycle
+        from meisencam.camera import MeisenCamera
+        from meisencam.gpio import StubLed
+
+        numpy = pytest.importorskip("numpy")
+        camera = MeisenCamera(ir_led=StubLed())
+        camera._camera = MagicMock()
+        camera._camera.capture_metadata.return_value = {
+            "ExposureTime": camera.exposure_time,
+            "AnalogueGain": camera.analogue_gain,
+        }
+        camera._camera.capture_array.side_effect = lambda stream: numpy.zeros(
+            (8, 8, 3), numpy.uint8
+        )
+        uploads = MagicMock()
+
+        with patch("meisencam.__main__.config.BURST_FRAMES", 2), patch(
+            "meisencam.__main__.detect_motion", return_value=50.0
+        ), patch("meisencam.__main__.select_frames", return_value=[0]):
+            run_cycle(camera, uploads)
+
+        # one start and settle for the trigger still and the burst together
+        assert camera._camera.capture_array.call_count == 3
+        assert camera._camera.start.call_count == 1
+        assert camera._camera.stop.call_count == 1
+        assert not camera.streaming
+        uploads.enqueue_bytes.assert_called_once()
+
+
+class TestPrebuffer:
+    """Tests for uploading frames from just before a trigger."""
+
+    def test_idle_frames_buffered_and_flushed_on_trigger(self) -> None:
+        from meisencam.__main__ import run_stream_cycle
+        from meisencam.ring import FrameRing
+
+        camera = MagicMock()
+        camera.capture_frame.return_value = _frame()
+        camera.capture_lores.side_effect = [b"idle-1", b"idle-2", b"idle-3", b"event"]
+        camera.encode_lores.side_effect = lambda plane: b"jpeg-" + plane
+        detector = MagicMock()
+        detector.score_plane.side_effect = [0.0, 0.0, 0.0, 50.0]
+        uploads = MagicMock()
+        prebuffer: FrameRing = FrameRing(max_items=2)
+
+        for _ in range(4):
+            run_stream_cycle(camera, detector, uploads, prebuffer)
+
+        queued = [(c.args[0], c.args[1]) for c in uploads.enqueue_bytes.call_args_list]
+        assert [data for data, _ in queued] == [b"jpeg-idle-3", b"jpeg-idle-2", b"still"]
+        assert queued[0][1].endswith("-m1-p1.jpg")
+        assert queued[1][1].endswith("-m1-p2.jpg")
+        assert len(prebuffer) == 0
+
+    def test_event_logged_once_with_pre_and_burst_frames(self, tmp_path: Path) -> None:
+        from meisencam.__main__ import _send, run_stream_cycle
+        from meisencam.ring import FrameRing
+        from meisencam.spool import UploadSpool, UploadWorker
+
+        camera = MagicMock()
+        camera.capture_frame.return_value = _frame()
+        camera.capture_burst.return_value = [
+            Frame.from_jpeg(b"burst-1", datetime(2026, 2, 21, 12, 0, 1)),
+        ]
+        camera.capture_lores.side_effect = [b"idle-1", b"idle-2", b"event"]
+        camera.encode_lores.side_effect = lambda plane: b"jpeg-" + plane
+        detector = MagicMock()
+        detector.score_plane.side_effect = [0.0, 0.0, 50.0]
+        uploader = MagicMock()
+        uploader.put.return_value = MagicMock(ok=True, text="")
+        uploads = UploadWorker(UploadSpool(tmp_path / "spool", 10), lambda i: _send(uploader, i))
+        prebuffer: FrameRing = FrameRing(max_items=2)
+
+        with patch("meisencam.__main__.config.BURST_FRAMES", 1), patch(
+            "meisencam.__main__.config.BURST_SELECT", "all"
+        ), patch("meisencam.__main__.LOG_FILE", tmp_path / "log"):
+            for _ in range(3):
+                run_stream_cycle(camera, detector, uploads, prebuffer)
+            assert uploads.drain() == 4
+
+        assert (tmp_path / "log").read_text() == "20260221-120000;50.0;1;\n"
@@ -0,0 +1,120 @@
+"""Tests for the metrics instrumentation."""
+
+import json
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+from meisencam import metrics
+from meisencam.metrics import Registry
+from meisencam.motion import MotionDetector
+
+
+class TestRegistry:
+    def test_disabled_records_nothing(self) -> None:
+        registry = Registry()
+
+        with registry.timer("capture"):
+            pass
+        registry.inc("uploads")
+
+        assert registry.timer("capture") is registry.timer("score")
+        assert registry.stages == {} and registry.counters == {}
+
+    def test_timer_and_counters(self) -> None:
+        registry = Registry()
+        registry.enable()
+
+        for _ in range(3):
+            with registry.timer("capture"):
+                pass
+        registry.inc("upload_bytes", 1000)
+        registry.inc("upload_bytes", 500)
+
+        assert registry.stages["capture"].count == 3
+        assert registry.stages["capture"].max >= 0.0
+        assert registry.counters == {"upload_bytes": 1500}
+
+    def test_window_resets_but_totals_keep_running(self) -> None:
+        registry = Registry()
+        registry.enable()
+        registry.observe("capture", 0.5)
+
+        first = registry.window()
+        registry.observe("capture", 0.25)
+        second = registry.window()
+
+        assert first["stages"]["capture"] == {"count": 1, "sum": 0.5, "max": 0.5}
+        assert second["stages"]["capture"] == {"count": 1, "sum": 0.25, "max": 0.25}
+        assert registry.stages["capture"].count == 2
+
+    def test_flush_appends_json_lines_and_rotates(self, tmp_path: Path) -> None:
+        path = tmp_path / "metrics.jsonl"
+        registry = Registry()
+        registry.enable(path, max_bytes=300, backups=1)
+
+        for i in range(10):
+            registry.observe("camera_settle", 0.1 * i)
+            registry.inc("frames_scored")
+            registry.flush()
+
+        lines = path.read_text().splitlines()
+        record = json.loads(lines[-1])
+        assert record["counters"] == {"frames_scored": 1}
+        assert record["stages"]["camera_settle"]["count"] == 1
+        assert (tmp_path / "metrics.jsonl.1").exists()
+        assert path.stat().st_size <= 300
+
+    def test_maybe_flush_waits_for_interval(self, tmp_path: Path) -> None:
+        path = tmp_path / "metrics.jsonl"
+        registry = Registry()
+        registry.enable(path)
+        registry.flush()
+
+        registry.maybe_flush(3600)
+
+        assert len(path.read_text().splitlines()) == 1
+
+    def test_prometheus_text_format(self) -> None:
+        registry = Registry()
+        registry.enable()
+        registry.observe("upload_put", 0.25)
+        registry.inc("uploads", 2)
+
+        text = registry.prometheus()
+
+        assert 'meisencam_stage_seconds_count{stage="upload_put"} 1' in text
+        assert 'meisencam_stage_seconds_sum{stage="upload_put"} 0.250000' in text
+        assert "# TYPE meisencam_uploads_total counter\nmeisencam_uploads_total 2\n" in text
+
+
+class TestInstrumentation:
+    def test_detector_counts_frames_and_triggers(self) -> None:
+        registry = Registry()
+        registry.enable()
+        detector = MotionDetector()
+
+        with patch("meisencam.metrics.registry", registry):
+            detector.score_plane(bytes([50]) * (320 * 240), (320, 240))
+            detector.score_plane(bytes([50]) * (320 * 240), (320, 240))
+            detector.score_plane(bytes([200]) * (320 * 240), (320, 240))
+
+        assert registry.counters == {"frames_scored": 2, "motion_triggers": 1}
+        assert registry.stages["motion_prepare"].count == 3
+        assert registry.stages["motion_score"].count == 2
+
+    def test_http_endpoint_serves_totals(self) -> None:
+        registry = Registry()
+        registry.enable()
+        registry.inc("uploads")
+
+        with patch("meisencam.metrics.registry", registry):
+            server = metrics.serve(0, "127.0.0.1")
+            try:
+                port = server.server_address[1]
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                    body = response.read().decode()
+            finally:
+                server.shutdown()
+
+        assert "meisencam_uploads_total 1" in body
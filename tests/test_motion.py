@@ -1,12 +1,24 @@
 """Tests for the motion detection module."""
 
 import shutil
+import time
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
 from PIL import Image
 
-from meisencam.motion import detect_motion
+from meisencam.frame import Frame
+from meisencam.motion import (
+    MotionDetector,
+    detect_motion,
+    load_reference,
+    open_for_motion,
+    prepare_pixels,
+    save_reference,
+)
+from meisencam.state import DetectorState, load_state, save_state
+from meisencam.zones import parse_zones
 
 
 def _create_image(path: Path, colour: int = 128) -> None:
@@ -33,7 +45,7 @@ class TestDetectMotion:
         score = detect_motion(current, old)
 
         assert score == 0.0
-        assert old.exists(), "Should copy current as old when no previous exists"
+        assert old.exists(), "Should store current as reference when none exists"
 
     def test_identical_images_return_zero(self, tmp_path: Path) -> None:
         current = tmp_path / "current.jpg"
@@ -85,6 +97,7 @@ class TestDetectMotion:
             mock_cfg.MOTION_BLUR_RADIUS = 2
             mock_cfg.MOTION_THRESHOLD = 5.0
             mock_cfg.MOTION_REF_MAX_AGE_S = 600
+            mock_cfg.MOTION_BACKGROUND = "reference"
             score = detect_motion(current, old)
 
         assert score == 0.0
@@ -135,6 +148,7 @@ class TestDetectMotion:
             mock_cfg.MOTION_BLUR_RADIUS = 2
             mock_cfg.MOTION_THRESHOLD = 5.0
             mock_cfg.MOTION_REF_MAX_AGE_S = 0  # Force max-age refresh
+            mock_cfg.MOTION_BACKGROUND = "reference"
             score = detect_motion(current, old)
 
         # Score is still 0 (no motion), but reference got updated
@@ -150,3 +164,215 @@ class TestDetectMotion:
         score = detect_motion(current, old)
 
         assert 0.0 <= score <= 100.0
+
+    def test_in_memory_frame_scored_without_file(self, tmp_path: Path) -> None:
+        np = pytest.importorskip("numpy")
+        old = tmp_path / "old.ref"
+        still = np.full((48, 64, 3), 50, dtype=np.uint8)
+        detect_motion(Frame(still), old)
+
+        score = detect_motion(Frame(np.full((48, 64, 3), 200, dtype=np.uint8)), old)
+
+        assert score > 95.0
+
+
+class TestReferenceSidecar:
+    """Tests for the prepared reference cache."""
+
+    def test_reference_stored_as_compact_sidecar(self, tmp_path: Path) -> None:
+        current = tmp_path / "current.jpg"
+        ref = tmp_path / "meisencam.ref"
+        Image.new("L", (1920, 1080), 100).save(current)
+
+        detect_motion(current, ref)
+
+        # header plus the 64x48 comparison grid, not a full-resolution JPEG
+        assert ref.stat().st_size < 64 * 48 + 64
+        assert load_reference(ref) is not None
+
+    def test_settings_change_invalidates_sidecar(self, tmp_path: Path) -> None:
+        ref = tmp_path / "meisencam.ref"
+        save_reference(ref, bytes(64 * 48))
+
+        with patch("meisencam.motion.cfg") as mock_cfg:
+            mock_cfg.MOTION_COMPARE_SIZE_W = 64
+            mock_cfg.MOTION_COMPARE_SIZE_H = 48
+            mock_cfg.MOTION_PIXEL_THRESHOLD = 15
+            mock_cfg.MOTION_BLUR_RADIUS = 0  # differs from default
+            assert load_reference(ref) is None
+
+    def test_legacy_reference_image_is_converted(self, tmp_path: Path) -> None:
+        ref = tmp_path / "meisencamalt.jpg"
+        _create_image(ref, colour=100)
+
+        pixels = load_reference(ref)
+
+        assert pixels is not None
+        assert len(pixels) == 64 * 48
+
+    def test_reference_read_once_per_process(self, tmp_path: Path) -> None:
+        current = tmp_path / "current.png"
+        ref = tmp_path / "meisencam.ref"
+        Image.new("L", (64, 48), 100).save(current)
+        detect_motion(current, ref)
+
+        with patch("meisencam.motion.load_reference") as mock_load:
+            detect_motion(current, ref)
+            detect_motion(current, ref)
+
+        mock_load.assert_not_called()
+
+
+class TestPersistentState:
+    """The reference policy must behave the same in fresh (cron) processes."""
+
+    def test_fresh_process_keeps_recent_reference(self, tmp_path: Path) -> None:
+        current = tmp_path / "current.png"
+        ref = tmp_path / "meisencam.ref"
+        Image.new("L", (64, 48), 100).save(current)
+        MotionDetector(reference_path=ref, state_path=ref.with_suffix(".state")).score_image(
+            Image.open(current)
+        )
+        ref_bytes = ref.read_bytes()
+
+        # a new detector stands in for the next cron process
+        detector = MotionDetector(reference_path=ref, state_path=ref.with_suffix(".state"))
+        detector.score_image(Image.open(current))
+
+        assert ref.read_bytes() == ref_bytes
+        assert load_state(ref.with_suffix(".state")).samples == 1
+
+    def test_fresh_process_refreshes_expired_reference(self, tmp_path: Path) -> None:
+        ref = tmp_path / "meisencam.ref"
+        state_path = ref.with_suffix(".state")
+        save_reference(ref, prepare_pixels(Image.new("L", (64, 48), 100)))
+        save_state(state_path, DetectorState(ref_update_time=time.time() - 3600))
+
+        detector = MotionDetector(reference_path=ref, state_path=state_path)
+        detector.score_image(Image.new("L", (64, 48), 100))
+
+        assert load_state(state_path).ref_update_time > time.time() - 60
+
+
+class TestMotionDetector:
+    """Tests for the in-memory streaming detector."""
+
+    def test_first_frame_initialises_reference(self) -> None:
+        detector = MotionDetector()
+
+        score = detector.score_plane(bytes([100]) * (320 * 240), (320, 240))
+
+        assert score == 0.0
+        assert detector.reference is not None
+
+    def test_identical_planes_score_zero(self) -> None:
+        detector = MotionDetector()
+        plane = bytes([100]) * (320 * 240)
+        detector.score_plane(plane, (320, 240))
+
+        assert detector.score_plane(plane, (320, 240)) == 0.0
+
+    def test_changed_plane_scores_motion_and_updates_reference(self) -> None:
+        detector = MotionDetector()
+        detector.score_plane(bytes([50]) * (320 * 240), (320, 240))
+        reference_before = detector.reference
+
+        score = detector.score_plane(bytes([200]) * (320 * 240), (320, 240))
+
+        assert score > 95.0
+        assert detector.reference != reference_before
+
+    def test_reference_kept_without_motion(self) -> None:
+        detector = MotionDetector()
+        detector.score_plane(bytes([100]) * (320 * 240), (320, 240))
+        reference_before = detector.reference
+
+        detector.score_plane(bytes([105]) * (320 * 240), (320, 240))
+
+        assert detector.reference == reference_before
+
+    def test_motion_outside_zones_is_ignored(self) -> None:
+        zones = parse_zones("top:0,0,1,0.25", (64, 48))
+        detector = MotionDetector(zones=zones)
+        detector.score_plane(bytes([100]) * (320 * 240), (320, 240))
+        bottom_changed = bytes([100]) * (320 * 120) + bytes([200]) * (320 * 120)
+
+        result = detector.evaluate_plane(bottom_changed, (320, 240))
+
+        assert result.score == 0.0
+        assert result.total == 64 * 12
+        assert set(result.zones) == {"top"}
+
+    def test_zone_weights_combine_scores(self) -> None:
+        zones = parse_zones("top:0,0,1,0.5:3;bottom:0,0.5,1,0.5:1", (64, 48))
+        detector = MotionDetector(zones=zones)
+        detector.score_plane(bytes([100]) * (320 * 240), (320, 240))
+        top_changed = bytes([200]) * (320 * 120) + bytes([100]) * (320 * 120)
+
+        result = detector.evaluate_plane(top_changed, (320, 240))
+
+        # The blur spreads the edge a little into the bottom zone
+        assert result.zones["top"].score > 95.0
+        assert result.zones["bottom"].score < 10.0
+        assert 70.0 < result.score < 80.0
+        assert detector.last_result is result
+
+
+class TestAdaptiveBackground:
+    """Tests for the detector with the adaptive per-pixel background model."""
+
+    def test_flickering_region_stops_triggering(self) -> None:
+        detector = MotionDetector(background="adaptive")
+        size = (64, 48)
+        calm = bytes([100]) * (64 * 24)
+        frames = [bytes([94 if i % 2 else 106]) * (64 * 24) + calm for i in range(150)]
+        detector.score_plane(bytes([100]) * (64 * 48), size)
+        for frame in frames:
+            detector.score_plane(frame, size)
+
+        # the global gate of 15 would count this in half the frame; only the
+        # blurred border row next to the calm half remains
+        score = detector.score_plane(bytes([116]) * (64 * 24) + calm, size)
+
+        assert score < 5.0
+
+    def test_motion_replaces_mean(self) -> None:
+        detector = MotionDetector(background="adaptive")
+        detector.score_plane(bytes([50]) * (64 * 48), (64, 48))
+
+        assert detector.score_plane(bytes([200]) * (64 * 48), (64, 48)) > 95.0
+        assert detector.score_plane(bytes([200]) * (64 * 48), (64, 48)) == 0.0
+
+    def test_model_persisted_next_to_reference(self, tmp_path: Path) -> None:
+        reference = tmp_path / "meisencam.ref"
+        detector = MotionDetector(reference_path=reference, background="adaptive")
+        detector.score_plane(bytes([100]) * (64 * 48), (64, 48))
+        detector.score_plane(bytes([104]) * (64 * 48), (64, 48))
+
+        restored = MotionDetector(reference_path=reference, background="adaptive")
+
+        assert (tmp_path / "meisencam.bg").exists()
+        assert not reference.exists()
+        assert restored.background is not None
+        assert restored.background.mean_pixels() == detector.background.mean_pixels()
+
+    def test_unknown_model_raises(self) -> None:
+        with pytest.raises(ValueError):
+            MotionDetector(background="median")
+
+
+class TestOpenForMotion:
+    def test_jpeg_decoded_reduced_and_grayscale(self, tmp_path: Path) -> None:
+        path = tmp_path / "still.jpg"
+        Image.new("RGB", (1920, 1080), (120, 130, 140)).save(path)
+
+        image = open_for_motion(path)
+
+        assert image.mode == "L"
+        assert image.size == (240, 135)  # 1/8 DCT scale
+
+    def test_png_opened_unchanged(self, tmp_path: Path) -> None:
+        path = tmp_path / "still.png"
+        Image.new("L", (64, 48), 100).save(path)
+
+        assert open_for_motion(path).size == (64, 48)
@@ -0,0 +1,99 @@
+"""Tests for the staged capture pipeline."""
+
+import threading
+import time
+
+import pytest
+
+from meisencam.pipeline import DropOldestQueue, Pipeline, QueueClosed, Stage
+
+
+class TestDropOldestQueue:
+    def test_full_queue_drops_oldest(self) -> None:
+        queue: DropOldestQueue[int] = DropOldestQueue(2)
+
+        assert queue.put(1) is None
+        assert queue.put(2) is None
+        assert queue.put(3) == 1
+
+        assert [queue.get(), queue.get()] == [2, 3]
+        assert queue.dropped == 1
+
+    def test_closed_queue_drains_then_raises(self) -> None:
+        queue: DropOldestQueue[int] = DropOldestQueue(2)
+        queue.put(1)
+        queue.close()
+
+        assert queue.get() == 1
+        with pytest.raises(QueueClosed):
+            queue.get()
+        with pytest.raises(QueueClosed):
+            queue.put(2)
+
+    def test_get_waits_for_item(self) -> None:
+        queue: DropOldestQueue[int] = DropOldestQueue(1)
+        threading.Timer(0.01, queue.put, (7,)).start()
+
+        assert queue.get() == 7
+
+
+class TestPipeline:
+    def test_items_flow_through_stages_and_drain_on_close(self) -> None:
+        results = []
+        pipeline = Pipeline(
+            [
+                Stage("double", lambda x: x * 2, maxsize=100),
+                Stage("odd", lambda x: x if x % 4 else None, maxsize=100),
+                Stage("collect", results.append, workers=3, maxsize=100),
+            ]
+        )
+        pipeline.start()
+        for i in range(20):
+            pipeline.submit(i)
+
+        pipeline.close(timeout=5)
+
+        assert sorted(results) == [x * 2 for x in range(20) if (x * 2) % 4]
+
+    def test_slow_stage_drops_oldest_instead_of_blocking(self) -> None:
+        release = threading.Event()
+        seen = []
+
+        def slow(x: int) -> None:
+            release.wait(5)
+            seen.append(x)
+
+        pipeline = Pipeline([Stage("slow", slow, maxsize=2)])
+        pipeline.start()
+        pipeline.submit(0)
+        while len(pipeline.stages[0].inbox):  # wait until the worker holds frame 0
+            time.sleep(0.001)
+        for i in range(1, 6):
+            pipeline.submit(i)
+        release.set()
+        pipeline.close(timeout=5)
+
+        assert seen == [0, 4, 5]
+        assert pipeline.dropped == 3
+
+    def test_failing_item_does_not_stop_stage(self) -> None:
+        results = []
+
+        def check(x: int) -> int:
+            if x == 1:
+                raise RuntimeError("bad frame")
+            return x
+
+        pipeline = Pipeline(
+            [Stage("check", check, maxsize=10), Stage("collect", results.append, maxsize=10)]
+        )
+        pipeline.start()
+        for i in range(3):
+            pipeline.submit(i)
+        pipeline.close(timeout=5)
+
+        assert results == [0, 2]
+
+    def test_needs_a_stage(self) -> None:
+        with pytest.raises(ValueError):
+            Pipeline([])
@@ -0,0 +1,88 @@
+"""Tests for offline replay."""
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from meisencam import config
+from meisencam.replay import find_images, main, parse_grid, replay, sweep
+
+
+def _sequence(directory: Path) -> list[Path]:
+    """Two frames: the empty background, then a bird covering the top half."""
+    paths = []
+    for name, bird in [("2025-06-01-10-00-00-m1", False), ("2025-06-01-10-00-10-m1", True)]:
+        image = Image.new("L", (320, 240), 100)
+        if bird:
+            image.paste(220, (0, 0, 320, 120))
+        path = directory / f"{name}.png"
+        image.save(path)
+        paths.append(path)
+    (directory / "notes.txt").write_text("not an image")
+    return paths
+
+
+class TestReplay:
+    def test_images_found_in_name_order(self, tmp_path: Path) -> None:
+        paths = _sequence(tmp_path)
+
+        assert find_images(tmp_path) == sorted(paths)
+
+    def test_scores_and_decisions_per_frame(self, tmp_path: Path) -> None:
+        frames, summary = replay(_sequence(tmp_path))
+
+        assert [f.motion for f in frames] == [False, True]
+        assert frames[1].score > 40.0
+        assert set(frames[1].timings) == {"decode", "resize", "blur", "score"}
+        assert (summary.frames, summary.motion_frames) == (2, 1)
+        assert summary.fps > 0
+        assert summary.peak_rss_kb > 0
+
+
+class TestSweep:
+    def test_grid_converted_to_setting_types(self) -> None:
+        grid = parse_grid(["pixel_threshold=10,20", "MOTION_THRESHOLD=2.5"])
+
+        assert grid == {"MOTION_PIXEL_THRESHOLD": [10, 20], "MOTION_THRESHOLD": [2.5]}
+
+    @pytest.mark.parametrize("spec", ["PIXEL_THRESHOLD", "NOT_A_SETTING=1", "THRESHOLD="])
+    def test_invalid_grid_raises(self, spec: str) -> None:
+        with pytest.raises(ValueError):
+            parse_grid([spec])
+
+    def test_one_summary_per_combination(self, tmp_path: Path) -> None:
+        paths = _sequence(tmp_path)
+
+        summaries = sweep(paths, {"MOTION_THRESHOLD": [5.0, 60.0]}, jobs=2)
+
+        assert [s.params for s in summaries] == [
+            {"MOTION_THRESHOLD": 5.0},
+            {"MOTION_THRESHOLD": 60.0},
+        ]
+        assert [s.motion_frames for s in summaries] == [1, 0]
+        assert config.MOTION_THRESHOLD == 5.0  # only changed in the workers
+
+
+class TestMain:
+    def test_csv_output(self, tmp_path: Path) -> None:
+        _sequence(tmp_path)
+        out = tmp_path / "scores.csv"
+
+        main([str(tmp_path), "-o", str(out)])
+
+        rows = list(csv.DictReader(out.open()))
+        assert [row["motion"] for row in rows] == ["0", "1"]
+        assert "decode_ms" in rows[0]
+
+    def test_json_sweep_output(self, tmp_path: Path) -> None:
+        _sequence(tmp_path)
+        out = tmp_path / "sweep.json"
+
+        main([str(tmp_path), "-f", "json", "-o", str(out), "--sweep", "BLUR_RADIUS=1,2", "-j", "1"])
+
+        rows = json.loads(out.read_text())
+        assert [row["MOTION_BLUR_RADIUS"] for row in rows] == [1, 2]
+        assert all(row["frames"] == 2 for row in rows)
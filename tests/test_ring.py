@@ -0,0 +1,37 @@
+"""Tests for the bounded in-memory frame ring."""
+
+from meisencam.ring import FrameRing
+
+
+class TestFrameRing:
+    def test_keeps_newest_items_within_count(self) -> None:
+        ring: FrameRing[int] = FrameRing(max_items=3)
+        for i in range(5):
+            ring.append(i, size=1)
+
+        assert list(ring) == [2, 3, 4]
+        assert ring.evicted == 2
+
+    def test_byte_cap_evicts_oldest(self) -> None:
+        ring: FrameRing[str] = FrameRing(max_items=10, max_bytes=250)
+        for name in "abcd":
+            ring.append(name, size=100)
+
+        assert list(ring) == ["c", "d"]
+        assert ring.nbytes == 200
+
+    def test_oversized_item_is_kept_alone(self) -> None:
+        ring: FrameRing[str] = FrameRing(max_items=10, max_bytes=100)
+        ring.append("small", size=50)
+        ring.append("huge", size=500)
+
+        assert list(ring) == ["huge"]
+
+    def test_drain_empties_ring(self) -> None:
+        ring: FrameRing[int] = FrameRing(max_items=3)
+        ring.append(1, size=10)
+        ring.append(2, size=10)
+
+        assert ring.drain() == [1, 2]
+        assert len(ring) == 0
+        assert ring.nbytes == 0
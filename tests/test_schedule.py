@@ -0,0 +1,69 @@
+"""Tests for the adaptive capture scheduler and time-of-day profiles."""
+
+from datetime import datetime
+from datetime import time as dtime
+
+import pytest
+
+from meisencam.schedule import AdaptiveScheduler, parse_profiles, profile_at
+
+SPEC = "day=07:00,20000,2.0,off; night=20:30,250000,10,on"
+
+
+class TestProfiles:
+    def test_parse_sorts_by_start(self) -> None:
+        night, day = parse_profiles("night=20:30,250000,10,on;day=07:00,20000,2.0,off")[::-1]
+
+        assert (day.name, day.start, day.exposure_time, day.ir_led) == (
+            "day",
+            dtime(7, 0),
+            20000,
+            False,
+        )
+        assert (night.name, night.analogue_gain, night.ir_led) == ("night", 10.0, True)
+
+    def test_empty_spec_has_no_profiles(self) -> None:
+        assert parse_profiles("") == []
+
+    @pytest.mark.parametrize(
+        "spec", ["day", "day=07:00,20000,2.0", "day=07:00,20000,2.0,maybe", "day=7h,1,1,on"]
+    )
+    def test_malformed_spec_raises(self, spec: str) -> None:
+        with pytest.raises(ValueError):
+            parse_profiles(spec)
+
+    @pytest.mark.parametrize(
+        ("hour", "minute", "expected"),
+        [(12, 0, "day"), (7, 0, "day"), (21, 0, "night"), (3, 0, "night"), (6, 59, "night")],
+    )
+    def test_profile_at_wraps_around_midnight(self, hour: int, minute: int, expected: str) -> None:
+        profiles = parse_profiles(SPEC)
+
+        assert profile_at(profiles, datetime(2026, 2, 21, hour, minute)).name == expected
+
+    def test_no_profiles(self) -> None:
+        assert profile_at([], datetime(2026, 2, 21, 12, 0)) is None
+
+
+class TestAdaptiveScheduler:
+    def test_idle_backs_off_exponentially_up_to_max(self) -> None:
+        scheduler = AdaptiveScheduler(1, 10, backoff=2, hold_cycles=0, threshold=5)
+
+        intervals = [scheduler.observe(0.0) for _ in range(5)]
+
+        assert intervals == [2, 4, 8, 10, 10]
+
+    def test_motion_ramps_up_and_holds(self) -> None:
+        scheduler = AdaptiveScheduler(1, 100, backoff=2, hold_cycles=2, threshold=5)
+        for _ in range(6):
+            scheduler.observe(0.0)
+        assert scheduler.interval == 64
+
+        intervals = [scheduler.observe(score) for score in (20.0, 0.0, 0.0, 0.0, 0.0)]
+
+        assert intervals == [1, 1, 1, 2, 4]
+
+    def test_score_at_threshold_is_idle(self) -> None:
+        scheduler = AdaptiveScheduler(1, 100, backoff=2, hold_cycles=0, threshold=5)
+
+        assert scheduler.observe(5.0) == 2
@@ -0,0 +1,89 @@
+"""Tests for the pixel-difference scoring backends."""
+
+import random
+
+import pytest
+
+from meisencam.scoring import NumpyScorer, PythonScorer, get_scorer, np
+
+BACKENDS = [
+    PythonScorer,
+    pytest.param(
+        NumpyScorer, marks=pytest.mark.skipif(np is None, reason="numpy not installed")
+    ),
+]
+
+
+def _random_pixels(n: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.randrange(256) for _ in range(n))
+
+
+@pytest.mark.parametrize("scorer_cls", BACKENDS)
+class TestScorers:
+    def test_identical_buffers_have_no_changes(self, scorer_cls: type) -> None:
+        pixels = _random_pixels(64 * 48, seed=1)
+
+        assert scorer_cls().count_changed(pixels, pixels, 15) == 0
+
+    def test_threshold_is_exclusive(self, scorer_cls: type) -> None:
+        new = bytes([115, 116, 84, 85])
+        old = bytes([100, 100, 100, 100])
+
+        # |diff| of 15 is not a change, 16 is; works in both directions
+        assert scorer_cls().count_changed(new, old, 15) == 2
+
+    def test_matches_reference_implementation(self, scorer_cls: type) -> None:
+        new = _random_pixels(64 * 48, seed=2)
+        old = _random_pixels(64 * 48, seed=3)
+
+        expected = PythonScorer().count_changed(new, old, 40)
+
+        assert scorer_cls().count_changed(new, old, 40) == expected
+
+    def test_count_changed_at_only_counts_indexed_pixels(self, scorer_cls: type) -> None:
+        new = _random_pixels(64 * 48, seed=6)
+        old = _random_pixels(64 * 48, seed=7)
+        indices = tuple(range(0, 64 * 48, 7))
+        scorer = scorer_cls()
+
+        count = scorer.count_changed_at(new, old, 40, scorer.make_index(indices))
+
+        assert count == sum(1 for i in indices if abs(new[i] - old[i]) > 40)
+
+    def test_heatmap_localises_change(self, scorer_cls: type) -> None:
+        width, height = 8, 6
+        old = bytes(width * height)
+        new = bytearray(old)
+        for y in range(3):
+            for x in range(4):
+                new[y * width + x] = 255  # top-left quadrant only
+
+        heatmap = scorer_cls().heatmap(bytes(new), old, (width, height), 15, (2, 2))
+
+        assert heatmap == [[100.0, 0.0], [0.0, 0.0]]
+
+    def test_heatmap_handles_uneven_regions(self, scorer_cls: type) -> None:
+        new = _random_pixels(64 * 48, seed=4)
+        old = _random_pixels(64 * 48, seed=5)
+
+        heatmap = scorer_cls().heatmap(new, old, (64, 48), 40, (5, 7))
+        expected = PythonScorer().heatmap(new, old, (64, 48), 40, (5, 7))
+
+        assert len(heatmap) == 7 and all(len(row) == 5 for row in heatmap)
+        for row, expected_row in zip(heatmap, expected):
+            assert row == pytest.approx(expected_row)
+
+
+class TestGetScorer:
+    def test_python_backend_by_name(self) -> None:
+        assert get_scorer("python").name == "python"
+
+    def test_auto_prefers_numpy_when_available(self) -> None:
+        expected = "python" if np is None else "numpy"
+
+        assert get_scorer("auto").name == expected
+
+    def test_unknown_backend_raises(self) -> None:
+        with pytest.raises(ValueError):
+            get_scorer("opencl")
@@ -0,0 +1,93 @@
+"""Tests for the simulated camera sensors."""
+
+import io
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from meisencam.camera import MeisenCamera
+from meisencam.gpio import StubLed
+from meisencam.motion import MotionDetector
+from meisencam.sensor import ReplaySensor, SyntheticSensor, open_sensor
+
+# simulated sensors hand out NumPy arrays, like Picamera2
+pytest.importorskip("numpy")
+
+
+def _camera(sensor) -> MeisenCamera:
+    return MeisenCamera(width=320, height=240, lores_width=64, lores_height=48, sensor=sensor)
+
+
+class TestSyntheticSensor:
+    def test_frames_have_configured_sizes(self) -> None:
+        camera = _camera(SyntheticSensor(fps=0))
+
+        frame = camera.capture_frame()
+        camera.start_stream()
+        plane = camera.capture_lores()
+
+        assert frame.array.shape == (240, 320, 3)
+        assert len(plane) == 64 * 48
+        assert isinstance(camera._ir_led, StubLed)
+
+    def test_scripted_motion_is_detected(self) -> None:
+        sensor = SyntheticSensor(fps=0, motion_period=6, motion_frames=2)
+        camera = _camera(sensor)
+        camera.start_stream()
+        detector = MotionDetector()
+
+        planes = [camera.capture_lores() for _ in range(12)]
+        scores = [detector.score_plane(plane, camera.lores_size) for plane in planes]
+
+        moving = [i for i, score in enumerate(scores) if score > 5]
+        # the bird appears, moves, and the frame after it left differs from the last reference
+        assert moving == [4, 5, 6, 10, 11]
+        assert [sensor.has_motion(i) for i in range(7)] == [False] * 4 + [True, True, False]
+
+    def test_frame_rate_is_limited(self) -> None:
+        sensor = SyntheticSensor(fps=50)
+        camera = _camera(sensor)
+        camera.start_stream()
+
+        started = time.monotonic()
+        for _ in range(5):
+            camera.capture_lores()
+
+        assert time.monotonic() - started >= 4 / 50
+
+    def test_burst_returns_raw_frames(self) -> None:
+        camera = _camera(SyntheticSensor(fps=0))
+
+        frames = camera.capture_burst(3)
+
+        assert [frame.array.shape for frame in frames] == [(240, 320, 3)] * 3
+        assert Image.open(io.BytesIO(frames[0].jpeg)).size == (320, 240)
+
+    def test_settles_on_requested_controls(self) -> None:
+        camera = _camera(SyntheticSensor(fps=0))
+
+        camera.start_stream()
+
+        assert camera._wait_settled() == 2
+
+
+class TestReplaySensor:
+    def test_images_served_in_a_loop(self, tmp_path: Path) -> None:
+        for i, shade in enumerate((10, 200)):
+            Image.new("RGB", (640, 480), (shade,) * 3).save(tmp_path / f"{i}.jpg")
+        camera = _camera(ReplaySensor(tmp_path, fps=0))
+
+        shades = [camera.capture_frame().array[0, 0, 0] for _ in range(3)]
+
+        assert shades[0] < 30 and shades[1] > 180 and shades[2] < 30
+
+    def test_empty_directory_is_rejected(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            ReplaySensor(tmp_path)
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        open_sensor("webcam")
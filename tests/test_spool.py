@@ -0,0 +1,259 @@
+"""Tests for the on-disk upload spool and its worker."""
+
+import threading
+import time
+from pathlib import Path
+
+from meisencam.archive import FrameArchive
+from meisencam.spool import SpoolItem, UploadSpool, UploadWorker
+from meisencam.upload import put_file
+
+
+def _frame(tmp_path: Path, data: bytes = b"fake-jpeg") -> Path:
+    path = tmp_path / "frame.jpg"
+    path.write_bytes(data)
+    return path
+
+
+def _sender(base_url: str):
+    def send(item: SpoolItem) -> bool:
+        return put_file(item.path, item.filename, webdav_base=base_url, share_token="tok").ok
+
+    return send
+
+
+class TestUploadSpool:
+    def test_add_stores_frame_under_remote_name(self, tmp_path: Path) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+
+        item = spool.add(_frame(tmp_path), "2026-02-21-12-00-00-m1.jpg", "meta")
+
+        assert item.path.read_bytes() == b"fake-jpeg"
+        assert item.meta == "meta"
+        assert len(spool) == 1
+
+    def test_add_bytes_stores_in_memory_frame(self, tmp_path: Path) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+
+        item = spool.add_bytes(b"burst-jpeg", "2026-02-21-12-00-00-m1-b1.jpg")
+
+        assert item.path.read_bytes() == b"burst-jpeg"
+        assert [i.filename for i in spool.pending()] == ["2026-02-21-12-00-00-m1-b1.jpg"]
+
+    def test_full_spool_drops_oldest_first(self, tmp_path: Path) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=2)
+        frame = _frame(tmp_path)
+
+        for second in range(4):
+            spool.add(frame, f"2026-02-21-12-00-0{second}-m1.jpg", "meta")
+
+        names = [item.filename for item in spool.pending()]
+        assert names == ["2026-02-21-12-00-02-m1.jpg", "2026-02-21-12-00-03-m1.jpg"]
+        assert spool.evicted == 2
+        assert not list((tmp_path / "spool").glob("*-00-00-*"))
+
+
+class TestUploadWorker:
+    def test_drain_uploads_to_webdav(self, tmp_path: Path, webdav_server) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+        worker = UploadWorker(spool, _sender(webdav_server.base_url))
+        worker.enqueue(_frame(tmp_path), "2026-02-21-12-00-00-m1.jpg")
+
+        assert worker.drain() == 1
+
+        assert webdav_server.files == {"2026-02-21-12-00-00-m1.jpg": b"fake-jpeg"}
+        assert len(spool) == 0
+        assert worker.metrics.uploaded == 1
+
+    def test_failed_upload_stays_queued(self, tmp_path: Path, webdav_server) -> None:
+        webdav_server.fail_next = 1
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+        worker = UploadWorker(spool, _sender(webdav_server.base_url))
+        worker.enqueue(_frame(tmp_path), "2026-02-21-12-00-00-m1.jpg")
+
+        assert worker.drain() == 0
+        assert len(spool) == 1
+        assert worker.metrics.failures == 1
+
+        assert worker.drain() == 1
+        assert len(spool) == 0
+
+    def test_unreachable_server_counts_as_failure(self, tmp_path: Path) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+        worker = UploadWorker(spool, _sender("http://127.0.0.1:9/webdav"))
+        worker.enqueue(_frame(tmp_path), "2026-02-21-12-00-00-m1.jpg")
+
+        assert worker.drain() == 0
+        assert worker.metrics.queue_depth == 1
+
+    def test_backoff_grows_exponentially_and_is_capped(self, tmp_path: Path) -> None:
+        worker = UploadWorker(
+            UploadSpool(tmp_path / "spool", 5), lambda item: False, backoff_max=5
+        )
+        delays = []
+        for _ in range(5):
+            worker._consecutive_failures += 1
+            delays.append(worker._backoff())
+
+        assert delays == [1, 2, 4, 5, 5]
+
+    def test_background_worker_retries_until_uploaded(
+        self, tmp_path: Path, webdav_server
+    ) -> None:
+        webdav_server.fail_next = 2
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+        worker = UploadWorker(spool, _sender(webdav_server.base_url), backoff_base=0.01)
+        worker.start()
+        try:
+            worker.enqueue(_frame(tmp_path), "2026-02-21-12-00-00-m1.jpg")
+            deadline = time.monotonic() + 5
+            while worker.metrics.uploaded < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            worker.stop(timeout=5)
+
+        assert worker.metrics.uploaded == 1
+        assert worker.metrics.failures == 2
+        assert "2026-02-21-12-00-00-m1.jpg" in webdav_server.files
+
+
+    def test_frame_evicted_while_in_flight(self, tmp_path: Path, webdav_server) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=1)
+        upload = _sender(webdav_server.base_url)
+        worker: UploadWorker
+
+        def send(item: SpoolItem) -> bool:
+            ok = upload(item)
+            if item.filename.endswith("00-m1.jpg"):
+                # a new capture arrives during the upload and evicts this frame
+                worker.enqueue_bytes(b"next", "2026-02-21-12-00-01-m1.jpg")
+            return ok
+
+        worker = UploadWorker(spool, send, backoff_base=0.01)
+        worker.start()
+        try:
+            worker.enqueue(_frame(tmp_path), "2026-02-21-12-00-00-m1.jpg")
+            deadline = time.monotonic() + 5
+            while worker.metrics.uploaded < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert worker._thread is not None and worker._thread.is_alive()
+        finally:
+            worker.stop(timeout=5)
+
+        assert worker.metrics.uploaded == 2
+        assert webdav_server.files["2026-02-21-12-00-01-m1.jpg"] == b"next"
+
+    def test_names_repeated_within_a_second_stay_apart(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path / "archive", flush_bytes=1)
+        spool = UploadSpool(tmp_path / "spool", max_items=5)
+        worker = UploadWorker(spool, lambda item: True, archive=archive)
+
+        for data in (b"a", b"b", b"c"):
+            worker.enqueue_bytes(data, "2026-02-21-12-00-00-m1.jpg")
+
+        assert {item.filename: item.path.read_bytes() for item in spool.pending()} == {
+            "2026-02-21-12-00-00-m1.jpg": b"a",
+            "2026-02-21-12-00-00-m1-s2.jpg": b"b",
+            "2026-02-21-12-00-00-m1-s3.jpg": b"c",
+        }
+        assert worker.drain() == 3
+        assert archive.pending() == []
+
+    def test_concurrent_frames_of_one_second_are_all_kept(self, tmp_path: Path) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=20)
+        worker = UploadWorker(spool, lambda item: True)
+        start = threading.Barrier(8)
+
+        def enqueue(index: int) -> None:
+            start.wait()
+            worker.enqueue_bytes(bytes([index]) * 4096, "2026-02-21-12-00-00-m1.jpg")
+
+        threads = [threading.Thread(target=enqueue, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stored = sorted(item.path.read_bytes() for item in spool.pending())
+        assert stored == [bytes([i]) * 4096 for i in range(8)]
+        assert not list((tmp_path / "spool").glob("*.tmp"))
+
+
+class TestBatchUpload:
+    def test_drain_sends_batches(self, tmp_path: Path) -> None:
+        batches: list[list[str]] = []
+
+        def send_batch(items: list[SpoolItem]) -> bool:
+            batches.append([item.meta for item in items])
+            return True
+
+        spool = UploadSpool(tmp_path / "spool", max_items=10)
+        worker = UploadWorker(spool, None, send_batch=send_batch, batch_size=2)
+        for second in range(5):
+            worker.enqueue_bytes(b"jpeg", f"2026-02-21-12-00-0{second}-m1.jpg", f"meta{second}")
+
+        assert worker.drain() == 5
+
+        assert batches == [["meta0", "meta1"], ["meta2", "meta3"], ["meta4"]]
+        assert len(spool) == 0
+        assert worker.metrics.uploaded == 5
+
+    def test_failed_batch_stays_queued(self, tmp_path: Path) -> None:
+        spool = UploadSpool(tmp_path / "spool", max_items=10)
+        worker = UploadWorker(spool, None, send_batch=lambda items: False, batch_size=3)
+        for second in range(2):
+            worker.enqueue_bytes(b"jpeg", f"2026-02-21-12-00-0{second}-m1.jpg")
+
+        assert worker.drain() == 0
+
+        assert len(spool) == 2
+        assert worker.metrics.failures == 1
+
+
+class TestArchiveCatchUp:
+    def test_enqueued_frames_are_archived_and_marked_uploaded(
+        self, tmp_path: Path, webdav_server
+    ) -> None:
+        archive = FrameArchive(tmp_path / "archive")
+        worker = UploadWorker(
+            UploadSpool(tmp_path / "spool", 5), _sender(webdav_server.base_url), archive=archive
+        )
+        worker.enqueue_bytes(b"jpeg", "2026-02-21-12-00-00-m1.jpg", "meta")
+
+        assert worker.drain() == 1
+        archive.flush()
+
+        assert len(archive) == 1
+        assert archive.pending() == []
+
+    def test_frames_evicted_during_outage_are_caught_up(
+        self, tmp_path: Path, webdav_server
+    ) -> None:
+        archive = FrameArchive(tmp_path / "archive", flush_bytes=1)
+        spool = UploadSpool(tmp_path / "spool", max_items=2)
+        worker = UploadWorker(
+            spool, _sender(webdav_server.base_url), archive=archive, catchup_batch=2
+        )
+        names = [f"2026-02-21-12-00-0{i}-m1.jpg" for i in range(5)]
+        for i, name in enumerate(names):
+            worker.enqueue_bytes(f"jpeg{i}".encode(), name, f"meta{i}")
+        assert spool.evicted == 3
+
+        assert worker.drain() == 5
+
+        assert webdav_server.files == {name: f"jpeg{i}".encode() for i, name in enumerate(names)}
+        assert archive.pending() == []
+        assert len(spool) == 0
+
+    def test_catch_up_stops_at_first_failure(self, tmp_path: Path) -> None:
+        archive = FrameArchive(tmp_path / "archive", flush_bytes=1)
+        archive.append(b"a", "2026-02-21-12-00-00-m1.jpg")
+        archive.append(b"b", "2026-02-21-12-00-01-m1.jpg")
+        worker = UploadWorker(
+            UploadSpool(tmp_path / "spool", 5), lambda item: False, archive=archive
+        )
+
+        assert worker.drain() == 0
+
+        assert len(worker.spool) == 2
+        assert len(archive.pending()) == 2
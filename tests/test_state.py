@@ -0,0 +1,50 @@
+"""Tests for the persistent detector state store."""
+
+from pathlib import Path
+
+from meisencam.state import DetectorState, load_state, save_state
+
+
+class TestStateStore:
+    def test_missing_file_returns_fresh_state(self, tmp_path: Path) -> None:
+        assert load_state(tmp_path / "missing.state") == DetectorState()
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        path = tmp_path / "meisencam.state"
+        state = DetectorState(ref_update_time=1234.5, last_score=3.2, samples=7)
+
+        save_state(path, state)
+
+        assert load_state(path) == state
+        assert not path.with_name(path.name + ".tmp").exists()
+
+    def test_corrupt_file_returns_fresh_state(self, tmp_path: Path) -> None:
+        path = tmp_path / "meisencam.state"
+        path.write_text("{not json")
+
+        assert load_state(path) == DetectorState()
+
+    def test_unknown_keys_are_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path / "meisencam.state"
+        path.write_text('{"last_score": 1.5, "from_the_future": true}')
+
+        assert load_state(path).last_score == 1.5
+
+
+class TestNoiseStatistics:
+    def test_first_sample_sets_mean(self) -> None:
+        state = DetectorState()
+
+        state.observe_noise(2.0)
+
+        assert state.noise_mean == 2.0
+        assert state.noise_var == 0.0
+
+    def test_mean_tracks_samples(self) -> None:
+        state = DetectorState()
+        for _ in range(200):
+            state.observe_noise(1.0)
+            state.observe_noise(3.0)
+
+        assert 1.5 < state.noise_mean < 2.5
+        assert state.noise_var > 0.5
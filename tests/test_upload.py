@@ -1,9 +1,18 @@
 """Tests for the upload module."""
 
+from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from meisencam.upload import upload_image
+import pytest
+
+from meisencam.frame import Frame
+from meisencam.upload import WebDavUploader, remote_filename, upload_image
+
+
+def _frame(data: bytes) -> Frame:
+    """A frame whose JPEG is already encoded."""
+    return Frame.from_jpeg(data, datetime(2026, 2, 21, 12, 0, 0))
 
 
 class TestUploadImage:
@@ -49,9 +58,107 @@ class TestUploadImage:
         assert url.startswith("https://example.com/webdav/")
         assert "-m2.jpg" in url
 
+    @patch("meisencam.upload.requests.put")
+    def test_uploads_frame_from_memory(self, mock_put: MagicMock) -> None:
+        mock_put.return_value = MagicMock(status_code=201)
+
+        upload_image(_frame(b"in-memory"), mode=1, webdav_base="https://example.com/webdav")
+
+        assert mock_put.call_args.args[0].endswith("/2026-02-21-12-00-00-m1.jpg")
+        assert mock_put.call_args.kwargs["data"] == b"in-memory"
+
     def test_returns_none_for_missing_file(self, tmp_path: Path) -> None:
         missing = tmp_path / "nonexistent.jpg"
 
         result = upload_image(missing, mode=1)
 
         assert result is None
+
+    @patch("meisencam.upload.requests.put")
+    def test_upload_uses_timeout(self, mock_put: MagicMock, tmp_path: Path) -> None:
+        image = tmp_path / "test.jpg"
+        image.write_bytes(b"fake-jpeg")
+        mock_put.return_value = MagicMock(status_code=201)
+
+        upload_image(image, mode=1, webdav_base="https://example.com/webdav")
+
+        connect_timeout, read_timeout = mock_put.call_args.kwargs["timeout"]
+        assert connect_timeout > 0 and read_timeout > 0
+
+
+class TestRemoteFilename:
+    def test_format(self) -> None:
+        name = remote_filename(2, datetime(2026, 2, 21, 12, 0, 5))
+
+        assert name == "2026-02-21-12-00-05-m2.jpg"
+
+    def test_tag_suffix(self) -> None:
+        name = remote_filename(1, datetime(2026, 2, 21, 12, 0, 5), "p3")
+
+        assert name == "2026-02-21-12-00-05-m1-p3.jpg"
+
+
+class TestWebDavUploader:
+    def test_put_uploads_with_share_token(self, tmp_path: Path, webdav_server) -> None:
+        image = tmp_path / "test.jpg"
+        image.write_bytes(b"fake-jpeg")
+        uploader = WebDavUploader(webdav_server.base_url, "tok")
+
+        response = uploader.put(image, "2026-02-21-12-00-00-m1.jpg")
+
+        assert response.status_code == 201
+        assert webdav_server.files["2026-02-21-12-00-00-m1.jpg"] == b"fake-jpeg"
+        assert webdav_server.auth == ["Basic dG9rOg=="]  # "tok:"
+
+    def test_connection_reused_across_uploads(self, tmp_path: Path, webdav_server) -> None:
+        image = tmp_path / "test.jpg"
+        image.write_bytes(b"fake-jpeg")
+        uploader = WebDavUploader(webdav_server.base_url, "tok")
+
+        for second in range(3):
+            uploader.put(image, f"2026-02-21-12-00-0{second}-m1.jpg")
+        uploader.close()
+
+        assert len(webdav_server.files) == 3
+        assert webdav_server.connections == 1
+
+    def test_session_created_on_first_upload(self) -> None:
+        uploader = WebDavUploader("http://127.0.0.1:9/webdav", "tok")
+
+        uploader.close()
+
+        assert "session" not in vars(uploader)
+
+    def test_chunked_streaming(self, tmp_path: Path, webdav_server) -> None:
+        image = tmp_path / "test.jpg"
+        image.write_bytes(bytes(range(256)) * 1000)
+        uploader = WebDavUploader(webdav_server.base_url, "tok", chunked=True, chunk_size=4096)
+
+        uploader.put(image, "big.jpg")
+
+        assert webdav_server.files["big.jpg"] == image.read_bytes()
+
+    @pytest.mark.parametrize("chunked", [False, True])
+    def test_put_frame_from_memory(self, webdav_server, chunked: bool) -> None:
+        data = bytes(range(256)) * 100
+        uploader = WebDavUploader(webdav_server.base_url, "tok", chunked=chunked, chunk_size=4096)
+
+        response = uploader.put(_frame(data), "frame.jpg")
+
+        assert response.ok
+        assert webdav_server.files["frame.jpg"] == data
+
+    @pytest.mark.parametrize("chunked", [False, True])
+    def test_put_bytes(self, webdav_server, chunked: bool) -> None:
+        uploader = WebDavUploader(webdav_server.base_url, "tok", chunked=chunked, chunk_size=4)
+
+        response = uploader.put(b"archived-jpeg", "archived.jpg")
+
+        assert response.ok
+        assert webdav_server.files["archived.jpg"] == b"archived-jpeg"
+
+    def test_missing_file_raises(self, tmp_path: Path, webdav_server) -> None:
+        uploader = WebDavUploader(webdav_server.base_url, "tok")
+
+        with pytest.raises(FileNotFoundError):
+            uploader.put(tmp_path / "missing.jpg", "missing.jpg")
@@ -0,0 +1,74 @@
+"""Tests for motion zones."""
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from meisencam.zones import ZoneScore, combine, parse_zones
+
+
+class TestParseZones:
+    def test_rectangle_is_fraction_of_grid(self) -> None:
+        (zone,) = parse_zones("door:0.5,0,0.5,0.5", (4, 4))
+
+        assert zone.name == "door"
+        assert zone.weight == 1.0
+        assert zone.indices == (2, 3, 6, 7)
+
+    def test_multiple_zones_with_weights(self) -> None:
+        zones = parse_zones("a:0,0,1,1:2; b:0,0,0.5,0.5:0", (4, 4))
+
+        assert [(z.name, z.weight) for z in zones] == [("a", 2.0), ("b", 0.0)]
+        assert len(zones[0].indices) == 16
+
+    def test_rectangle_clipped_to_frame(self) -> None:
+        (zone,) = parse_zones("edge:0.75,0.75,1,1", (4, 4))
+
+        assert zone.indices == (15,)
+
+    def test_empty_spec_means_no_zones(self) -> None:
+        assert parse_zones("", (64, 48)) == []
+
+    @pytest.mark.parametrize("spec", ["door", "door:0,0,1", "door:0,0,1,1:2:3"])
+    def test_malformed_spec_raises(self, spec: str) -> None:
+        with pytest.raises(ValueError):
+            parse_zones(spec, (4, 4))
+
+    def test_mask_alone_forms_a_zone(self, tmp_path: Path) -> None:
+        mask = tmp_path / "mask.png"
+        image = Image.new("L", (8, 8), 0)
+        image.paste(255, (0, 0, 4, 8))  # left half watched
+        image.save(mask)
+
+        (zone,) = parse_zones("", (4, 4), mask)
+
+        assert zone.name == "mask"
+        assert zone.indices == (0, 1, 4, 5, 8, 9, 12, 13)
+
+    def test_mask_restricts_rectangles(self, tmp_path: Path) -> None:
+        mask = tmp_path / "mask.png"
+        image = Image.new("L", (4, 4), 0)
+        image.paste(255, (0, 0, 4, 1))  # top row watched
+        image.save(mask)
+
+        (zone,) = parse_zones("left:0,0,0.5,1", (4, 4), mask)
+
+        assert zone.indices == (0, 1)
+
+
+class TestCombine:
+    def test_weighted_mean_of_zone_scores(self) -> None:
+        result = combine({"a": ZoneScore(10, 10, 3.0), "b": ZoneScore(0, 10, 1.0)})
+
+        assert result.score == pytest.approx(75.0)
+        assert (result.changed, result.total) == (10, 20)
+
+    def test_zero_weight_zone_is_ignored(self) -> None:
+        result = combine({"nest": ZoneScore(50, 50, 0.0), "door": ZoneScore(0, 10, 1.0)})
+
+        assert result.score == 0.0
+        assert result.zones["nest"].score == 100.0
+
+    def test_no_active_zones_scores_zero(self) -> None:
+        assert combine({}).score == 0.0